@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.experimentos.config import config
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+"""Upper bound on the total size of cached analysis response bodies."""
+
+
+class ByteLRUCache:
+    """Thread-safe LRU cache bounded by the total byte size of its entries.
+
+    Each entry carries its own size estimate; when the budget is exceeded the
+    least recently used entries are evicted first. Entries larger than the
+    whole budget are never stored.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._store: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            self._store.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any, nbytes: int) -> bool:
+        """Store *value* under *key*. Returns False if it does not fit the budget."""
+        if nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._store.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._store[key] = (value, nbytes)
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes and self._store:
+                _, (_, evicted_bytes) = self._store.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class ResponseCache:
+    """Rendered analysis responses keyed by input content hash + config fingerprint.
+
+    Analysis output is a pure function of the dataset, the request parameters
+    and ExperimentConfig, so the cache key doubles as a strong ETag: a client
+    presenting it in If-None-Match can be answered 304 without recomputing.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self._cache = ByteLRUCache(max_bytes)
+
+    @staticmethod
+    def key(endpoint: str, dataset_id: str, params: dict[str, Any] | None = None) -> str:
+        material = json.dumps(
+            [endpoint, dataset_id, params or {}, config.fingerprint()],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def etag(key: str) -> str:
+        return f'"{key[:32]}"'
+
+    @staticmethod
+    def etag_matches(if_none_match: str | None, etag: str) -> bool:
+        """RFC 9110 weak comparison of an If-None-Match header against *etag*."""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in (c.removeprefix("W/") for c in candidates)
+
+    def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, body: bytes) -> None:
+        self._cache.set(key, body, len(body))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+response_cache = ResponseCache()
+
+
+class SingleFlight:
+    """Coalesce concurrent identical computations into one.
+
+    The first caller for a key starts ``fn()`` as a task; callers arriving while
+    it runs await the same task and share its result or exception. The task is
+    shielded, so a disconnecting caller does not cancel it for the others.
+    Nothing is retained once the task finishes (see ResponseCache for that).
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,345 @@
+"""
+Server-side dataset store.
+
+Uploaded files are parsed once and kept as DataFrames in a memory-bounded
+LRU, addressed by the SHA-256 of the raw upload. Analysis endpoints accept
+the resulting ``dataset_id`` instead of re-uploading and re-parsing the file.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import zlib
+from typing import Any, BinaryIO
+
+import pandas as pd
+
+from backend.caching import ByteLRUCache
+from src.experimentos.schema import resolve_schema
+
+logger = logging.getLogger("experimentos")
+
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+"""Upper bound on the in-memory size of all cached DataFrames."""
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+"""Largest accepted upload (compressed size); larger files are rejected with 413."""
+
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(8 * 1024 * 1024)))
+"""Per-request in-memory buffer; uploads beyond this spill to a temporary file."""
+
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+"""Read size when streaming an upload into the spool."""
+
+UPLOAD_HEADER_MAX_BYTES = int(os.getenv("UPLOAD_HEADER_MAX_BYTES", str(64 * 1024)))
+"""Decompressed bytes the early CSV header check may examine before rejecting the upload."""
+
+REQUIRED_COLUMNS: tuple[str, ...] = ("variant", "users", "conversions")
+
+
+class DatasetNotFoundError(KeyError):
+    """Raised when a dataset id is unknown or has been evicted."""
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised for file types the upload parser cannot read."""
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+
+class SchemaRejectedError(ValueError):
+    """Raised when an upload's header lacks the required columns."""
+
+
+UPLOAD_FORMATS: dict[str, str] = {
+    ".csv": "csv",
+    ".csv.gz": "csv.gz",
+    ".csv.zst": "csv.zst",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+"""Supported upload extensions and the parser they map to."""
+
+
+def content_hash(contents: bytes) -> str:
+    """Content-addressed dataset id for a raw upload."""
+    return hashlib.sha256(contents).hexdigest()
+
+
+def detect_format(filename: str | None) -> str | None:
+    """Map an upload filename to its parser, or None if unsupported."""
+    if not filename:
+        return None
+    name = filename.lower()
+    for ext, fmt in UPLOAD_FORMATS.items():
+        if name.endswith(ext):
+            return fmt
+    return None
+
+
+def column_dtypes(columns: list[str]) -> dict[str, str]:
+    """Explicit dtype schema for the known experiment columns.
+
+    Remaining (guardrail count) columns are left to inference.
+    """
+    dtypes: dict[str, str] = {}
+    schema = resolve_schema(columns)
+    continuous = {col for metric in schema.continuous for col in schema.value_columns(metric)}
+    for col in columns:
+        if col == "variant":
+            dtypes[col] = "str"
+        elif col in ("users", "conversions"):
+            dtypes[col] = "int64"
+        elif col in continuous or col.endswith("_sum") or col.endswith("_sum_sq"):
+            dtypes[col] = "float64"
+    return dtypes
+
+
+def check_required_columns(columns: list[str]) -> None:
+    """Reject a file whose header lacks the required experiment columns."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise SchemaRejectedError(f"필수 컬럼 누락: {', '.join(missing)}")
+
+
+class _CsvHeaderSniffer:
+    """Incrementally find the CSV header line of a streamed (possibly compressed) upload.
+
+    One decompressor lives for the whole upload and is fed only new chunks.
+    Decompressed output is capped at ``max_bytes``, so a compression bomb cannot
+    expand during the header check, and each byte is scanned for a newline once.
+    """
+
+    ZSTD_STEP_BYTES = 16
+    """Compressed bytes fed per zstd step (zstd has no max_length; ≤ ~0.8 MiB output per step)."""
+
+    def __init__(self, fmt: str, max_bytes: int):
+        self._fmt = fmt
+        self._max_bytes = max_bytes
+        self._text = bytearray()
+        self._decompressor: Any = None
+        if fmt == "csv.gz":
+            self._decompressor = zlib.decompressobj(wbits=31)
+        elif fmt == "csv.zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise UnsupportedFormatError("zstd-compressed CSV requires the 'zstandard' package")
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def feed(self, chunk: bytes) -> list[str] | None:
+        """Consume the next upload chunk.
+
+        Returns the header columns once a complete first line is available, else None.
+
+        Raises:
+            SchemaRejectedError: no newline within the first ``max_bytes`` decompressed bytes
+            UnsupportedFormatError: corrupt compressed data
+        """
+        start = len(self._text)
+        if self._fmt == "csv.gz":
+            try:
+                self._text += self._decompressor.decompress(chunk, self._room())
+            except zlib.error as e:
+                raise UnsupportedFormatError(f"Invalid gzip data: {e}")
+        elif self._fmt == "csv.zst":
+            self._feed_zstd(chunk)
+        else:
+            self._text += chunk[: self._room()]
+
+        newline = self._text.find(b"\n", start)
+        if newline >= 0:
+            header = bytes(self._text[:newline]).decode("utf-8-sig").rstrip("\r")
+            return next(csv.reader([header]), [])
+        if len(self._text) >= self._max_bytes:
+            raise SchemaRejectedError(f"CSV 헤더가 {self._max_bytes}바이트 안에서 끝나지 않습니다")
+        return None
+
+    def _room(self) -> int:
+        # One byte past the budget, so an over-long header is detected
+        return self._max_bytes + 1 - len(self._text)
+
+    def _feed_zstd(self, chunk: bytes) -> None:
+        import zstandard
+
+        step = self.ZSTD_STEP_BYTES
+        for offset in range(0, len(chunk), step):
+            try:
+                out = self._decompressor.decompress(chunk[offset : offset + step])
+            except zstandard.ZstdError as e:
+                raise UnsupportedFormatError(f"Invalid zstd data: {e}")
+            self._text += out[: self._room()]
+            if b"\n" in out or self._room() <= 0:
+                return
+
+
+async def spool_upload(
+    upload: Any,
+    max_bytes: int | None = None,
+    spool_bytes: int | None = None,
+    chunk_bytes: int | None = None,
+) -> tuple[BinaryIO, str]:
+    """
+    Stream an upload into a spooled buffer while hashing it.
+
+    CSV headers are checked as soon as the first line arrives, so a file without
+    the required columns is rejected before the rest is read. Memory use is capped
+    at ``spool_bytes``; larger uploads spill to a temporary file.
+
+    Args:
+        upload: object with ``filename`` and ``async read(size)`` (e.g. UploadFile)
+
+    Returns:
+        (spooled file positioned at 0, content-hash dataset id)
+
+    Raises:
+        UploadTooLargeError: upload exceeds ``max_bytes``
+        SchemaRejectedError: CSV header lacks required columns, or does not end
+            within UPLOAD_HEADER_MAX_BYTES (decompressed)
+    """
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+    chunk_bytes = chunk_bytes or UPLOAD_CHUNK_BYTES
+    fmt = detect_format(upload.filename)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes or UPLOAD_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    sniffer = _CsvHeaderSniffer(fmt, UPLOAD_HEADER_MAX_BYTES) if fmt in ("csv", "csv.gz", "csv.zst") else None
+
+    try:
+        while chunk := await upload.read(chunk_bytes):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {max_bytes}-byte limit")
+            if sniffer is not None:
+                columns = sniffer.feed(chunk)
+                if columns is not None:
+                    check_required_columns(columns)
+                    sniffer = None
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return spool, digest.hexdigest()  # type: ignore[return-value]
+
+
+def _decompressed(raw: BinaryIO, fmt: str) -> BinaryIO:
+    """Wrap *raw* in a decompressing reader for compressed CSV formats."""
+    if fmt == "csv.gz":
+        return gzip.GzipFile(fileobj=raw, mode="rb")  # type: ignore[return-value]
+    if fmt == "csv.zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise UnsupportedFormatError("zstd-compressed CSV requires the 'zstandard' package")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        return io.BufferedReader(reader)  # type: ignore[arg-type]
+    return raw
+
+
+def _read_csv(raw: BinaryIO, fmt: str) -> pd.DataFrame:
+    header = _decompressed(raw, fmt).readline().decode("utf-8-sig").rstrip("\r\n")
+    columns = next(csv.reader([header]), [])
+    check_required_columns(columns)
+    raw.seek(0)
+    try:
+        return pd.read_csv(_decompressed(raw, fmt), dtype=column_dtypes(columns))
+    except (ValueError, TypeError):
+        # Malformed values (e.g. non-numeric users, NULLs): parse leniently and
+        # let validate_schema report the problem instead of failing the upload.
+        raw.seek(0)
+        return pd.read_csv(_decompressed(raw, fmt))
+
+
+def _read_columnar(raw: BinaryIO, fmt: str) -> pd.DataFrame:
+    try:
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise UnsupportedFormatError("Parquet/Arrow uploads require the 'pyarrow' package")
+
+    # Check the schema from file metadata before decoding any column data
+    reader: Any
+    if fmt == "parquet":
+        reader = pyarrow.parquet.ParquetFile(raw)
+        check_required_columns(reader.schema_arrow.names)
+        table = reader.read()
+    else:
+        try:
+            reader = pyarrow.ipc.open_file(raw)
+        except pyarrow.ArrowInvalid:
+            raw.seek(0)
+            reader = pyarrow.ipc.open_stream(raw)
+        check_required_columns(reader.schema.names)
+        table = reader.read_all()
+
+    df = table.to_pandas()
+    for col, dtype in column_dtypes(list(df.columns)).items():
+        if dtype != "str" and not df[col].isnull().any():
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def parse_upload(contents: bytes | BinaryIO, filename: str | None) -> pd.DataFrame:
+    """
+    Parse an upload into a DataFrame.
+
+    Supports CSV (optionally gzip/zstd compressed), Parquet and Arrow IPC/Feather.
+    Known columns are parsed with an explicit dtype schema (see column_dtypes).
+
+    Raises:
+        UnsupportedFormatError: unknown extension or missing optional dependency
+        SchemaRejectedError: required columns are missing
+    """
+    fmt = detect_format(filename)
+    if fmt is None:
+        raise UnsupportedFormatError(f"Unsupported file type: {filename}")
+
+    raw = io.BytesIO(contents) if isinstance(contents, bytes) else contents
+    if fmt in ("parquet", "arrow"):
+        return _read_columnar(raw, fmt)
+    return _read_csv(raw, fmt)
+
+
+class DatasetStore:
+    """LRU store of parsed DataFrames keyed by content hash.
+
+    Stored frames are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = DATASET_CACHE_MAX_BYTES):
+        self._cache = ByteLRUCache(max_bytes)
+
+    def put(self, dataset_id: str, df: pd.DataFrame) -> None:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if not self._cache.set(dataset_id, df, nbytes):
+            logger.warning(
+                f"Dataset {dataset_id[:12]} ({nbytes} bytes) exceeds the cache budget; not cached"
+            )
+
+    def get(self, dataset_id: str) -> pd.DataFrame:
+        df = self._cache.get(dataset_id)
+        if df is None:
+            raise DatasetNotFoundError(dataset_id)
+        return df
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._cache
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+dataset_store = DatasetStore()
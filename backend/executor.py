@@ -0,0 +1,105 @@
+"""
+Bounded worker pool for CPU-bound analysis.
+
+pandas / scipy / statsmodels calls block the event loop, so handlers dispatch
+them here instead. The pool accepts at most ``max_workers + max_queue`` tasks
+at a time; beyond that ``run`` fails fast with ``ExecutorSaturatedError`` so the
+API can answer 503 instead of letting latency grow without bound.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger("experimentos")
+
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "thread")
+"""Worker pool kind: "thread" or "process"."""
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(min(8, os.cpu_count() or 2))))
+"""Number of concurrently running analysis tasks."""
+
+ANALYSIS_MAX_QUEUE = int(os.getenv("ANALYSIS_MAX_QUEUE", "32"))
+"""Number of tasks allowed to wait for a free worker before rejecting."""
+
+ANALYSIS_RETRY_AFTER = int(os.getenv("ANALYSIS_RETRY_AFTER", "1"))
+"""Retry-After hint (seconds) returned with 503 when the pool is saturated."""
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the analysis pool and its queue are full."""
+
+
+class AnalysisExecutor:
+    """Thread or process pool with a hard cap on in-flight tasks."""
+
+    def __init__(
+        self,
+        kind: str = ANALYSIS_EXECUTOR,
+        max_workers: int = ANALYSIS_WORKERS,
+        max_queue: int = ANALYSIS_MAX_QUEUE,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}. Use 'thread' or 'process'.")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._in_flight = 0
+        self._pool: Executor | None = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="analysis"
+                    )
+                logger.info(f"Started {self.kind} analysis pool ({self.max_workers} workers)")
+            return self._pool
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        The slot is held until the task itself finishes, even if the awaiting
+        request is cancelled, so the cap reflects real worker load.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturatedError(
+                f"Analysis pool saturated ({self.max_workers} running, {self.max_queue} queued)"
+            )
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_pool().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+analysis_executor = AnalysisExecutor()
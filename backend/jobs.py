@@ -0,0 +1,177 @@
+"""
+In-process job queue for long-running analyses.
+
+Jobs run on a dedicated thread pool (separate from the interactive analysis
+pool) so portfolio-size inputs never hit HTTP timeouts. Finished jobs are kept
+for JOB_RESULT_TTL seconds and then evicted lazily. No external broker needed.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger("experimentos")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+"""Number of jobs executed concurrently."""
+
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "64"))
+"""Maximum queued + running jobs before new submissions are rejected."""
+
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "900"))
+"""Seconds a finished job (and its result) is retained."""
+
+JOB_POLL_INTERVAL = 0.05
+"""Long-poll check interval in seconds."""
+
+ProgressCallback = Callable[[float, str | None], None]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when JOB_MAX_PENDING jobs are already queued or running."""
+
+
+class JobNotFoundError(KeyError):
+    """Raised when a job id is unknown or its result has expired."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "queued"
+    """queued | running | succeeded | failed"""
+    progress: float = 0.0
+    stage: str | None = None
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == "succeeded":
+            payload["result"] = self.result
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class JobManager:
+    """Thread-pool backed job queue with result retention and TTL eviction."""
+
+    def __init__(
+        self,
+        max_workers: int = JOB_WORKERS,
+        max_pending: int = JOB_MAX_PENDING,
+        ttl: int = JOB_RESULT_TTL,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="job"
+            )
+        return self._pool
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        """
+        Queue ``fn(report_progress, *args, **kwargs)`` as a job.
+
+        ``report_progress(fraction, stage)`` lets the job publish progress.
+
+        Raises:
+            JobQueueFullError: too many jobs are queued or running
+        """
+        with self._lock:
+            self._evict_expired()
+            pending = sum(1 for job in self._jobs.values() if not job.done)
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"{pending} jobs already pending")
+            job = Job(id=uuid.uuid4().hex, kind=kind)
+            self._jobs[job.id] = job
+            pool = self._get_pool()
+
+        pool.submit(self._execute, job, fn, args, kwargs)
+        return job
+
+    def _execute(
+        self, job: Job, fn: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> None:
+        def report_progress(fraction: float, stage: str | None = None) -> None:
+            job.progress = max(0.0, min(1.0, fraction))
+            job.stage = stage
+
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(report_progress, *args, **kwargs)
+            job.progress = 1.0
+            status = "succeeded"
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            status = "failed"
+        # finished_at first: pollers treat the status change as completion
+        job.finished_at = time.time()
+        job.status = status
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Job:
+        """Long-poll: return once the job is finished or *timeout* seconds elapse."""
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while not job.done and time.monotonic() < deadline:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+job_manager = JobManager()
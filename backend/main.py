@@ -1,85 +1,167 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
-import numpy as np
-import io
-import json
 import sys
 import os
 from pydantic import BaseModel
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 
-class NumpyEncoder(json.JSONEncoder):
-    """JSON encoder that handles numpy types."""
-
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
-
-
-class SafeJSONResponse(JSONResponse):
-    """JSONResponse that safely handles NaN/Inf and numpy types.
-
-    Two-pass approach:
-      1) json.dumps with allow_nan=True + NumpyEncoder -> produces string with NaN tokens
-      2) json.loads with parse_constant -> converts NaN/Infinity to None
-      3) json.dumps again -> clean, RFC-compliant JSON
-    """
-
-    def render(self, content: Any) -> bytes:
-        text = json.dumps(
-            content, cls=NumpyEncoder, allow_nan=True,
-            ensure_ascii=False, separators=(",", ":"),
-        )
-        clean = json.loads(text, parse_constant=lambda _: None)
-        return json.dumps(
-            clean, ensure_ascii=False, separators=(",", ":"),
-        ).encode("utf-8")
-
-
-def sanitize(obj):
-    """Convert numpy types to native Python types for JSON serialization."""
-    text = json.dumps(obj, cls=NumpyEncoder, allow_nan=True)
-    return json.loads(text, parse_constant=lambda _: None)
-
 # Add src to sys.path to import existing logic
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.experimentos.config import MULTIPLE_TESTING_METHOD
 from src.experimentos.healthcheck import run_health_check
-from src.experimentos.analysis import (
-    calculate_primary,
-    calculate_guardrails,
-    calculate_continuous_metrics,
-    calculate_bayesian_insights,
-    analyze_multivariant,
-    calculate_guardrails_multivariant,
-    calculate_continuous_metrics_multivariant,
-    calculate_bayesian_insights_multivariant,
+from src.experimentos.analysis import is_multivariant
+from src.experimentos.report import (
+    STAGE_RESULT_KEYS,
+    ReportOptions,
+    resolve_stages,
+    run_report,
+    run_stage,
+    stage_inputs,
 )
-from src.experimentos.config import MULTIPLE_TESTING_METHOD
+from src.experimentos.portfolio import PORTFOLIO_KEY_COLUMNS, analyze_portfolio, analyze_segments
 from src.experimentos.memo import generate_memo, export_html, make_decision
 from src.experimentos.sequential import analyze_sequential, calculate_boundaries
 # Import integrations to register providers
 import src.experimentos.integrations.statsig
 import src.experimentos.integrations.growthbook
 from backend.routers import integrations
+from backend.caching import response_cache, single_flight
+from backend.datasets import (
+    DatasetNotFoundError,
+    SchemaRejectedError,
+    UnsupportedFormatError,
+    UploadTooLargeError,
+    dataset_store,
+    detect_format,
+    parse_upload,
+    spool_upload,
+)
+from backend.executor import ANALYSIS_RETRY_AFTER, ExecutorSaturatedError, analysis_executor
+from backend.jobs import JobNotFoundError, JobQueueFullError, job_manager
+from backend.utils import SafeJSONResponse, dumps, sse_event
+
 
-app = FastAPI(title="ExperimentOS API", default_response_class=SafeJSONResponse)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    analysis_executor.shutdown(wait=False)
+    job_manager.shutdown(wait=False)
 
 
-def _is_multivariant(df: pd.DataFrame) -> bool:
-    """Auto-detect whether the experiment is multi-variant (3+ variants or non-standard names)."""
-    variants = df["variant"].unique()
-    return len(variants) > 2 or "treatment" not in variants
+app = FastAPI(
+    title="ExperimentOS API",
+    default_response_class=SafeJSONResponse,
+    lifespan=lifespan,
+)
+
+
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy running other analyses. Please retry shortly."},
+        headers={"Retry-After": str(ANALYSIS_RETRY_AFTER)},
+    )
+
+
+def _parse_list_param(value: str | None) -> list[str] | None:
+    """Split a comma separated query parameter, dropping blanks."""
+    items = [v.strip() for v in value.split(",")] if value else []
+    return [v for v in items if v] or None
+
+
+async def _load_dataset(
+    file: UploadFile | None, dataset_id: str | None
+) -> tuple[pd.DataFrame, str]:
+    """Resolve an uploaded file or a previously uploaded dataset id to a parsed DataFrame.
+
+    Uploads are content-addressed, so re-sending an already parsed file is a cache hit.
+    """
+    if file is None:
+        if not dataset_id:
+            raise HTTPException(status_code=400, detail="Either a file or a dataset_id is required")
+        try:
+            return dataset_store.get(dataset_id), dataset_id
+        except DatasetNotFoundError:
+            raise HTTPException(
+                status_code=404,
+                detail="Dataset not found or expired. Please upload the file again.",
+            )
+
+    if detect_format(file.filename) is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Supported files: CSV (.csv, .csv.gz, .csv.zst), Parquet, Arrow IPC/Feather",
+        )
+
+    try:
+        spool, dataset_id = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except SchemaRejectedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with spool:
+        try:
+            return dataset_store.get(dataset_id), dataset_id
+        except DatasetNotFoundError:
+            pass
+
+        # Process workers cannot share the spooled file handle; send the bytes instead
+        source = spool.read() if analysis_executor.kind == "process" else spool
+        try:
+            df = await analysis_executor.run(parse_upload, source, file.filename)
+        except ExecutorSaturatedError:
+            raise
+        except SchemaRejectedError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except UnsupportedFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not parse file: {e}")
+
+    dataset_store.put(dataset_id, df)
+    return df, dataset_id
+
+async def _cached_response(
+    request: Request,
+    endpoint: str,
+    dataset_id: str,
+    params: dict[str, Any],
+    compute: Callable[[], Awaitable[dict[str, Any]]],
+) -> Response:
+    """Serve a deterministic analysis result from the response cache.
+
+    Answers 304 when If-None-Match carries the current ETag, returns cached
+    bytes on a hit and only calls *compute* on a miss. Concurrent misses for
+    the same key share one computation. Errors are not cached.
+    """
+    key = response_cache.key(endpoint, dataset_id, params)
+    etag = response_cache.etag(key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if response_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    async def render() -> bytes:
+        body = dumps(await compute())
+        response_cache.set(key, body)
+        return body
+
+    body = response_cache.get(key)
+    if body is None:
+        body = await single_flight.do(key, render)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 # Register Integration Router
 app.include_router(integrations.router)
@@ -96,132 +178,439 @@ app.add_middleware(
 def read_root():
     return {"message": "ExperimentOS API is running"}
 
+@app.post("/api/datasets")
+async def api_upload_dataset(file: UploadFile = File(...)):
+    """Upload a file once and get a dataset_id usable by every analysis endpoint."""
+    df, dataset_id = await _load_dataset(file, None)
+    return {
+        "status": "success",
+        "dataset_id": dataset_id,
+        "filename": file.filename,
+        "rows": len(df),
+        "columns": list(df.columns),
+    }
+
 @app.post("/api/health-check")
-async def api_health_check(file: UploadFile = File(...)):
-    if not file.filename or not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
-    
-    try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-        
-        # Run existing health check logic
-        result = run_health_check(df)
-        
-        # return basic stats for preview
-        preview = df.head().fillna("").to_dict(orient="records")
-        columns = list(df.columns)
-        
-        return {
-            "status": "success",
-            "result": result,
-            "preview": preview,
-            "columns": columns,
-            "filename": file.filename
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def api_health_check(
+    request: Request, file: UploadFile | None = File(None), dataset_id: str | None = None
+):
+    df, dataset_id = await _load_dataset(file, dataset_id)
+    filename = file.filename if file else None
+
+    async def compute():
+        try:
+            # Run existing health check logic
+            result = await analysis_executor.run(run_health_check, df)
+
+            # return basic stats for preview
+            preview = df.head().fillna("").to_dict(orient="records")
+            columns = list(df.columns)
+
+            return {
+                "status": "success",
+                "result": result,
+                "preview": preview,
+                "columns": columns,
+                "filename": filename,
+                "dataset_id": dataset_id,
+            }
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await _cached_response(
+        request, "health-check", dataset_id, {"filename": filename}, compute
+    )
 
 @app.post("/api/analyze")
-async def api_analyze(file: UploadFile = File(...), guardrails: str | None = None):
+async def api_analyze(
+    request: Request,
+    file: UploadFile | None = File(None),
+    guardrails: str | None = None,
+    dataset_id: str | None = None,
+):
     # guardrails: comma separated list of columns, or None for auto-detect
-    if not file.filename or not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    df, dataset_id = await _load_dataset(file, dataset_id)
+    guardrail_columns = _parse_list_param(guardrails)
+
+    async def compute():
+        try:
+            report = await analysis_executor.run(
+                run_report,
+                df,
+                stages=["primary", "guardrails"],
+                options=ReportOptions(guardrail_columns=guardrail_columns),
+            )
+            return {
+                "status": "success",
+                "is_multivariant": report["is_multivariant"],
+                "variant_count": report["variant_count"],
+                "primary_result": report["primary_result"],
+                "guardrail_results": report["guardrail_results"],
+            }
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await _cached_response(
+        request, "analyze", dataset_id, {"guardrails": guardrail_columns}, compute
+    )
+
+
+@app.post("/api/continuous-metrics")
+async def api_continuous_metrics(
+    request: Request, file: UploadFile | None = File(None), dataset_id: str | None = None
+):
+    """Analyze continuous metrics using Welch's t-test"""
+    df, dataset_id = await _load_dataset(file, dataset_id)
+
+    async def compute():
+        try:
+            report = await analysis_executor.run(run_report, df, stages=["continuous"])
+            return {
+                "status": "success",
+                "is_multivariant": report["is_multivariant"],
+                "continuous_results": report["continuous_results"],
+            }
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
+    return await _cached_response(request, "continuous-metrics", dataset_id, {}, compute)
+
+
+@app.post("/api/bayesian-analysis")
+async def api_bayesian_analysis(
+    request: Request, file: UploadFile | None = File(None), dataset_id: str | None = None
+):
+    """Perform Bayesian analysis (informational only)"""
+    df, dataset_id = await _load_dataset(file, dataset_id)
+
+    async def compute():
+        try:
+            report = await analysis_executor.run(run_report, df, stages=["bayesian"])
+            return {
+                "status": "success",
+                "is_multivariant": report["is_multivariant"],
+                "bayesian_insights": report["bayesian_insights"],
+            }
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await _cached_response(request, "bayesian-analysis", dataset_id, {}, compute)
+
+
+@app.post("/api/report")
+async def api_report(
+    request: Request,
+    file: UploadFile | None = File(None),
+    dataset_id: str | None = None,
+    stages: str | None = None,
+    guardrails: str | None = None,
+    experiment_name: str = "Experiment",
+):
+    """Run the full analysis pipeline in one pass.
+
+    stages: comma separated subset of health, primary, guardrails, continuous,
+    bayesian, decision, memo (prerequisite stages are added automatically).
+    """
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-
-        guardrail_cols = guardrails.split(",") if guardrails else None
-        is_multi = _is_multivariant(df)
-
-        if is_multi:
-            # Multi-variant path
-            primary_result = analyze_multivariant(df, MULTIPLE_TESTING_METHOD)
-            primary_result["is_multivariant"] = True
-
-            # Determine best variant
-            best_variant = None
-            best_lift = -float("inf")
-            for v_name, v_data in primary_result.get("variants", {}).items():
-                if v_data.get("is_significant_corrected") and v_data["absolute_lift"] > best_lift:
-                    best_lift = v_data["absolute_lift"]
-                    best_variant = v_name
-            primary_result["best_variant"] = best_variant
-
-            guardrail_results = calculate_guardrails_multivariant(
-                df, guardrail_columns=guardrail_cols
+        selected_stages = resolve_stages(_parse_list_param(stages))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    df, dataset_id = await _load_dataset(file, dataset_id)
+    options = ReportOptions(
+        guardrail_columns=_parse_list_param(guardrails),
+        experiment_name=experiment_name,
+    )
+
+    async def compute():
+        try:
+            report = await analysis_executor.run(
+                run_report, df, stages=selected_stages, options=options
             )
-        else:
-            # 2-variant path (기존 코드 그대로)
-            primary_result = calculate_primary(df)
-            guardrail_results = calculate_guardrails(df, guardrail_columns=guardrail_cols)
+            return {"status": "success", "dataset_id": dataset_id, **report}
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    params = {
+        "stages": selected_stages,
+        "guardrails": options.guardrail_columns,
+        "experiment_name": experiment_name,
+    }
+    return await _cached_response(request, "report", dataset_id, params, compute)
+
+
+def _run_portfolio(df: pd.DataFrame, **kwargs: Any) -> dict[str, Any]:
+    result = analyze_portfolio(df, **kwargs)
+    return {"status": "success", **result.to_dict()}
+
+
+@app.post("/api/portfolio")
+async def api_portfolio(
+    request: Request,
+    file: UploadFile | None = File(None),
+    dataset_id: str | None = None,
+    keys: str | None = None,
+    guardrails: str | None = None,
+    correction_method: str = MULTIPLE_TESTING_METHOD,
+):
+    """Batch-analyze many experiments stored in one long-format table.
 
-        return sanitize({
-            "status": "success",
-            "is_multivariant": is_multi,
-            "variant_count": len(df["variant"].unique()),
-            "primary_result": primary_result,
-            "guardrail_results": guardrail_results,
-        })
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    keys: comma separated experiment key columns (default: experiment_id).
+    Returns tidy experiments / variants / guardrails / continuous tables.
+    """
+    df, dataset_id = await _load_dataset(file, dataset_id)
+    kwargs = {
+        "key_columns": _parse_list_param(keys) or list(PORTFOLIO_KEY_COLUMNS),
+        "guardrail_columns": _parse_list_param(guardrails),
+        "correction_method": correction_method,
+    }
+
+    async def compute():
+        try:
+            result = await analysis_executor.run(_run_portfolio, df, **kwargs)
+            return {"dataset_id": dataset_id, **result}
+        except ExecutorSaturatedError:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await _cached_response(request, "portfolio", dataset_id, kwargs, compute)
+
+
+def _run_segments(df: pd.DataFrame, dimensions: list[str], **kwargs: Any) -> dict[str, Any]:
+    health = run_health_check(df, dimensions=dimensions)
+    result = analyze_segments(df, dimensions, **kwargs)
+    return {"status": "success", "health_result": health, **result.to_dict()}
+
+
+@app.post("/api/segments")
+async def api_segments(
+    request: Request,
+    dimensions: str,
+    file: UploadFile | None = File(None),
+    dataset_id: str | None = None,
+    guardrails: str | None = None,
+    correction_method: str = MULTIPLE_TESTING_METHOD,
+):
+    """Per-segment analysis of one experiment sliced by dimension columns.
 
+    dimensions: comma separated segment columns (e.g. country,platform).
+    Each row of ``experiments`` is one segment cell; p-values are corrected
+    across all segment x treatment comparisons.
+    """
+    dimension_columns = _parse_list_param(dimensions)
+    if not dimension_columns:
+        raise HTTPException(status_code=400, detail="At least one dimension column is required")
+
+    df, dataset_id = await _load_dataset(file, dataset_id)
+    kwargs = {
+        "guardrail_columns": _parse_list_param(guardrails),
+        "correction_method": correction_method,
+    }
+
+    async def compute():
+        try:
+            result = await analysis_executor.run(_run_segments, df, dimension_columns, **kwargs)
+            return {"dataset_id": dataset_id, "dimensions": dimension_columns, **result}
+        except ExecutorSaturatedError:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    params = {"dimensions": dimension_columns, **kwargs}
+    return await _cached_response(request, "segments", dataset_id, params, compute)
+
+
+async def _stream_report(df: pd.DataFrame, dataset_id: str, stages: list[str], options: ReportOptions):
+    """Yield SSE frames as report stages complete.
+
+    Stages whose inputs are ready run concurrently on the analysis pool, so
+    cheap stages (health, primary) are sent before the Bayesian simulation ends.
+    Events: start -> stage (one per stage, completion order) -> done | error.
+    """
+    yield sse_event("start", {
+        "dataset_id": dataset_id,
+        "stages": stages,
+        "is_multivariant": is_multivariant(df),
+        "variant_count": int(df["variant"].nunique()),
+    })
+
+    results: dict[str, Any] = {}
+    remaining = list(stages)
+    running: dict[asyncio.Future, str] = {}
+    try:
+        while remaining or running:
+            for stage in [s for s in remaining if all(d in results for d in stage_inputs(s, stages))]:
+                remaining.remove(stage)
+                task = asyncio.ensure_future(
+                    analysis_executor.run(run_stage, stage, df, dict(results), options)
+                )
+                running[task] = stage
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(finished, key=lambda t: stages.index(running[t])):
+                stage = running.pop(task)
+                try:
+                    results[stage] = task.result()
+                except ExecutorSaturatedError:
+                    yield sse_event("error", {
+                        "stage": stage,
+                        "detail": "Server is busy running other analyses. Please retry shortly.",
+                        "retry_after": ANALYSIS_RETRY_AFTER,
+                    })
+                    return
+                except Exception as e:
+                    yield sse_event("error", {"stage": stage, "detail": str(e)})
+                    return
+                yield sse_event("stage", {
+                    "stage": stage,
+                    "key": STAGE_RESULT_KEYS[stage],
+                    "result": results[stage],
+                })
+
+        yield sse_event("done", {"stages": [s for s in stages if s in results]})
+    finally:
+        # Client went away or a stage failed: drop stages still in flight
+        for task in running:
+            task.cancel()
+
+
+@app.get("/api/report/stream")
+@app.post("/api/report/stream")
+async def api_report_stream(
+    file: UploadFile | None = File(None),
+    dataset_id: str | None = None,
+    stages: str | None = None,
+    guardrails: str | None = None,
+    experiment_name: str = "Experiment",
+):
+    """Stream report stages as Server-Sent Events, each as soon as it finishes.
 
-@app.post("/api/continuous-metrics")
-async def api_continuous_metrics(file: UploadFile = File(...)):
-    """Analyze continuous metrics using Welch's t-test"""
-    if not file.filename or not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
-    
+    Same parameters as /api/report. Use GET with ``dataset_id`` for a browser
+    EventSource, or POST with a file upload.
+    """
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        selected_stages = resolve_stages(_parse_list_param(stages))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        is_multi = _is_multivariant(df)
+    df, dataset_id = await _load_dataset(file, dataset_id)
+    options = ReportOptions(
+        guardrail_columns=_parse_list_param(guardrails),
+        experiment_name=experiment_name,
+    )
+    return StreamingResponse(
+        _stream_report(df, dataset_id, selected_stages, options),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        if is_multi:
-            continuous_results = calculate_continuous_metrics_multivariant(df)
-        else:
-            continuous_results = calculate_continuous_metrics(df)
 
-        return sanitize({
-            "status": "success",
-            "is_multivariant": is_multi,
-            "continuous_results": continuous_results,
-        })
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+JOB_KINDS = ("report", "portfolio")
+"""Analyses that can be submitted through /api/jobs."""
 
+JOB_MAX_WAIT = 30.0
+"""Upper bound (seconds) on a single long-poll request."""
 
-@app.post("/api/bayesian-analysis")
-async def api_bayesian_analysis(file: UploadFile = File(...)):
-    """Perform Bayesian analysis (informational only)"""
-    if not file.filename or not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
-    
+
+def _report_job(report_progress, df: pd.DataFrame, stages: list[str], options: ReportOptions):
+    """Job body for kind="report"; publishes per-stage progress."""
+    report = run_report(df, stages=stages, options=options, progress=report_progress)
+    return {"status": "success", **report}
+
+
+def _portfolio_job(report_progress, df: pd.DataFrame, **kwargs: Any):
+    """Job body for kind="portfolio" (single vectorized pass, no intermediate progress)."""
+    return _run_portfolio(df, **kwargs)
+
+
+@app.post("/api/jobs", status_code=202)
+async def api_submit_job(
+    file: UploadFile | None = File(None),
+    dataset_id: str | None = None,
+    kind: str = "report",
+    stages: str | None = None,
+    guardrails: str | None = None,
+    experiment_name: str = "Experiment",
+    keys: str | None = None,
+    correction_method: str = MULTIPLE_TESTING_METHOD,
+):
+    """Submit a long-running analysis; poll GET /api/jobs/{job_id} for the result.
+
+    kind="report" takes the /api/report parameters, kind="portfolio" the
+    /api/portfolio parameters.
+    """
+    if kind not in JOB_KINDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown job kind: {kind}. Valid kinds: {', '.join(JOB_KINDS)}",
+        )
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        selected_stages = resolve_stages(_parse_list_param(stages))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        is_multi = _is_multivariant(df)
+    df, dataset_id = await _load_dataset(file, dataset_id)
 
-        if is_multi:
-            continuous_results = calculate_continuous_metrics_multivariant(df)
-            bayesian_insights = calculate_bayesian_insights_multivariant(
-                df, continuous_results
+    try:
+        if kind == "portfolio":
+            job = job_manager.submit(
+                kind,
+                _portfolio_job,
+                df,
+                key_columns=_parse_list_param(keys) or list(PORTFOLIO_KEY_COLUMNS),
+                guardrail_columns=_parse_list_param(guardrails),
+                correction_method=correction_method,
             )
         else:
-            continuous_results = calculate_continuous_metrics(df)
-            bayesian_insights = calculate_bayesian_insights(df, continuous_results)
+            job = job_manager.submit(
+                kind,
+                _report_job,
+                df,
+                selected_stages,
+                ReportOptions(
+                    guardrail_columns=_parse_list_param(guardrails),
+                    experiment_name=experiment_name,
+                ),
+            )
+    except JobQueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending jobs. Please retry shortly.",
+            headers={"Retry-After": str(ANALYSIS_RETRY_AFTER)},
+        )
 
-        return sanitize({
-            "status": "success",
-            "is_multivariant": is_multi,
-            "bayesian_insights": bayesian_insights,
-        })
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return SafeJSONResponse(
+        {**job.to_dict(), "dataset_id": dataset_id, "status_url": f"/api/jobs/{job.id}"},
+        status_code=202,
+    )
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_get_job(job_id: str, wait: float = 0.0):
+    """Job status, progress and (once finished) result.
+
+    wait: long-poll up to this many seconds for the job to finish (max 30).
+    """
+    try:
+        job = await job_manager.wait(job_id, timeout=min(max(wait, 0.0), JOB_MAX_WAIT))
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return SafeJSONResponse(job.to_dict())
 
 
 class DecisionMemoRequest(BaseModel):
@@ -282,7 +671,8 @@ class SequentialAnalysisRequest(BaseModel):
 async def api_sequential_analysis(request: SequentialAnalysisRequest):
     """Run sequential analysis for early stopping decision."""
     try:
-        result = analyze_sequential(
+        result = await analysis_executor.run(
+            analyze_sequential,
             control_users=request.control_users,
             control_conversions=request.control_conversions,
             treatment_users=request.treatment_users,
@@ -294,9 +684,11 @@ async def api_sequential_analysis(request: SequentialAnalysisRequest):
             boundary_type=request.boundary_type,
             previous_looks=request.previous_looks,
         )
-        return sanitize({"status": "success", **result})
+        return SafeJSONResponse({"status": "success", **result})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -309,12 +701,13 @@ async def api_sequential_boundaries(
 ):
     """Get boundary values for visualization/planning."""
     try:
-        boundaries = calculate_boundaries(
+        boundaries = await analysis_executor.run(
+            calculate_boundaries,
             max_looks=max_looks,
             alpha=alpha,
             boundary_type=boundary_type,
         )
-        return sanitize({
+        return SafeJSONResponse({
             "boundaries": boundaries,
             "config": {
                 "max_looks": max_looks,
@@ -324,6 +717,8 @@ async def api_sequential_boundaries(
         })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
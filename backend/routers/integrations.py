@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Path, Query
 from typing import Any
+import asyncio
+import hashlib
 import logging
-import pandas as pd
 from pydantic import BaseModel
 
 logger = logging.getLogger("experimentos")
@@ -9,14 +10,10 @@ logger = logging.getLogger("experimentos")
 from src.experimentos.integrations.registry import registry
 from src.experimentos.integrations.base import IntegrationError, ProviderNotFoundError, ProviderAuthError
 from src.experimentos.integrations.transform import to_experiment_df
-from src.experimentos.analysis import (
-    calculate_primary,
-    calculate_guardrails,
-    analyze_multivariant,
-    calculate_guardrails_multivariant,
-)
-from src.experimentos.config import MULTIPLE_TESTING_METHOD
-from backend.utils import sanitize
+from src.experimentos.report import ReportOptions, run_report
+from backend.caching import single_flight
+from backend.executor import ExecutorSaturatedError, analysis_executor
+from backend.utils import SafeJSONResponse
 
 router = APIRouter(
     prefix="/api/integrations",
@@ -45,12 +42,6 @@ class AnalysisResponse(BaseModel):
     primary_result: Any
     guardrail_results: Any = None
 
-
-def _is_multivariant(df: pd.DataFrame) -> bool:
-    """Auto-detect whether experiment data should use multi-variant analysis path."""
-    variants = df["variant"].unique()
-    return len(variants) > 2 or "treatment" not in variants
-
 @router.get("/{provider}/experiments", response_model=list[ExperimentResponse])
 async def list_experiments(
     provider: str = Path(..., description="Provider name (e.g., statsig, dummy)"),
@@ -90,58 +81,62 @@ async def analyze_experiment(
 ):
     """
     Fetch experiment data from provider and run analysis.
+
+    Concurrent identical requests (same provider, experiment, guardrails and
+    API key) share a single fetch + analysis.
     """
+    guardrail_cols = [c.strip() for c in guardrails.split(",")] if guardrails else None
+    guardrail_cols = [c for c in guardrail_cols or [] if c]
+
+    # The key is a hash; the raw API key never leaves this request
+    key_material = "\x1f".join([
+        "integrations-analyze",
+        provider,
+        experiment_id,
+        ",".join(guardrail_cols),
+        hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+    ])
+    flight_key = hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    payload = await single_flight.do(
+        flight_key,
+        lambda: _analyze_experiment(provider, experiment_id, guardrail_cols, api_key),
+    )
+    # Serialize numpy types / NaN in a single pass
+    return SafeJSONResponse(payload)
+
+
+async def _analyze_experiment(
+    provider: str, experiment_id: str, guardrail_cols: list[str], api_key: str
+) -> dict[str, Any]:
     try:
         integration = registry.get_provider(provider, api_key)
         
-        # 1. Fetch data
-        result = integration.fetch_experiment(experiment_id)
+        # 1. Fetch data (network I/O; keep the event loop free for coalesced waiters)
+        result = await asyncio.to_thread(integration.fetch_experiment, experiment_id)
         
         # 2. Transform to DataFrame
         df = to_experiment_df(result)
         
         # 3. Analyze
-        # If no explicit guardrails asked, auto-detect all extra metric columns.
-        guardrail_cols = [c.strip() for c in guardrails.split(",")] if guardrails else None
-        guardrail_cols = [c for c in guardrail_cols or [] if c]
-        extra_cols = [c for c in df.columns if c not in ["variant", "users", "conversions"]]
-        if not guardrail_cols and extra_cols:
-            guardrail_cols = extra_cols
-
-        is_multi = _is_multivariant(df)
-        if is_multi:
-            primary_result = analyze_multivariant(df, MULTIPLE_TESTING_METHOD)
-            primary_result["is_multivariant"] = True
+        # If no explicit guardrails asked, the guardrail stage auto-detects them
+        # from the cached ExperimentSchema (same classification as uploads).
+        report = await analysis_executor.run(
+            run_report,
+            df,
+            stages=["primary", "guardrails"],
+            options=ReportOptions(guardrail_columns=guardrail_cols or None),
+        )
 
-            best_variant = None
-            best_lift = -float("inf")
-            for v_name, v_data in primary_result.get("variants", {}).items():
-                if v_data.get("is_significant_corrected") and v_data["absolute_lift"] > best_lift:
-                    best_lift = v_data["absolute_lift"]
-                    best_variant = v_name
-            primary_result["best_variant"] = best_variant
-
-            guardrail_results = calculate_guardrails_multivariant(
-                df,
-                guardrail_columns=guardrail_cols or None,
-            )
-        else:
-            primary_result = calculate_primary(df)
-            guardrail_results = calculate_guardrails(
-                df,
-                guardrail_columns=guardrail_cols or None,
-            )
-        
-        # Sanitize for JSON response (numpy types)
-        return sanitize({
+        return {
             "status": "success",
             "experiment_id": experiment_id,
             "provider": provider,
-            "is_multivariant": is_multi,
-            "variant_count": len(df["variant"].unique()),
-            "primary_result": primary_result,
-            "guardrail_results": guardrail_results
-        })
+            "is_multivariant": report["is_multivariant"],
+            "variant_count": report["variant_count"],
+            "primary_result": report["primary_result"],
+            "guardrail_results": report["guardrail_results"]
+        }
 
     except ProviderNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -149,6 +144,8 @@ async def analyze_experiment(
         raise HTTPException(status_code=401, detail=str(e))
     except IntegrationError as e:
         raise HTTPException(status_code=502, detail=f"Integration Error: {str(e)}")
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         logger.error("Error analyzing experiment: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -1,20 +1,76 @@
 import json
+import math
+from dataclasses import is_dataclass
+from typing import Any
+
 import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dataclasses go through sanitize -> to_dict() so typed results keep the public dict shape
+_ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+
+def sanitize(obj: Any) -> Any:
+    """Convert numpy types to native Python types and replace NaN/Inf with None.
+
+    Single recursive walk; no intermediate JSON text is produced. Result
+    dataclasses (anything with ``to_dict``) are serialized via that method.
+    """
+    if isinstance(obj, dict):
+        return {
+            (k if isinstance(k, str) else str(sanitize(k))): sanitize(v) for k, v in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [sanitize(v) for v in obj]
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, (float, np.floating)):
+        value = float(obj)
+        return value if math.isfinite(value) else None
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    if isinstance(obj, np.ndarray):
+        return sanitize(obj.tolist())
+    if is_dataclass(obj) and hasattr(obj, "to_dict"):
+        return sanitize(obj.to_dict())
+    return obj
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize *obj* to RFC-compliant JSON bytes (NaN/Inf -> null).
+
+    Uses orjson when installed (numpy-aware, maps non-finite floats to null
+    natively) and falls back to a single sanitize walk + stdlib json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=sanitize, option=_ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            pass  # e.g. ints beyond 64 bits or non-contiguous arrays
+    return json.dumps(
+        sanitize(obj), ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class SafeJSONResponse(JSONResponse):
+    """JSONResponse that safely handles NaN/Inf and numpy types in one encoding pass.
+
+    Endpoints can return this directly with raw analysis results, which skips
+    FastAPI's own jsonable_encoder walk as well.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
 
-class NumpyEncoder(json.JSONEncoder):
-    """JSON encoder that handles numpy types."""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
-
-def sanitize(obj):
-    """Convert numpy types to native Python types and replace NaN/Inf with None."""
-    text = json.dumps(obj, cls=NumpyEncoder, allow_nan=True)
-    return json.loads(text, parse_constant=lambda _: None)
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Events frame with a JSON payload."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
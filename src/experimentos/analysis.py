@@ -15,18 +15,22 @@ except ImportError:
 from scipy.stats import chi2_contingency
 from typing import Any
 import logging
-import itertools
 
 from .config import (
     GUARDRAIL_WORSENED_THRESHOLD, 
     GUARDRAIL_SEVERE_THRESHOLD,
     MULTIPLE_TESTING_METHOD
 )
-from .continuous_analysis import calculate_continuous_lift
+from .continuous_analysis import continuous_lift_matrix, ratio_lift_matrix
+from .guardrails import detect_guardrail_columns, evaluate_guardrails
+from .kernels import agresti_caffo_interval, proportions_ztest_2samp, safe_rate
+from .moments import moment_arrays
+from .results import ArmStats, BayesianResult, ContinuousResult, PrimaryResult
+from .schema import ExperimentSchema, resolve_schema
 from .bayesian import (
     calculate_beta_binomial,
-    calculate_continuous_bayes,
     calculate_beta_binomial_multivariant,
+    continuous_bayes_arrays,
 )
 
 logger = logging.getLogger("experimentos")
@@ -89,6 +93,12 @@ def _correct_p_values(p_values: list[float], method: str = MULTIPLE_TESTING_METH
         
     return p_values
 
+def is_multivariant(df: pd.DataFrame) -> bool:
+    """Auto-detect whether the experiment is multi-variant (3+ variants or non-standard names)."""
+    variants = df["variant"].unique()
+    return len(variants) > 2 or "treatment" not in variants
+
+
 def analyze_multivariant(df: pd.DataFrame, correction_method: str = MULTIPLE_TESTING_METHOD) -> dict[str, Any]:
     """
     Multi-variant Primary Metric Analysis.
@@ -122,18 +132,14 @@ def analyze_multivariant(df: pd.DataFrame, correction_method: str = MULTIPLE_TES
     if len(df) < 2:
         return results
 
+    # Column arrays; every statistic below is computed in closed form over them
+    names = df["variant"].tolist()
+    users = df["users"].to_numpy(dtype=np.int64)
+    conversions = df["conversions"].to_numpy(dtype=np.int64)
+    rates = safe_rate(conversions, users)
+
     try:
-        # Contingency table logic...
-        contingency_table = []
-        variant_names = []
-        
-        for _, row in df.iterrows():
-            conv = int(row["conversions"])
-            users = int(row["users"])
-            non_conv = max(0, users - conv)
-            contingency_table.append([conv, non_conv])
-            variant_names.append(row["variant"])
-            
+        contingency_table = np.column_stack([conversions, np.maximum(0, users - conversions)])
         chi2, overall_p, dof, expected = chi2_contingency(contingency_table)
 
         results["overall"] = {
@@ -148,16 +154,13 @@ def analyze_multivariant(df: pd.DataFrame, correction_method: str = MULTIPLE_TES
         results["overall"] = {"error": str(e), "p_value": 1.0}
 
     # 2. Pairwise vs Control & Correction
-    control_rows = df[df["variant"] == "control"]
-    
-    # Data collection for pairwise
-    treatments: list[dict[str, Any]] = []
+    is_control = np.array([name == "control" for name in names])
     
-    if not control_rows.empty:
-        control_row = control_rows.iloc[0]
-        users_c = int(control_row["users"])
-        conv_c = int(control_row["conversions"])
-        rate_c = conv_c / users_c if users_c > 0 else 0.0
+    if is_control.any():
+        c = int(np.argmax(is_control))
+        users_c = int(users[c])
+        conv_c = int(conversions[c])
+        rate_c = float(rates[c])
         
         results["control_stats"] = {
             "users": users_c,
@@ -165,117 +168,70 @@ def analyze_multivariant(df: pd.DataFrame, correction_method: str = MULTIPLE_TES
             "rate": rate_c
         }
 
-        # Calculate vs Control first
-        vs_control_p_values: list[float] = []
-        vs_control_keys: list[str] = []
-        
-        treatment_df = df[df["variant"] != "control"]
-        
-        for _, row in treatment_df.iterrows():
-            v_name = row["variant"]
-            users_t = int(row["users"])
-            conv_t = int(row["conversions"])
-            rate_t = conv_t / users_t if users_t > 0 else 0.0
-            
-            abs_lift = rate_t - rate_c
-            rel_lift = ((rate_t / rate_c) - 1) if rate_c > 0 else None
-            
-            p_val = 1.0
-            ci_lower, ci_upper = 0.0, 0.0
+        # All treatments vs control at once
+        t_idx = np.flatnonzero(~is_control)
+        users_t, conv_t, rates_t = users[t_idx], conversions[t_idx], rates[t_idx]
+        testable = (users_t > 0) & (users_c > 0)
 
-            if users_c > 0 and users_t > 0:
-                try:
-                    counts = np.array([conv_t, conv_c])
-                    nobs = np.array([users_t, users_c])
-                    _, p_val_raw = proportions_ztest(count=counts, nobs=nobs, alternative='two-sided')
-                    p_val = float(p_val_raw)
-                    ci_lower, ci_upper = confint_proportions_2indep(
-                        conv_t, users_t, conv_c, users_c, compare='diff', alpha=0.05, method='agresti-caffo'
-                    )
-                except Exception:
-                    pass
-
-            vs_control_p_values.append(float(p_val))
-            vs_control_keys.append(v_name)
-            
-            results["variants"][v_name] = {
-                "users": users_t,
-                "conversions": conv_t,
+        _, p_raw = proportions_ztest_2samp(conv_t, users_t, conv_c, users_c)
+        ci_low, ci_high = agresti_caffo_interval(conv_t, users_t, conv_c, users_c)
+        p_vals = np.where(testable, p_raw, 1.0)
+        ci_low = np.where(testable, ci_low, 0.0)
+        ci_high = np.where(testable, ci_high, 0.0)
+
+        vs_control_p_values = p_vals.tolist()
+        corrected_p_vals = _correct_p_values(vs_control_p_values, correction_method)
+
+        for i, t in enumerate(t_idx):
+            rate_t = float(rates_t[i])
+            p_val = vs_control_p_values[i]
+            p_corr = corrected_p_vals[i]
+            results["variants"][names[t]] = {
+                "users": int(users_t[i]),
+                "conversions": int(conv_t[i]),
                 "rate": rate_t,
-                "absolute_lift": abs_lift,
-                "relative_lift": rel_lift,
-                "ci_95": [ci_lower, ci_upper],
+                "absolute_lift": rate_t - rate_c,
+                "relative_lift": ((rate_t / rate_c) - 1) if rate_c > 0 else None,
+                "ci_95": [float(ci_low[i]), float(ci_high[i])],
                 "p_value": p_val,
-                # corrected p-value will be updated momentarily
-                "is_significant": p_val < 0.05 
+                "is_significant": p_val < 0.05,
+                "p_value_corrected": p_corr,
+                "is_significant_corrected": p_corr < 0.05,
             }
-            
-        # Apply correction to Comparison vs Control Family
-        corrected_p_vals = _correct_p_values(vs_control_p_values, correction_method)
-        
-        for i, v_name in enumerate(vs_control_keys):
-            p_corr = corrected_p_vals[i]
-            results["variants"][v_name]["p_value_corrected"] = p_corr
-            # Update significance based on corrected p-value? 
-            # Usually significance is p_corr < alpha. Let's provide a specific flag.
-            results["variants"][v_name]["is_significant_corrected"] = p_corr < 0.05
 
     # 3. All Pairwise Comparisons (Optional Extended Analysis)
-    all_pairs_p_values: list[float] = []
-    all_pairs_meta: list[dict[str, Any]] = []  # Stores pair comparison results
-    
-    # We need a predictable list of variant dicts
-    # Convert df to list of dicts
-    variant_list = []
-    for _, row in df.iterrows():
-        variant_list.append({
-            "name": row["variant"],
-            "users": int(row["users"]),
-            "conversions": int(row["conversions"]),
-            "rate": int(row["conversions"]) / int(row["users"]) if int(row["users"]) > 0 else 0.0
-        })
-        
-    for var_a, var_b in itertools.combinations(variant_list, 2):
-        # Calculate stats A vs B (diff = B - A usually, or directionless)
-        # We'll treat var_a as baseline for 'lift' purposes directionally, but test is symmetric
-        
-        u_a, c_a, r_a = var_a["users"], var_a["conversions"], var_a["rate"]
-        u_b, c_b, r_b = var_b["users"], var_b["conversions"], var_b["rate"]
-        
-        abs_lift = r_b - r_a
-        
-        p_val = 1.0
-        if u_a > 0 and u_b > 0:
-            try:
-                counts = np.array([c_b, c_a])
-                nobs = np.array([u_b, u_a])
-                _, p_val_raw = proportions_ztest(count=counts, nobs=nobs, alternative='two-sided')
-                p_val = float(p_val_raw)
-            except Exception:
-                pass
-                
-        all_pairs_p_values.append(float(p_val))
-        all_pairs_meta.append({
-            "variant_a": var_a["name"],
-            "variant_b": var_b["name"],
-            "absolute_lift": abs_lift,
-            "p_value": p_val
-        })
-        
+    # Upper-triangle indices give the same (a, b) order as itertools.combinations
+    a_idx, b_idx = np.triu_indices(len(names), k=1)
+    _, pair_p_raw = proportions_ztest_2samp(
+        conversions[b_idx], users[b_idx], conversions[a_idx], users[a_idx]
+    )
+    pair_testable = (users[a_idx] > 0) & (users[b_idx] > 0)
+    all_pairs_p_values = np.where(pair_testable, pair_p_raw, 1.0).tolist()
+    all_pairs_lift = (rates[b_idx] - rates[a_idx]).tolist()
+
     # Apply correction to All Pairs Family
     all_pairs_corrected = _correct_p_values(all_pairs_p_values, correction_method)
-    
-    for i, meta in enumerate(all_pairs_meta):
-        meta["p_value_corrected"] = all_pairs_corrected[i]
-        meta["is_significant_corrected"] = all_pairs_corrected[i] < 0.05
-        results["all_pairs"].append(meta)
+
+    results["all_pairs"] = [
+        {
+            "variant_a": names[a],
+            "variant_b": names[b],
+            "absolute_lift": lift,
+            "p_value": p_val,
+            "p_value_corrected": p_corr,
+            "is_significant_corrected": p_corr < 0.05,
+        }
+        for a, b, lift, p_val, p_corr in zip(
+            a_idx.tolist(), b_idx.tolist(), all_pairs_lift, all_pairs_p_values, all_pairs_corrected
+        )
+    ]
         
     return results
 
 
 def calculate_primary(df: pd.DataFrame) -> dict[str, Any]:
     """
-    Primary Metric (전환율) 분석
+    Primary Metric (전환율) 분석 (dict 형태, primary_result()의 호환 어댑터)
     
     Args:
         df: 업로드된 데이터프레임 (variant, users, conversions 컬럼 필수)
@@ -291,6 +247,19 @@ def calculate_primary(df: pd.DataFrame) -> dict[str, Any]:
             "is_significant": bool
         }
     """
+    return primary_result(df).to_dict()
+
+
+def primary_result(df: pd.DataFrame) -> PrimaryResult:
+    """
+    Primary Metric (전환율) 분석
+
+    Args:
+        df: 업로드된 데이터프레임 (variant, users, conversions 컬럼 필수)
+
+    Returns:
+        PrimaryResult
+    """
     # 데이터 추출
     control_row = df[df["variant"] == "control"].iloc[0]
     treatment_row = df[df["variant"] == "treatment"].iloc[0]
@@ -345,25 +314,17 @@ def calculate_primary(df: pd.DataFrame) -> dict[str, Any]:
             logger.warning(f"CI 계산 실패: {e}")
             ci_lower, ci_upper = 0.0, 0.0
             
-    is_significant = p_value < 0.05
-    
-    return {
-        "control": {
-            "users": users_c,
-            "conversions": conv_c,
-            "rate": rate_c
-        },
-        "treatment": {
-            "users": users_t,
-            "conversions": conv_t,
-            "rate": rate_t
-        },
-        "absolute_lift": abs_lift,
-        "relative_lift": rel_lift,
-        "ci_95": [ci_lower, ci_upper],
-        "p_value": p_value,
-        "is_significant": is_significant
-    }
+    p_value = float(p_value)
+    return PrimaryResult(
+        control=ArmStats(users=users_c, conversions=conv_c, rate=rate_c),
+        treatment=ArmStats(users=users_t, conversions=conv_t, rate=rate_t),
+        absolute_lift=abs_lift,
+        relative_lift=rel_lift,
+        ci_lower=float(ci_lower),
+        ci_upper=float(ci_upper),
+        p_value=p_value,
+        is_significant=p_value < 0.05,
+    )
 
 
 def calculate_guardrails(
@@ -396,144 +357,62 @@ def calculate_guardrails(
     """
     # Guardrail 컬럼 자동 탐지
     if guardrail_columns is None:
-        required_cols = {"variant", "users", "conversions", "metric_sum", "metric_sum_sq", "n"}
-        guardrail_columns = [
-            col for col in df.columns 
-            if col not in required_cols 
-            and not col.endswith("_sum") 
-            and not col.endswith("_sum_sq")
-        ]
+        guardrail_columns = detect_guardrail_columns(df)
     
     if not guardrail_columns:
         return []
     
-    control_row = df[df["variant"] == "control"].iloc[0]
-    treatment_row = df[df["variant"] == "treatment"].iloc[0]
-    
-    users_c = int(control_row["users"])
-    users_t = int(treatment_row["users"])
-    
-    results = []
-    
-    for col in guardrail_columns:
-        try:
-            count_c = int(control_row[col])
-            count_t = int(treatment_row[col])
-            
-            # Rate 계산
-            rate_c = count_c / users_c if users_c > 0 else 0.0
-            rate_t = count_t / users_t if users_t > 0 else 0.0
-            
-            # Delta (Treatment - Control)
-            delta = rate_t - rate_c
-            
-            # Worsened 판정 (delta >= abs_threshold)
-            worsened = delta >= abs_threshold
-            
-            # Severe 판정
-            severe = delta >= severe_threshold
-            
-            # (선택) P-value 계산
-            try:
-                counts = np.array([count_t, count_c])
-                nobs = np.array([users_t, users_c])
-                _, p_value = proportions_ztest(count=counts, nobs=nobs, alternative='two-sided')
-            except (ValueError, ZeroDivisionError) as e:
-                # Handle expected errors (e.g., zero users, invalid counts)
-                logger.warning(f"P-value calculation failed for '{col}': {e}")
-                p_value = 1.0
-            
-            # Relative lift: None if control rate is 0 (consistent with Primary)
-            if rate_c > 0:
-                rel_lift = (rate_t / rate_c) - 1
-            else:
-                rel_lift = None
-            
-            results.append({
-                "name": col,
-                "control_count": count_c,
-                "treatment_count": count_t,
-                "control_rate": rate_c,
-                "treatment_rate": rate_t,
-                "delta": delta,
-                "relative_lift": rel_lift,  # Added for schema consistency
-                "worsened": worsened,
-                "severe": severe,
-                "p_value": p_value
-            })
-        
-        except (ValueError, TypeError, KeyError) as e:
-            # Data structure or type errors - mark as error state
-            logger.warning(f"Guardrail '{col}' 분석 실패 (데이터 오류): {e}")
-            results.append({
-                "name": col,
-                "control_count": 0,
-                "treatment_count": 0,
-                "control_rate": 0.0,
-                "treatment_rate": 0.0,
-                "delta": 0.0,
-                "relative_lift": None,  # Added for schema consistency
-                "worsened": False,
-                "severe": False,
-                "p_value": 1.0,
-                "error": str(e)
-            })
-        except Exception as e:
-            # Unexpected errors - log and re-raise for visibility
-            logger.error(f"Guardrail '{col}' 예상치 못한 오류: {e}")
-            raise
+    variants = df["variant"].to_numpy()
+    control_index = int(np.flatnonzero(variants == "control")[0])
+    treatment_index = int(np.flatnonzero(variants == "treatment")[0])
+    treatment_mask = np.zeros(len(df), dtype=bool)
+    treatment_mask[treatment_index] = True
     
-    return results
+    # 모든 guardrail을 한 번에 평가하고 응답 형태로만 변환
+    matrix = evaluate_guardrails(
+        df, guardrail_columns, treatment_mask, control_index, abs_threshold, severe_threshold
+    )
+    return matrix.records(0)
 
 
 def calculate_continuous_metrics(df: pd.DataFrame) -> list[dict[str, Any]]:
     """
     Continuous Metric 분석 Orchestrator
-    _sum, _sum_sq 컬럼을 탐지하여 분석 수행
+    ExperimentSchema의 _sum/_sum_sq 또는 _mean/_m2 쌍(per-user 평균)과 ratio metric을 분석
+    (짝이 없는 컬럼은 제외, validate_schema가 보고)
     """
     results: list[dict[str, Any]] = []
 
-    # Identify continuous metrics (look for _sum)
-    metric_names = [
-        col[:-4] for col in df.columns 
-        if col.endswith("_sum") and col != "metric_sum"
-    ]
-    
-    if not metric_names:
+    schema = resolve_schema(df)
+    if not schema.continuous and not schema.ratio_metrics:
         return results
         
-    control_row = df[df["variant"] == "control"].iloc[0]
-    treatment_row = df[df["variant"] == "treatment"].iloc[0]
-    
-    for metric in metric_names:
-        sum_col = f"{metric}_sum"
-        sum_sq_col = f"{metric}_sum_sq"
-        
-        # Determine N (default to users)
-        # In a fuller implementation, could look for {metric}_n or similar
-        # For this MVP, we use 'users' as n (Revenue per User case)
-        n_c = int(control_row["users"])
-        n_t = int(treatment_row["users"])
-        
-        control_stats = {
-            "sum": float(control_row[sum_col]),
-            "sum_sq": float(control_row[sum_sq_col]),
-            "n": n_c
-        }
-        
-        treatment_stats = {
-            "sum": float(treatment_row[sum_col]),
-            "sum_sq": float(treatment_row[sum_sq_col]),
-            "n": n_t
-        }
-        
-        result = calculate_continuous_lift(control_stats, treatment_stats, metric)
-        if result["is_valid"]:
-            results.append(result)
-            
+    variants = df["variant"].to_numpy()
+    control_index = int(np.flatnonzero(variants == "control")[0])
+    treatment_index = int(np.flatnonzero(variants == "treatment")[0])
+
+    (row,) = _continuous_matrix(df, schema, np.array([treatment_index]), control_index)
+    results = [r.to_dict() for r in row if r.is_valid]
     return results
 
 
+def _continuous_matrix(
+    df: pd.DataFrame,
+    schema: ExperimentSchema,
+    treatment_rows: np.ndarray,
+    control_index: int,
+) -> list[list[ContinuousResult]]:
+    """[treatment 순서][per-user 평균 metric..., ratio metric...] 결과"""
+    matrix: list[list[ContinuousResult]] = [[] for _ in treatment_rows]
+    if schema.continuous:
+        for row, results in zip(matrix, continuous_lift_matrix(df, list(schema.continuous), treatment_rows, control_index)):
+            row.extend(results)
+    if schema.ratio_metrics:
+        for row, results in zip(matrix, ratio_lift_matrix(df, list(schema.ratio_metrics), treatment_rows, control_index)):
+            row.extend(results)
+    return matrix
+
+
 def calculate_guardrails_multivariant(
     df: pd.DataFrame,
     guardrail_columns: list[str] | None = None,
@@ -555,13 +434,7 @@ def calculate_guardrails_multivariant(
     """
     # Guardrail 컬럼 자동 탐지
     if guardrail_columns is None:
-        required_cols = {"variant", "users", "conversions", "metric_sum", "metric_sum_sq", "n"}
-        guardrail_columns = [
-            col for col in df.columns
-            if col not in required_cols
-            and not col.endswith("_sum")
-            and not col.endswith("_sum_sq")
-        ]
+        guardrail_columns = detect_guardrail_columns(df)
 
     result: dict[str, Any] = {
         "by_variant": {},
@@ -573,99 +446,25 @@ def calculate_guardrails_multivariant(
     if not guardrail_columns:
         return result
 
-    control_rows = df[df["variant"] == "control"]
-    if control_rows.empty:
+    is_control = df["variant"].to_numpy() == "control"
+    if not is_control.any():
         return result
 
-    control_row = control_rows.iloc[0]
-    users_c = int(control_row["users"])
-    treatment_df = df[df["variant"] != "control"]
-
-    # Track worst delta per guardrail for summary
-    guardrail_worst: dict[str, dict[str, Any]] = {}
-
-    for _, t_row in treatment_df.iterrows():
-        v_name = str(t_row["variant"])
-        users_t = int(t_row["users"])
-        variant_guardrails: list[dict[str, Any]] = []
-
-        for col in guardrail_columns:
-            try:
-                count_c = int(control_row[col])
-                count_t = int(t_row[col])
-
-                rate_c = count_c / users_c if users_c > 0 else 0.0
-                rate_t = count_t / users_t if users_t > 0 else 0.0
-                delta = rate_t - rate_c
-
-                worsened = delta >= abs_threshold
-                severe = delta >= severe_threshold
-
-                try:
-                    counts = np.array([count_t, count_c])
-                    nobs = np.array([users_t, users_c])
-                    _, p_value = proportions_ztest(count=counts, nobs=nobs, alternative="two-sided")
-                except (ValueError, ZeroDivisionError):
-                    p_value = 1.0
-
-                rel_lift = (rate_t / rate_c) - 1 if rate_c > 0 else None
-
-                g_result = {
-                    "name": col,
-                    "variant": v_name,
-                    "control_count": count_c,
-                    "treatment_count": count_t,
-                    "control_rate": rate_c,
-                    "treatment_rate": rate_t,
-                    "delta": delta,
-                    "relative_lift": rel_lift,
-                    "worsened": worsened,
-                    "severe": severe,
-                    "p_value": float(p_value),
-                }
-                variant_guardrails.append(g_result)
-
-                if severe:
-                    result["any_severe"] = True
-                if worsened:
-                    result["any_worsened"] = True
-
-                # Track worst delta per guardrail metric
-                if col not in guardrail_worst or delta > guardrail_worst[col]["worst_delta"]:
-                    guardrail_worst[col] = {
-                        "name": col,
-                        "worst_variant": v_name,
-                        "worst_delta": delta,
-                        "severe": severe,
-                        "worsened": worsened,
-                    }
-                else:
-                    # Update flags if any variant is worse
-                    if severe:
-                        guardrail_worst[col]["severe"] = True
-                    if worsened:
-                        guardrail_worst[col]["worsened"] = True
-
-            except (ValueError, TypeError, KeyError) as e:
-                logger.warning(f"Guardrail '{col}' 분석 실패 for {v_name}: {e}")
-                variant_guardrails.append({
-                    "name": col,
-                    "variant": v_name,
-                    "control_count": 0,
-                    "treatment_count": 0,
-                    "control_rate": 0.0,
-                    "treatment_rate": 0.0,
-                    "delta": 0.0,
-                    "relative_lift": None,
-                    "worsened": False,
-                    "severe": False,
-                    "p_value": 1.0,
-                    "error": str(e),
-                })
-
-        result["by_variant"][v_name] = variant_guardrails
-
-    result["summary"] = list(guardrail_worst.values())
+    # variants × guardrails 전체를 한 번에 평가
+    matrix = evaluate_guardrails(
+        df,
+        guardrail_columns,
+        ~is_control,
+        int(np.argmax(is_control)),
+        abs_threshold,
+        severe_threshold,
+    )
+
+    for i, v_name in enumerate(matrix.variants):
+        result["by_variant"][v_name] = matrix.records(i, include_variant=True)
+    result["any_severe"] = matrix.any_severe
+    result["any_worsened"] = matrix.any_worsened
+    result["summary"] = matrix.summary()
     return result
 
 
@@ -673,56 +472,32 @@ def calculate_continuous_metrics_multivariant(df: pd.DataFrame) -> dict[str, Any
     """
     Multi-variant Continuous Metric 분석.
 
-    각 variant vs control에 대해 Welch t-test를 수행합니다.
+    각 variant vs control에 대해 Welch t-test(ratio metric은 delta method)를 수행합니다.
 
     Returns:
         dict: {"by_variant": {"variant_a": [metric results], ...}}
     """
     results: dict[str, Any] = {"by_variant": {}}
 
-    # Identify continuous metrics (look for _sum)
-    metric_names = [
-        col[:-4] for col in df.columns
-        if col.endswith("_sum") and col != "metric_sum"
-    ]
-
-    if not metric_names:
+    schema = resolve_schema(df)
+    if not schema.continuous and not schema.ratio_metrics:
         return results
 
-    control_rows = df[df["variant"] == "control"]
-    if control_rows.empty:
+    is_control = df["variant"].to_numpy() == "control"
+    if not is_control.any():
         return results
 
-    control_row = control_rows.iloc[0]
-    treatment_df = df[df["variant"] != "control"]
-
-    for _, t_row in treatment_df.iterrows():
-        v_name = str(t_row["variant"])
+    # All treatments × metrics in one Welch (and one delta-method) pass
+    treatment_rows = np.flatnonzero(~is_control)
+    matrix = _continuous_matrix(df, schema, treatment_rows, int(np.argmax(is_control)))
+    for row, variant_results in zip(treatment_rows, matrix):
+        v_name = str(df["variant"].iat[row])
         variant_metrics: list[dict[str, Any]] = []
-
-        for metric in metric_names:
-            sum_col = f"{metric}_sum"
-            sum_sq_col = f"{metric}_sum_sq"
-
-            n_c = int(control_row["users"])
-            n_t = int(t_row["users"])
-
-            control_stats = {
-                "sum": float(control_row[sum_col]),
-                "sum_sq": float(control_row[sum_sq_col]),
-                "n": n_c,
-            }
-            treatment_stats = {
-                "sum": float(t_row[sum_col]),
-                "sum_sq": float(t_row[sum_sq_col]),
-                "n": n_t,
-            }
-
-            result = calculate_continuous_lift(control_stats, treatment_stats, metric)
-            if result["is_valid"]:
-                result["variant"] = v_name
-                variant_metrics.append(result)
-
+        for r in variant_results:
+            if r.is_valid:
+                record = r.to_dict()
+                record["variant"] = v_name
+                variant_metrics.append(record)
         results["by_variant"][v_name] = variant_metrics
 
     return results
@@ -771,36 +546,13 @@ def calculate_bayesian_insights_multivariant(
     except Exception as e:
         logger.warning(f"Multi-variant Bayesian conversion failed: {e}")
 
-    # 2. Continuous Metrics per variant
+    # 2. Continuous Metrics per variant (variant × metric 한 번에)
     if continuous_results and continuous_results.get("by_variant"):
-        for v_name, metrics in continuous_results["by_variant"].items():
-            variant_bayes: dict[str, Any] = {}
-            for res in metrics:
-                metric = res["metric_name"]
-                sum_col = f"{metric}_sum"
-                sum_sq_col = f"{metric}_sum_sq"
-
-                t_rows = df[df["variant"] == v_name]
-                if t_rows.empty:
-                    continue
-                t_row = t_rows.iloc[0]
-
-                try:
-                    c_stats = {
-                        "sum": float(control_row[sum_col]),
-                        "sum_sq": float(control_row[sum_sq_col]),
-                        "n": int(control_row["users"]),
-                    }
-                    t_stats = {
-                        "sum": float(t_row[sum_col]),
-                        "sum_sq": float(t_row[sum_sq_col]),
-                        "n": int(t_row["users"]),
-                    }
-                    variant_bayes[metric] = calculate_continuous_bayes(c_stats, t_stats)
-                except Exception as e:
-                    logger.warning(f"Bayesian continuous failed for {metric}/{v_name}: {e}")
-
-            insights["continuous"]["by_variant"][v_name] = variant_bayes
+        requested = {
+            v_name: [res["metric_name"] for res in metrics if res.get("metric_type") != "ratio"]
+            for v_name, metrics in continuous_results["by_variant"].items()
+        }
+        insights["continuous"]["by_variant"] = _continuous_bayes_by_variant(df, requested)
 
     return insights
 
@@ -833,33 +585,63 @@ def calculate_bayesian_insights(
         
     # 2. Continuous Metrics
     if continuous_results:
-        for res in continuous_results:
-            metric = res["metric_name"]
-            try:
-                # Reconstruct sufficient stats roughly from means/n (or pass them in if we wanted to be cleaner)
-                # But here we assume 'n' matches 'users' as per calculate_continuous_metrics assumptions
-                
-                # Check for zero variance edge cases handled in continuous_analysis
-                # If result was valid, we can compute Bayes
-                
-                # We need sum info again. Let's just grab from DF for simplicity.
-                sum_col = f"{metric}_sum"
-                sum_sq_col = f"{metric}_sum_sq"
-                
-                c_stats = {
-                    "sum": float(control_row[sum_col]),
-                    "sum_sq": float(control_row[sum_sq_col]),
-                    "n": int(control_row["users"])
-                }
-                t_stats = {
-                    "sum": float(treatment_row[sum_col]),
-                    "sum_sq": float(treatment_row[sum_sq_col]),
-                    "n": int(treatment_row["users"])
-                }
-                
-                insights["continuous"][metric] = calculate_continuous_bayes(c_stats, t_stats)
-            except Exception as e:
-                logger.warning(f"Bayesian continuous analysis failed for {metric}: {e}")
+        requested = {
+            "treatment": [res["metric_name"] for res in continuous_results if res.get("metric_type") != "ratio"]
+        }
+        insights["continuous"] = _continuous_bayes_by_variant(df, requested)["treatment"]
                 
     return insights
 
+
+def _continuous_bayes_by_variant(
+    df: pd.DataFrame,
+    requested: dict[str, list[str]],
+) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    control 대비 {variant: [metric, ...]} posterior 비교를 한 번의 배열 계산으로
+
+    variant별 첫 행의 (n, mean, M2)를 moment_arrays로 한 번 읽고 continuous_bayes_arrays에
+    (variant, metric) 행렬 그대로 넣습니다. ratio metric(per-user posterior 없음)과
+    통계량이 숫자가 아닌 셀은 건너뜁니다.
+    """
+    out: dict[str, dict[str, dict[str, Any]]] = {v_name: {} for v_name in requested}
+    schema = resolve_schema(df)
+    firsts = df.drop_duplicates("variant")
+    variants = firsts["variant"].tolist()
+    names = [v_name for v_name in requested if v_name in variants]
+    metrics = list(dict.fromkeys(m for v_name in names for m in requested[v_name]))
+    unknown = [m for m in metrics if m not in schema.continuous]
+    for metric in unknown:
+        logger.warning(f"Bayesian continuous analysis skipped for {metric}: no sufficient statistics")
+    metrics = [m for m in metrics if m not in unknown]
+    if "control" not in variants or not names or not metrics:
+        return out
+
+    try:
+        n, mean, m2 = moment_arrays(firsts, metrics, schema)
+        c = variants.index("control")
+        rows = [variants.index(v_name) for v_name in names]
+        n_t = n[rows][:, None]
+        prob, loss = continuous_bayes_arrays(n[c], mean[c], m2[c], n_t, mean[rows], m2[rows])
+    except Exception as e:
+        logger.warning(f"Bayesian continuous analysis failed: {e}")
+        return out
+
+    valid = (
+        np.isfinite(n_t) & np.isfinite(mean[rows]) & np.isfinite(m2[rows])
+        & np.isfinite(n[c]) & np.isfinite(mean[c]) & np.isfinite(m2[c])
+    )
+    column = {metric: j for j, metric in enumerate(metrics)}
+    for i, v_name in enumerate(names):
+        for metric in requested[v_name]:
+            j = column.get(metric)
+            if j is None:
+                continue
+            if not valid[i, j]:
+                logger.warning(f"Bayesian continuous failed for {metric}/{v_name}: non-numeric statistics")
+                continue
+            out[v_name][metric] = BayesianResult(
+                prob_treatment_beats_control=float(prob[i, j]),
+                expected_loss=float(loss[i, j]),
+            ).to_dict()
+    return out
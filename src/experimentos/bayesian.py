@@ -3,12 +3,22 @@ Bayesian Analysis Module
 
 Provides Bayesian interpretation of results (Probability of Being Best).
 Logic is strictly informational and does NOT affect decision rules.
-Uses deterministic simulation with fixed seed.
+Beta-Binomial P(T>C) and expected loss are computed by quadrature and continuous
+metrics in closed form (no sampling); Monte Carlo with a fixed seed remains as a
+fallback (config.BAYES_METHOD = "monte_carlo").
 """
 
+import logging
+
 import numpy as np
 from scipy import stats
 from .config import config
+from .kernels import beta_expected_loss, normal_posterior_comparison, prob_beta_best, prob_beta_greater
+from .moments import Moments
+from .results import BayesianResult
+from .simulation import Sampler, SimulationResult, beta_sampler, normal_sampler, simulate_batch, simulate_split
+
+logger = logging.getLogger("experimentos")
 
 def calculate_beta_binomial(
     control_conversions: int,
@@ -16,9 +26,25 @@ def calculate_beta_binomial(
     treatment_conversions: int,
     treatment_total: int
 ) -> dict:
+    """Dict-shaped compatibility adapter over beta_binomial()."""
+    return beta_binomial(
+        control_conversions, control_total, treatment_conversions, treatment_total
+    ).to_dict()
+
+
+def beta_binomial(
+    control_conversions: int,
+    control_total: int,
+    treatment_conversions: int,
+    treatment_total: int
+) -> BayesianResult:
     """
     Calculate P(Treatment > Control) using Beta-Binomial model.
     Prior: Beta(1, 1) [Uniform]
+
+    config.BAYES_METHOD == "exact" (default) integrates the posteriors directly;
+    "monte_carlo" samples BAYES_SAMPLES draws per arm. The exact engine falls back
+    to Monte Carlo if the quadrature does not produce a finite result.
     """
     # Posterior parameters
     alpha_c = 1 + control_conversions
@@ -26,21 +52,64 @@ def calculate_beta_binomial(
     
     alpha_t = 1 + treatment_conversions
     beta_t = 1 + treatment_total - treatment_conversions
+
+    if config.BAYES_METHOD == "exact":
+        prob_t_wins, expected_loss = _beta_binomial_exact(alpha_c, beta_c, alpha_t, beta_t)
+        if not (np.isfinite(prob_t_wins) and np.isfinite(expected_loss)):
+            logger.warning(
+                f"Exact Beta-Binomial failed for Beta({alpha_c}, {beta_c}) vs "
+                f"Beta({alpha_t}, {beta_t}), falling back to Monte Carlo."
+            )
+            prob_t_wins, expected_loss = _beta_binomial_monte_carlo(alpha_c, beta_c, alpha_t, beta_t)
+    elif config.BAYES_METHOD == "monte_carlo":
+        prob_t_wins, expected_loss = _beta_binomial_monte_carlo(alpha_c, beta_c, alpha_t, beta_t)
+    else:
+        raise ValueError(f"Unknown BAYES_METHOD: {config.BAYES_METHOD}")
     
-    # Simulation (Fast & Robust)
-    rng = np.random.default_rng(config.BAYES_SEED)
-    samples_c = rng.beta(alpha_c, beta_c, size=config.BAYES_SAMPLES)
-    samples_t = rng.beta(alpha_t, beta_t, size=config.BAYES_SAMPLES)
-    
-    prob_t_wins = np.mean(samples_t > samples_c)
-    expected_loss = np.mean(np.maximum(samples_c - samples_t, 0))
-    
-    return {
-        "prob_treatment_beats_control": float(prob_t_wins),
-        "expected_loss": float(expected_loss),
-        "control_posterior": {"alpha": alpha_c, "beta": beta_c},
-        "treatment_posterior": {"alpha": alpha_t, "beta": beta_t}
-    }
+    return BayesianResult(
+        prob_treatment_beats_control=float(prob_t_wins),
+        expected_loss=float(expected_loss),
+        control_posterior=(alpha_c, beta_c),
+        treatment_posterior=(alpha_t, beta_t),
+    )
+
+
+def _beta_binomial_exact(alpha_c, beta_c, alpha_t, beta_t) -> tuple[float, float]:
+    """(P(T > C), E[max(C - T, 0)]) by Gauss-Legendre quadrature"""
+    prob = prob_beta_greater(alpha_t, beta_t, alpha_c, beta_c)
+    loss = beta_expected_loss(alpha_c, beta_c, alpha_t, beta_t)
+    return float(prob), float(loss)
+
+
+def _beta_binomial_monte_carlo(alpha_c, beta_c, alpha_t, beta_t) -> tuple[float, float]:
+    """(P(T > C), E[max(C - T, 0)]) by deterministic simulation (fixed seed)"""
+    sim = _simulate(beta_sampler([alpha_c, alpha_t], [beta_c, beta_t], config.BAYES_MC_DTYPE), 2)
+    return float(sim.prob_beats_control[0]), float(sim.expected_loss[0])
+
+
+def _simulate_batch(tasks: list[tuple[Sampler, int]]) -> list[SimulationResult]:
+    """simulate_batch() with streams spawned from the configured seed"""
+    return simulate_batch(
+        tasks,
+        config.BAYES_SEED,
+        samples=config.BAYES_SAMPLES,
+        tolerance=config.BAYES_MC_TOLERANCE,
+        chunk_size=config.BAYES_MC_CHUNK,
+        max_samples=config.BAYES_MC_MAX_SAMPLES,
+    )
+
+
+def _simulate(draw: Sampler, n_arms: int) -> SimulationResult:
+    """simulate_split() with the configured seed, sample size and precision target"""
+    return simulate_split(
+        draw,
+        n_arms,
+        config.BAYES_SEED,
+        samples=config.BAYES_SAMPLES,
+        tolerance=config.BAYES_MC_TOLERANCE,
+        chunk_size=config.BAYES_MC_CHUNK,
+        max_samples=config.BAYES_MC_MAX_SAMPLES,
+    )
 
 def calculate_beta_binomial_multivariant(
     control_conversions: int,
@@ -62,39 +131,42 @@ def calculate_beta_binomial_multivariant(
             "vs_control": {"variant_a": {"prob_beats_control": float, "expected_loss": float}},
             "prob_being_best": {"control": float, "variant_a": float, ...}
         }
-    """
-    rng = np.random.default_rng(config.BAYES_SEED)
 
+    With config.BAYES_METHOD == "exact" (default) every quantity is integrated
+    (P(being best) = ∫ f_k Π_{j≠k} F_j on a shared grid), so no (K × N) sample
+    matrix is built; "monte_carlo" keeps the simulation, also used as fallback.
+    """
     alpha_c = 1 + control_conversions
     beta_c = 1 + control_total - control_conversions
-    samples_c = rng.beta(alpha_c, beta_c, size=config.BAYES_SAMPLES)
-
-    vs_control: dict[str, dict] = {}
-    all_samples: dict[str, np.ndarray] = {"control": samples_c}
-
-    for t in treatments:
-        name = t["name"]
-        alpha_t = 1 + t["conversions"]
-        beta_t = 1 + t["total"] - t["conversions"]
-        samples_t = rng.beta(alpha_t, beta_t, size=config.BAYES_SAMPLES)
-        all_samples[name] = samples_t
+    names = [t["name"] for t in treatments]
+    alphas = [1 + t["conversions"] for t in treatments]
+    betas = [1 + t["total"] - t["conversions"] for t in treatments]
+    alpha_t = np.array(alphas, dtype=np.float64)
+    beta_t = np.array(betas, dtype=np.float64)
 
-        prob_beats = float(np.mean(samples_t > samples_c))
-        exp_loss = float(np.mean(np.maximum(samples_c - samples_t, 0)))
+    if config.BAYES_METHOD == "exact":
+        prob_beats, exp_loss, prob_best = _multivariant_exact(alpha_c, beta_c, alpha_t, beta_t)
+        if not all(np.isfinite(v).all() for v in (prob_beats, exp_loss, prob_best)):
+            logger.warning("Exact multi-variant Beta-Binomial failed, falling back to Monte Carlo.")
+            prob_beats, exp_loss, prob_best = _multivariant_monte_carlo(alpha_c, beta_c, alpha_t, beta_t)
+    elif config.BAYES_METHOD == "monte_carlo":
+        prob_beats, exp_loss, prob_best = _multivariant_monte_carlo(alpha_c, beta_c, alpha_t, beta_t)
+    else:
+        raise ValueError(f"Unknown BAYES_METHOD: {config.BAYES_METHOD}")
 
-        vs_control[name] = {
-            "prob_beats_control": prob_beats,
-            "expected_loss": exp_loss,
-            "posterior": {"alpha": alpha_t, "beta": beta_t},
+    vs_control: dict[str, dict] = {
+        name: {
+            "prob_beats_control": float(prob_beats[i]),
+            "expected_loss": float(exp_loss[i]),
+            "posterior": {"alpha": alphas[i], "beta": betas[i]},
         }
+        for i, name in enumerate(names)
+    }
 
     # P(being best) for each variant including control
-    variant_names = list(all_samples.keys())
-    stacked = np.stack([all_samples[n] for n in variant_names], axis=0)  # (K, N)
-    best_indices = np.argmax(stacked, axis=0)  # (N,)
-    prob_being_best: dict[str, float] = {}
-    for i, name in enumerate(variant_names):
-        prob_being_best[name] = float(np.mean(best_indices == i))
+    prob_being_best: dict[str, float] = {
+        name: float(p) for name, p in zip(["control", *names], prob_best)
+    }
 
     return {
         "vs_control": vs_control,
@@ -103,41 +175,113 @@ def calculate_beta_binomial_multivariant(
     }
 
 
+def _multivariant_exact(alpha_c, beta_c, alpha_t, beta_t) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(P(T > C), E[max(C - T, 0)]) per treatment and P(being best) per arm, by quadrature"""
+    prob_beats = prob_beta_greater(alpha_t, beta_t, alpha_c, beta_c)
+    exp_loss = beta_expected_loss(alpha_c, beta_c, alpha_t, beta_t)
+    prob_best = prob_beta_best(np.append(alpha_c, alpha_t), np.append(beta_c, beta_t))
+    return prob_beats, exp_loss, prob_best
+
+
+def _multivariant_monte_carlo(alpha_c, beta_c, alpha_t, beta_t) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Same quantities as _multivariant_exact by deterministic simulation (fixed seed)"""
+    alphas, betas = np.append(alpha_c, alpha_t), np.append(beta_c, beta_t)
+    sim = _simulate(beta_sampler(alphas, betas, config.BAYES_MC_DTYPE), len(alphas))
+    return sim.prob_beats_control, sim.expected_loss, sim.prob_being_best
+
+
 def calculate_continuous_bayes(
-    control_stats: dict,
-    treatment_stats: dict
+    control_stats: Moments | dict,
+    treatment_stats: Moments | dict
 ) -> dict:
+    """Dict-shaped compatibility adapter over continuous_bayes()."""
+    return continuous_bayes(control_stats, treatment_stats).to_dict()
+
+
+def continuous_bayes(
+    control_stats: Moments | dict,
+    treatment_stats: Moments | dict
+) -> BayesianResult:
     """
     Calculate P(Treatment > Control) for continuous metrics.
-    Approximate using Normal distribution of means with simulated sampling.
+    Normal approximation of each arm's mean: closed form with
+    config.BAYES_METHOD == "exact" (default), otherwise simulated sampling
+    (fixed BAYES_SAMPLES, or chunked until BAYES_MC_TOLERANCE is met).
+
+    Stats may be {sum, sum_sq, n}, {n, mean, m2} or Moments.
     """
-    n_c = control_stats["n"]
-    mu_c = control_stats["sum"] / n_c
-    # Sample variance approx
-    ss_c = max(0, control_stats["sum_sq"] - (control_stats["sum"]**2 / n_c))
-    var_c = ss_c / (n_c - 1) if n_c > 1 else 0
-    std_err_c = np.sqrt(var_c / n_c) if n_c > 0 else 0
-    
-    n_t = treatment_stats["n"]
-    mu_t = treatment_stats["sum"] / n_t
-    ss_t = max(0, treatment_stats["sum_sq"] - (treatment_stats["sum"]**2 / n_t))
-    var_t = ss_t / (n_t - 1) if n_t > 1 else 0
-    std_err_t = np.sqrt(var_t / n_t) if n_t > 0 else 0
+    control = Moments.from_stats(control_stats)
+    treatment = Moments.from_stats(treatment_stats)
+
+    if config.BAYES_METHOD == "exact":
+        prob, loss = continuous_bayes_arrays(
+            control.n, control.mean, control.m2, treatment.n, treatment.mean, treatment.m2
+        )
+        return BayesianResult(prob_treatment_beats_control=float(prob), expected_loss=float(loss))
+    if config.BAYES_METHOD != "monte_carlo":
+        raise ValueError(f"Unknown BAYES_METHOD: {config.BAYES_METHOD}")
+
+    mu_c, std_err_c = control.mean, _std_err(control.n, control.m2)
+    mu_t, std_err_t = treatment.mean, _std_err(treatment.n, treatment.m2)
     
     if std_err_c == 0 and std_err_t == 0:
          # Deterministic comparison
          prob = 1.0 if mu_t > mu_c else 0.0
-         return {"prob_treatment_beats_control": prob, "expected_loss": 0.0}
+         return BayesianResult(prob_treatment_beats_control=prob, expected_loss=0.0)
 
     # Simulation
-    rng = np.random.default_rng(config.BAYES_SEED)
-    samples_c = rng.normal(mu_c, std_err_c, size=config.BAYES_SAMPLES)
-    samples_t = rng.normal(mu_t, std_err_t, size=config.BAYES_SAMPLES)
-    
-    prob_t_wins = np.mean(samples_t > samples_c)
-    expected_loss = np.mean(np.maximum(samples_c - samples_t, 0))
+    sim = _simulate(normal_sampler([mu_c, mu_t], [std_err_c, std_err_t], config.BAYES_MC_DTYPE), 2)
     
-    return {
-        "prob_treatment_beats_control": float(prob_t_wins),
-        "expected_loss": float(expected_loss)
-    }
+    return BayesianResult(
+        prob_treatment_beats_control=float(sim.prob_beats_control[0]),
+        expected_loss=float(sim.expected_loss[0]),
+    )
+
+
+def continuous_bayes_arrays(
+    n_c: np.ndarray | float,
+    mean_c: np.ndarray | float,
+    m2_c: np.ndarray | float,
+    n_t: np.ndarray | float,
+    mean_t: np.ndarray | float,
+    m2_t: np.ndarray | float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Closed-form P(T > C) and expected loss for whole metric × variant arrays.
+
+    Inputs broadcast like welch_ttest_from_moments, e.g. control (metrics,)
+    against treatments (variants, metrics) from moment_arrays(). Negative M2
+    is clipped to 0 and n < 2 gives a zero standard error, as in the scalar path.
+    With config.BAYES_METHOD == "monte_carlo" every cell is simulated as one
+    simulate_batch() task: cells get their own spawned RNG streams, so the batch
+    can run on SIMULATION_WORKERS threads/processes with identical results.
+
+    Returns:
+        (prob_treatment_beats_control, expected_loss)
+    """
+    if config.BAYES_METHOD == "exact":
+        return normal_posterior_comparison(mean_c, _std_err(n_c, m2_c), mean_t, _std_err(n_t, m2_t))
+
+    cells = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (n_c, mean_c, m2_c, n_t, mean_t, m2_t)))
+    n_c, mean_c, m2_c, n_t, mean_t, m2_t = (a.ravel() for a in cells)
+    std_err_c, std_err_t = _std_err(n_c, m2_c), _std_err(n_t, m2_t)
+
+    # Deterministic comparison where both standard errors are 0 (as in continuous_bayes)
+    prob = (mean_t > mean_c).astype(np.float64)
+    loss = np.zeros(prob.shape)
+    simulated = np.flatnonzero((std_err_c > 0) | (std_err_t > 0))
+    tasks = [
+        (normal_sampler([mean_c[i], mean_t[i]], [std_err_c[i], std_err_t[i]], config.BAYES_MC_DTYPE), 2)
+        for i in simulated
+    ]
+    for i, sim in zip(simulated, _simulate_batch(tasks)):
+        prob[i], loss[i] = sim.prob_beats_control[0], sim.expected_loss[0]
+    return prob.reshape(cells[0].shape), loss.reshape(cells[0].shape)
+
+
+def _std_err(n, m2) -> np.ndarray:
+    """Standard error of the mean from (n, M2); 0 where n < 2"""
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.where(n > 1, np.maximum(m2, 0) / (n - 1), 0.0)
+        return np.where(n > 0, np.sqrt(var / n), 0.0)
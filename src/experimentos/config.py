@@ -5,7 +5,8 @@
 기본값은 PRD 및 README의 기준을 따릅니다.
 """
 
-from dataclasses import dataclass
+import hashlib
+from dataclasses import asdict, dataclass
 
 
 @dataclass
@@ -57,6 +58,21 @@ class ExperimentConfig:
     BAYES_SEED: int = 42
     """베이지안 시뮬레이션 난수 시드 (Deterministic)"""
 
+    BAYES_METHOD: str = "exact"
+    """Beta-Binomial 계산 방식 ('exact' = Gauss-Legendre 구적, 'monte_carlo' = 시뮬레이션)"""
+
+    BAYES_MC_TOLERANCE: float | None = None
+    """시뮬레이션 정밀도 목표 (MCSE), None이면 BAYES_SAMPLES 고정 크기"""
+
+    BAYES_MC_CHUNK: int = 500
+    """정밀도 목표 모드의 chunk 크기 (MCSE 판정 주기)"""
+
+    BAYES_MC_MAX_SAMPLES: int = 100000
+    """정밀도 목표 모드의 arm당 최대 표본 수"""
+
+    BAYES_MC_DTYPE: str = "float64"
+    """시뮬레이션 표본 dtype ('float64' | 'float32', float32는 메모리 절반)"""
+
     # ===== Sequential Testing Settings =====
     SEQUENTIAL_MAX_LOOKS: int = 5
     """기본 최대 중간 분석 횟수"""
@@ -71,6 +87,19 @@ class ExperimentConfig:
     HYPOTHESIS_TEXT_AREA_HEIGHT: int = 100
     """가설 입력 텍스트 영역 높이 (px)"""
 
+    def fingerprint(self) -> str:
+        """
+        설정값 전체의 해시 (캐시 키용)
+
+        분석 결과는 입력 데이터와 이 설정만으로 결정되므로(BAYES_SEED 고정),
+        설정이 바뀌면 fingerprint도 바뀌어 이전 캐시 결과가 재사용되지 않습니다.
+
+        Returns:
+            str: 16자리 hex 문자열
+        """
+        items = sorted(asdict(self).items())
+        return hashlib.sha256(repr(items).encode("utf-8")).hexdigest()[:16]
+
     def get_assumptions_text(self) -> str:
         """
         Memo에 포함할 Assumptions & Thresholds 텍스트 생성
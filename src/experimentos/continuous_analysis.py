@@ -2,127 +2,222 @@
 Continuous Metric Analysis Module
 
 Welch's t-test implementation for continuous metrics using sufficient statistics.
-Inputs: metric_sum, metric_sum_sq, n for control and treatment.
+Inputs per arm: either (sum, sum_sq, n) or the mergeable (n, mean, M2) form
+(see moments.py). All paths go through the array kernel kernels.welch_ttest_from_moments.
+
+Ratio metrics (Σnum / Σden, e.g. revenue per order) use the delta method on the
+aggregated {metric}_num_sum, _den_sum, _num_sum_sq, _den_sum_sq, _num_den_sum
+columns via kernels.ratio_delta_method.
 """
 
 import numpy as np
-from scipy import stats
+import pandas as pd
+
 from .config import config
+from .kernels import RatioResult, WelchResult, ratio_delta_method, welch_ttest_from_moments
+from .moments import Moments, moment_arrays
+from .results import ContinuousResult
+from .schema import ExperimentSchema
+
+RATIO_STATS_KEYS: tuple[str, ...] = ("num_sum", "den_sum", "num_sum_sq", "den_sum_sq", "num_den_sum", "n")
+"""calculate_ratio_lift 입력 dict 키"""
+
 
 def calculate_continuous_lift(
-    control_stats: dict[str, float],
-    treatment_stats: dict[str, float],
+    control_stats: Moments | dict[str, float],
+    treatment_stats: Moments | dict[str, float],
     metric_name: str
 ) -> dict:
     """
     Calculate lift and statistical significance for a continuous metric.
+
+    Dict-shaped compatibility adapter over continuous_lift().
+
+    Returns:
+        Dict results including means, p-value, CI, etc.
+    """
+    return continuous_lift(control_stats, treatment_stats, metric_name).to_dict()
+
+
+def continuous_lift(
+    control_stats: Moments | dict[str, float],
+    treatment_stats: Moments | dict[str, float],
+    metric_name: str
+) -> ContinuousResult:
+    """
+    Calculate lift and statistical significance for a continuous metric.
     
     Args:
-        control_stats: {sum, sum_sq, n}
-        treatment_stats: {sum, sum_sq, n}
+        control_stats: {sum, sum_sq, n}, {n, mean, m2} 또는 Moments
+        treatment_stats: {sum, sum_sq, n}, {n, mean, m2} 또는 Moments
         metric_name: Name of the metric (e.g., 'revenue')
         
     Returns:
-        Dict results including means, p-value, CI, etc.
+        ContinuousResult
     """
-    # 1. Extract stats
-    n_c = control_stats["n"]
-    sum_c = control_stats["sum"]
-    sum_sq_c = control_stats["sum_sq"]
-    
-    n_t = treatment_stats["n"]
-    sum_t = treatment_stats["sum"]
-    sum_sq_t = treatment_stats["sum_sq"]
-    
-    # Check for empty or single samples
-    if n_c < 2 or n_t < 2:
-        return _empty_result(metric_name, "Insufficient data (n < 2)")
+    control = Moments.from_stats(control_stats)
+    treatment = Moments.from_stats(treatment_stats)
+    welch = welch_ttest_from_moments(
+        control.n, control.mean, control.m2,
+        treatment.n, treatment.mean, treatment.m2,
+        alpha=config.SIGNIFICANCE_ALPHA,
+        var_tolerance=config.VAR_TOLERANCE,
+    )
+    return _result_at(welch, (), metric_name)
 
-    # 2. Calculate means
-    mean_c = sum_c / n_c
-    mean_t = sum_t / n_t
-    
-    # 3. Calculate variances (sample variance formula from sufficient stats)
-    # var = (sum_sq - (sum^2)/n) / (n - 1)
-    
-    # Numerical stability check for numerator
-    ss_c = sum_sq_c - (sum_c**2 / n_c)
-    ss_t = sum_sq_t - (sum_t**2 / n_t)
-    
-    # Clamp negative variance due to floating point noise
-    if ss_c < -config.VAR_TOLERANCE or ss_t < -config.VAR_TOLERANCE:
-        return _empty_result(metric_name, "Invalid variance (checksum failed)")
-        
-    ss_c = max(0.0, ss_c)
-    ss_t = max(0.0, ss_t)
-    
-    var_c = ss_c / (n_c - 1)
-    var_t = ss_t / (n_t - 1)
-    
-    # Zero variance edge case
-    if var_c == 0 and var_t == 0:
-        # If both predictable and equal means -> p=1.0, else p=0.0
-        # For simplicity in A/B context, if means identical -> p=1.0
-        p_value = 1.0 if mean_c == mean_t else 0.0
-        std_err = 0.0
-    else:
-        # 4. Standard Error of difference (Welch's)
-        std_err = np.sqrt(var_c/n_c + var_t/n_t)
-        
-        # 5. t-statistic and p-value
-        if std_err == 0:
-             p_value = 1.0 if mean_c == mean_t else 0.0
-        else:
-            t_stat = (mean_t - mean_c) / std_err
-            
-            # Welch-Satterthwaite degrees of freedom
-            num = (var_c/n_c + var_t/n_t)**2
-            den = (var_c/n_c)**2 / (n_c - 1) + (var_t/n_t)**2 / (n_t - 1)
-            # handle den=0 edge case
-            if den == 0:
-                dof = n_c + n_t - 2
-            else:
-                dof = num / den
-                
-            p_value = stats.t.sf(np.abs(t_stat), dof) * 2  # two-sided
-    
-    # 6. Confidence Interval (95%)
-    # For CI, critical value from t-distribution is better, but z-score approx ok for large N
-    # Using t-dist for robustness
-    if std_err > 0 and 'dof' in locals():
-        crit_val = stats.t.ppf(1 - config.SIGNIFICANCE_ALPHA/2, dof)
-        margin = crit_val * std_err
-    else:
-        margin = 0.0
-        
-    absolute_lift = mean_t - mean_c
-    ci_lower = absolute_lift - margin
-    ci_upper = absolute_lift + margin
-    
-    relative_lift = (absolute_lift / mean_c) if mean_c != 0 else 0.0
-
-    return {
-        "metric_name": metric_name,
-        "is_valid": True,
-        "control_mean": mean_c,
-        "treatment_mean": mean_t,
-        "absolute_lift": absolute_lift,
-        "relative_lift": relative_lift,
-        "p_value": p_value,
-        "ci_95": [ci_lower, ci_upper],
-        "is_significant": p_value < config.SIGNIFICANCE_ALPHA
-    }
-
-def _empty_result(name: str, reason: str) -> dict:
-    return {
-        "metric_name": name,
-        "is_valid": False,
-        "error": reason,
-        "control_mean": 0.0,
-        "treatment_mean": 0.0,
-        "absolute_lift": 0.0,
-        "relative_lift": 0.0,
-        "p_value": 1.0,
-        "ci_95": [0.0, 0.0],
-        "is_significant": False
-    }
+
+def continuous_lift_matrix(
+    df: pd.DataFrame,
+    metrics: list[str],
+    treatment_rows: np.ndarray,
+    control_index: int,
+) -> list[list[ContinuousResult]]:
+    """
+    모든 treatment × metric 쌍을 한 번의 Welch 계산으로 평가
+
+    metric별로 {metric}_mean/_m2 또는 {metric}_sum/_sum_sq 컬럼, n은 users 컬럼을
+    사용합니다 (Revenue per User). scipy 호출은 metric·variant 수와 무관하게 t.sf, t.ppf 각 1회입니다.
+
+    Args:
+        df: 실험 데이터프레임
+        metrics: continuous metric 이름 (ExperimentSchema.continuous)
+        treatment_rows: treatment 행 위치
+        control_index: control 행 위치
+
+    Returns:
+        list[list[ContinuousResult]]: [treatment 순서][metric 순서]
+    """
+    n, mean, m2 = moment_arrays(df, metrics)
+
+    welch = welch_ttest_from_moments(
+        n[control_index], mean[control_index], m2[control_index],
+        n[treatment_rows][:, None], mean[treatment_rows], m2[treatment_rows],
+        alpha=config.SIGNIFICANCE_ALPHA,
+        var_tolerance=config.VAR_TOLERANCE,
+    )
+    return [
+        [_result_at(welch, (i, j), metric) for j, metric in enumerate(metrics)]
+        for i in range(len(treatment_rows))
+    ]
+
+
+def _result_at(welch: WelchResult, index: tuple[int, ...], metric_name: str) -> ContinuousResult:
+    """WelchResult 배열의 한 셀을 ContinuousResult로 변환"""
+    if welch.insufficient_n[index]:
+        return ContinuousResult.invalid(metric_name, "Insufficient data (n < 2)")
+    if welch.invalid_variance[index]:
+        return ContinuousResult.invalid(metric_name, "Invalid variance (checksum failed)")
+    p_value = float(welch.p_value[index])
+    return ContinuousResult(
+        metric_name=metric_name,
+        is_valid=True,
+        control_mean=float(welch.control_mean[index]),
+        treatment_mean=float(welch.treatment_mean[index]),
+        absolute_lift=float(welch.absolute_lift[index]),
+        relative_lift=float(welch.relative_lift[index]),
+        p_value=p_value,
+        ci_lower=float(welch.ci_lower[index]),
+        ci_upper=float(welch.ci_upper[index]),
+        is_significant=p_value < config.SIGNIFICANCE_ALPHA,
+    )
+
+
+def calculate_ratio_lift(
+    control_stats: dict[str, float],
+    treatment_stats: dict[str, float],
+    metric_name: str
+) -> dict:
+    """Dict-shaped compatibility adapter over ratio_lift()."""
+    return ratio_lift(control_stats, treatment_stats, metric_name).to_dict()
+
+
+def ratio_lift(
+    control_stats: dict[str, float],
+    treatment_stats: dict[str, float],
+    metric_name: str
+) -> ContinuousResult:
+    """
+    Ratio metric (Σnum / Σden) lift and significance via the delta method.
+
+    Args:
+        control_stats: {num_sum, den_sum, num_sum_sq, den_sum_sq, num_den_sum, n}
+        treatment_stats: same keys; n is the number of analysis units (users)
+        metric_name: Name of the metric (e.g., 'revenue_per_order')
+
+    Returns:
+        ContinuousResult (metric_type="ratio")
+    """
+    ratio = ratio_delta_method(
+        *(control_stats[k] for k in RATIO_STATS_KEYS),
+        *(treatment_stats[k] for k in RATIO_STATS_KEYS),
+        alpha=config.SIGNIFICANCE_ALPHA,
+        var_tolerance=config.VAR_TOLERANCE,
+    )
+    return _ratio_result_at(ratio, (), metric_name)
+
+
+def ratio_lift_matrix(
+    df: pd.DataFrame,
+    metrics: list[str],
+    treatment_rows: np.ndarray,
+    control_index: int,
+) -> list[list[ContinuousResult]]:
+    """
+    모든 treatment × ratio metric 쌍을 한 번의 delta-method 계산으로 평가
+
+    분석 단위 수 n은 users 컬럼입니다 (분자·분모 합은 user별 값의 합).
+
+    Returns:
+        list[list[ContinuousResult]]: [treatment 순서][metric 순서]
+    """
+    stats = ratio_arrays(df, metrics)
+    ratio = ratio_delta_method(
+        *(a[control_index] for a in stats),
+        *(a[treatment_rows] for a in stats),
+        alpha=config.SIGNIFICANCE_ALPHA,
+        var_tolerance=config.VAR_TOLERANCE,
+    )
+    return [
+        [_ratio_result_at(ratio, (i, j), metric) for j, metric in enumerate(metrics)]
+        for i in range(len(treatment_rows))
+    ]
+
+
+def ratio_arrays(df: pd.DataFrame, metrics: list[str]) -> list[np.ndarray]:
+    """
+    ratio metric 입력을 (행, metric) 배열 6개로 읽기
+
+    Returns:
+        [num_sum, den_sum, num_sum_sq, den_sum_sq, num_den_sum, n] (n은 users, 소수점 버림)
+    """
+    arrays = [
+        df[[ExperimentSchema.ratio_columns(m)[k] for m in metrics]].to_numpy(dtype=np.float64)
+        for k in range(5)
+    ]
+    users = np.trunc(pd.to_numeric(df["users"], errors="coerce").to_numpy(dtype=np.float64))
+    arrays.append(np.repeat(users[:, None], len(metrics), axis=1))
+    return arrays
+
+
+def _ratio_result_at(ratio: RatioResult, index: tuple[int, ...], metric_name: str) -> ContinuousResult:
+    """RatioResult 배열의 한 셀을 ContinuousResult로 변환"""
+    if ratio.insufficient_n[index]:
+        return ContinuousResult.invalid(metric_name, "Insufficient data (n < 2)", "ratio")
+    if ratio.zero_denominator[index]:
+        return ContinuousResult.invalid(metric_name, "Zero denominator", "ratio")
+    if ratio.invalid_variance[index]:
+        return ContinuousResult.invalid(metric_name, "Invalid variance (checksum failed)", "ratio")
+    p_value = float(ratio.p_value[index])
+    return ContinuousResult(
+        metric_name=metric_name,
+        is_valid=True,
+        control_mean=float(ratio.control_ratio[index]),
+        treatment_mean=float(ratio.treatment_ratio[index]),
+        absolute_lift=float(ratio.absolute_lift[index]),
+        relative_lift=float(ratio.relative_lift[index]),
+        p_value=p_value,
+        ci_lower=float(ratio.ci_lower[index]),
+        ci_upper=float(ratio.ci_upper[index]),
+        is_significant=p_value < config.SIGNIFICANCE_ALPHA,
+        metric_type="ratio",
+    )
@@ -0,0 +1,269 @@
+"""
+Guardrail 행렬 엔진
+
+(treatment variant × guardrail) 전체를 2-D 배열로 한 번에 평가합니다.
+rate, delta, worsened/severe 플래그, p-value를 모두 배열 연산으로 계산하고,
+응답용 dict는 마지막에 records()/summary()에서만 만듭니다.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .config import GUARDRAIL_SEVERE_THRESHOLD, GUARDRAIL_WORSENED_THRESHOLD
+from .kernels import proportions_ztest_2samp, safe_rate
+from .results import GuardrailResult
+from .schema import resolve_schema
+
+logger = logging.getLogger("experimentos")
+
+def detect_guardrail_columns(df: pd.DataFrame, dimensions: list[str] | None = None) -> list[str]:
+    """Guardrail 컬럼 자동 탐지 (ExperimentSchema.guardrails, dimension 컬럼 제외)"""
+    return list(resolve_schema(df, dimensions or ()).guardrails)
+
+
+def _column_counts(df: pd.DataFrame, col: str) -> tuple[np.ndarray, list[str | None]]:
+    """
+    Guardrail 컬럼을 정수 count 배열로 변환
+
+    스칼라 경로의 int(row[col])와 같은 값(소수점 이하 절사)과 같은 오류 메시지를 만듭니다.
+    숫자형이고 결측이 없는 컬럼은 배열 변환만 하고, 그 외 컬럼만 셀 단위로 변환합니다.
+
+    Returns:
+        (counts, errors): errors[i]는 i번째 행의 변환 오류 메시지 (정상이면 None)
+    """
+    n = len(df)
+    if col not in df.columns:
+        return np.zeros(n, dtype=np.int64), [str(KeyError(col))] * n
+
+    column = df[col]
+    if pd.api.types.is_integer_dtype(column) or pd.api.types.is_bool_dtype(column):
+        return column.to_numpy(dtype=np.int64), [None] * n
+    if pd.api.types.is_float_dtype(column):
+        values = column.to_numpy(dtype=np.float64)
+        if np.isfinite(values).all():
+            return np.trunc(values).astype(np.int64), [None] * n
+
+    counts = np.zeros(n, dtype=np.int64)
+    errors: list[str | None] = [None] * n
+    for i, value in enumerate(column.tolist()):
+        try:
+            counts[i] = int(value)
+        except (ValueError, TypeError) as e:
+            errors[i] = str(e)
+    return counts, errors
+
+
+@dataclass
+class GuardrailMatrix:
+    """
+    Guardrail 평가 결과 (행: treatment variant, 열: guardrail)
+
+    오류 셀(count 변환 실패)은 valid=False이며 플래그/요약 계산에서 제외됩니다.
+    """
+
+    columns: list[str]
+    variants: list[str]
+    control_users: int
+    treatment_users: np.ndarray  # (V,)
+    control_counts: np.ndarray  # (G,)
+    treatment_counts: np.ndarray  # (V, G)
+    control_rate: np.ndarray  # (G,)
+    treatment_rate: np.ndarray  # (V, G)
+    delta: np.ndarray  # (V, G)
+    relative_lift: np.ndarray  # (V, G), control rate가 0이면 NaN
+    worsened: np.ndarray  # (V, G) bool
+    severe: np.ndarray  # (V, G) bool
+    p_value: np.ndarray  # (V, G)
+    valid: np.ndarray  # (V, G) bool
+    errors: dict[tuple[int, int], str]  # (row, col) -> 변환 오류 메시지
+
+    @property
+    def any_worsened(self) -> bool:
+        return bool((self.worsened & self.valid).any())
+
+    @property
+    def any_severe(self) -> bool:
+        return bool((self.severe & self.valid).any())
+
+    def results(self, row: int, include_variant: bool = False) -> list[GuardrailResult]:
+        """한 treatment variant의 guardrail 결과 객체 목록"""
+        variant = self.variants[row] if include_variant else None
+        control_counts = self.control_counts.tolist()
+        control_rate = self.control_rate.tolist()
+        treatment_counts = self.treatment_counts[row].tolist()
+        treatment_rate = self.treatment_rate[row].tolist()
+        delta = self.delta[row].tolist()
+        relative_lift = self.relative_lift[row].tolist()
+        worsened = self.worsened[row].tolist()
+        severe = self.severe[row].tolist()
+        p_value = self.p_value[row].tolist()
+
+        results: list[GuardrailResult] = []
+        for j, col in enumerate(self.columns):
+            error = self.errors.get((row, j))
+            if error is not None:
+                results.append(GuardrailResult(
+                    name=col, control_count=0, treatment_count=0,
+                    control_rate=0.0, treatment_rate=0.0, delta=0.0, relative_lift=None,
+                    worsened=False, severe=False, p_value=1.0, variant=variant, error=error,
+                ))
+            else:
+                results.append(GuardrailResult(
+                    name=col,
+                    control_count=control_counts[j],
+                    treatment_count=treatment_counts[j],
+                    control_rate=control_rate[j],
+                    treatment_rate=treatment_rate[j],
+                    delta=delta[j],
+                    relative_lift=None if np.isnan(relative_lift[j]) else relative_lift[j],
+                    worsened=worsened[j],
+                    severe=severe[j],
+                    p_value=p_value[j],
+                    variant=variant,
+                ))
+        return results
+
+    def records(self, row: int, include_variant: bool = False) -> list[dict[str, Any]]:
+        """한 treatment variant의 guardrail 결과를 응답용 dict 리스트로 변환 (호환 형태)"""
+        return [r.to_dict() for r in self.results(row, include_variant)]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        전체 (variant, guardrail) 셀을 long-format DataFrame으로 변환
+
+        행렬을 그대로 펼치므로 셀 단위 객체를 만들지 않으며, results.to_arrow()로
+        Arrow/Parquet에 바로 넘길 수 있습니다. 오류 셀은 error 컬럼에 메시지가 담깁니다.
+        """
+        n_rows, n_cols = self.delta.shape
+        rows = np.repeat(np.arange(n_rows), n_cols)
+        cols = np.tile(np.arange(n_cols), n_rows)
+        frame = pd.DataFrame({
+            "variant": np.asarray(self.variants, dtype=object)[rows],
+            "name": np.asarray(self.columns, dtype=object)[cols],
+            "control_count": self.control_counts[cols],
+            "treatment_count": self.treatment_counts.ravel(),
+            "control_rate": self.control_rate[cols],
+            "treatment_rate": self.treatment_rate.ravel(),
+            "delta": self.delta.ravel(),
+            "relative_lift": self.relative_lift.ravel(),
+            "worsened": (self.worsened & self.valid).ravel(),
+            "severe": (self.severe & self.valid).ravel(),
+            "p_value": self.p_value.ravel(),
+            "error": None,
+        })
+        for (i, j), message in self.errors.items():
+            frame.at[i * n_cols + j, "error"] = message
+        return frame
+
+    def summary(self) -> list[dict[str, Any]]:
+        """
+        Guardrail별 최악 variant 요약
+
+        worst_variant는 delta가 가장 큰 첫 variant이고, 플래그는 유효한 variant 중
+        하나라도 해당하면 True입니다. 유효한 셀이 없는 guardrail은 제외되며,
+        순서는 처음 유효한 결과가 나온 (variant, guardrail) 순서를 따릅니다.
+        """
+        valid = self.valid
+        if not valid.size:
+            return []
+        masked_delta = np.where(valid, self.delta, -np.inf)
+        worst_row = masked_delta.argmax(axis=0)
+        first_valid_row = valid.argmax(axis=0)
+        has_valid = valid.any(axis=0)
+        any_severe = (self.severe & valid).any(axis=0)
+        any_worsened = (self.worsened & valid).any(axis=0)
+
+        order = sorted(np.flatnonzero(has_valid).tolist(), key=lambda j: first_valid_row[j])
+        return [
+            {
+                "name": self.columns[j],
+                "worst_variant": self.variants[worst_row[j]],
+                "worst_delta": float(self.delta[worst_row[j], j]),
+                "severe": bool(any_severe[j]),
+                "worsened": bool(any_worsened[j]),
+            }
+            for j in order
+        ]
+
+
+def evaluate_guardrails(
+    df: pd.DataFrame,
+    guardrail_columns: list[str],
+    treatment_mask: np.ndarray,
+    control_index: int,
+    abs_threshold: float = GUARDRAIL_WORSENED_THRESHOLD,
+    severe_threshold: float = GUARDRAIL_SEVERE_THRESHOLD,
+) -> GuardrailMatrix:
+    """
+    모든 treatment × guardrail 셀을 한 번에 평가
+
+    Args:
+        df: 실험 데이터프레임
+        guardrail_columns: 평가할 guardrail 컬럼
+        treatment_mask: treatment로 평가할 행 (bool, 길이 len(df))
+        control_index: control 행의 위치
+        abs_threshold: Worsened 판정 절대 임계치
+        severe_threshold: Severe 판정 절대 임계치
+    """
+    rows = np.flatnonzero(treatment_mask)
+    users = df["users"].to_numpy()
+    users_c = int(users[control_index])
+    users_t = np.array([int(u) for u in users[rows]], dtype=np.int64)
+
+    n_cols = len(guardrail_columns)
+    counts_c = np.zeros(n_cols, dtype=np.int64)
+    counts_t = np.zeros((len(rows), n_cols), dtype=np.int64)
+    errors: dict[tuple[int, int], str] = {}
+
+    for j, col in enumerate(guardrail_columns):
+        counts, col_errors = _column_counts(df, col)
+        counts_c[j] = counts[control_index]
+        counts_t[:, j] = counts[rows]
+        if not any(col_errors):
+            continue
+        # A bad control cell invalidates the whole column (checked first, like int(control_row[col]))
+        control_error = col_errors[control_index]
+        for i, row in enumerate(rows):
+            error = control_error or col_errors[row]
+            if error is not None:
+                errors[(i, j)] = error
+
+    valid = np.ones((len(rows), n_cols), dtype=bool)
+    for i, j in errors:
+        valid[i, j] = False
+
+    rate_c = safe_rate(counts_c, users_c)
+    rate_t = safe_rate(counts_t, users_t[:, None])
+    delta = rate_t - rate_c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_lift = np.where(rate_c > 0, rate_t / rate_c - 1, np.nan)
+    _, p_value = proportions_ztest_2samp(counts_t, users_t[:, None], counts_c, users_c)
+
+    matrix = GuardrailMatrix(
+        columns=list(guardrail_columns),
+        variants=[str(v) for v in df["variant"].to_numpy()[rows]],
+        control_users=users_c,
+        treatment_users=users_t,
+        control_counts=counts_c,
+        treatment_counts=counts_t,
+        control_rate=rate_c,
+        treatment_rate=rate_t,
+        delta=delta,
+        relative_lift=relative_lift,
+        worsened=delta >= abs_threshold,
+        severe=delta >= severe_threshold,
+        p_value=p_value,
+        valid=valid,
+        errors=errors,
+    )
+
+    for (i, j), error in errors.items():
+        logger.warning(
+            f"Guardrail '{guardrail_columns[j]}' 분석 실패 for {matrix.variants[i]}: {error}"
+        )
+
+    return matrix
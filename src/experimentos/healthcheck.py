@@ -9,16 +9,19 @@ from scipy import stats
 import logging
 
 from .config import SRM_WARNING_THRESHOLD, SRM_BLOCKED_THRESHOLD, MIN_SAMPLE_SIZE_WARNING, config
+from .schema import resolve_schema
 
 logger = logging.getLogger("experimentos")
 
 
-def validate_schema(df: pd.DataFrame) -> dict:
+def validate_schema(df: pd.DataFrame, dimensions: list[str] | None = None) -> dict:
     """
     CSV 데이터의 스키마 및 논리적 오류를 검증
     
     Args:
         df: 업로드된 데이터프레임
+        dimensions: segment 컬럼 목록 (예: ["country", "platform"]).
+                    지정하면 variant 중복을 (dimensions, variant) 조합 단위로 검사
     
     Returns:
         dict: {
@@ -30,7 +33,8 @@ def validate_schema(df: pd.DataFrame) -> dict:
     
     # 1. 필수 컬럼 체크
     required_columns = ["variant", "users", "conversions"]
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    dimensions = list(dimensions or [])
+    missing_columns = [col for col in required_columns + dimensions if col not in df.columns]
     
     if missing_columns:
         issues.append(f"필수 컬럼 누락: {', '.join(missing_columns)}")
@@ -63,7 +67,7 @@ def validate_schema(df: pd.DataFrame) -> dict:
         return {"status": "Blocked", "issues": issues}
     
     # Check for duplicates
-    if df["variant"].duplicated().any():
+    if df.duplicated(subset=dimensions + ["variant"]).any():
         issues.append("중복된 variant 라벨이 있습니다.")
         return {"status": "Blocked", "issues": issues}
     
@@ -113,7 +117,7 @@ def validate_schema(df: pd.DataFrame) -> dict:
 
 def validate_continuous_schema(df: pd.DataFrame, issues: list[str]) -> str:
     """
-    Continuous metric columns (_sum, _sum_sq) validation.
+    Continuous metric columns (_sum/_sum_sq, _mean/_m2, ratio _num_*/_den_*) validation.
     Mutates 'issues' list if problems are found.
     
     Returns:
@@ -122,8 +126,10 @@ def validate_continuous_schema(df: pd.DataFrame, issues: list[str]) -> str:
             - "Warning": Non-blocking issues found (e.g., n<2 preventing variance calculation)
             - "Blocked": Critical issues found that prevent analysis
                 * Missing _sum_sq column for existing _sum column
+                * Missing _mean column for existing _m2 column
+                * Incomplete ratio columns for existing _num_den_sum column
                 * NULL values in continuous metric columns
-                * Invalid variance (sum_sq < sum^2/n beyond tolerance)
+                * Invalid variance (sum_sq < sum^2/n beyond tolerance, or M2 < 0)
     
     Priority Order:
         1. Blocked (highest) - Critical issues that prevent analysis
@@ -144,22 +150,44 @@ def validate_continuous_schema(df: pd.DataFrame, issues: list[str]) -> str:
     has_blocked_issue = False
     has_warning_issue = False
     
-    # 1. Identify sum columns
-    sum_cols = [c for c in df.columns if c.endswith("_sum") and c != "metric_sum"]
-    
-    for sum_col in sum_cols:
-        base_name = sum_col[:-4] # remove _sum
-        sum_sq_col = f"{base_name}_sum_sq"
-        
-        # Check sum_sq existence
-        if sum_sq_col not in df.columns:
-            issues.append(f"Continuous schema error: '{sum_col}' exists but '{sum_sq_col}' is missing.")
+    # 1. Identify sum columns (classified once per column signature)
+    schema = resolve_schema(df)
+
+    # Check sum_sq existence
+    for sum_col in schema.orphan_sums:
+        sum_sq_col = f"{sum_col[:-4]}_sum_sq"
+        issues.append(f"Continuous schema error: '{sum_col}' exists but '{sum_sq_col}' is missing.")
+        has_blocked_issue = True
+
+    for m2_col in schema.orphan_moments:
+        mean_col = schema.mean_column(m2_col[:-3])
+        issues.append(f"Continuous schema error: '{m2_col}' exists but '{mean_col}' is missing.")
+        has_blocked_issue = True
+
+    for cross_col in schema.orphan_ratios:
+        metric = cross_col[: -len("_num_den_sum")]
+        missing = [c for c in schema.ratio_columns(metric) if c not in schema.columns]
+        issues.append(f"Ratio schema error: '{cross_col}' exists but {', '.join(repr(c) for c in missing)} missing.")
+        has_blocked_issue = True
+
+    for metric in schema.ratio_metrics:
+        ratio_cols = list(schema.ratio_columns(metric))
+        if df[ratio_cols].isnull().any().any():
+            issues.append(f"Ratio metric '{metric}' contains NULL values.")
             has_blocked_issue = True
             continue
-            
+        den_col = ratio_cols[1]
+        for variant in df.loc[df[den_col] == 0, "variant"]:
+            issues.append(f"⚠️ Warning: Ratio metric '{metric}' has a zero denominator for {variant}.")
+            has_warning_issue = True
+
+    for base_name in schema.continuous:
+        first_col, second_col = schema.value_columns(base_name)
+        is_moment = base_name in schema.moment_metrics
+
         # Check completeness (values present for both variants)
         # Assuming df has 2 rows (control, treatment)
-        if df[sum_col].isnull().any() or df[sum_sq_col].isnull().any():
+        if df[first_col].isnull().any() or df[second_col].isnull().any():
              issues.append(f"Continuous metric '{base_name}' contains NULL values.")
              has_blocked_issue = True
              continue
@@ -175,8 +203,15 @@ def validate_continuous_schema(df: pd.DataFrame, issues: list[str]) -> str:
                  has_warning_issue = True
                  continue
 
-            s = row[sum_col]
-            ss = row[sum_sq_col]
+            if is_moment:
+                # (n, mean, M2) has no sum_sq - sum^2/n cancellation; negative M2 is corrupt input
+                if row[second_col] < -config.VAR_TOLERANCE:
+                    issues.append(f"Invalid variance for '{base_name}' in {row['variant']}: M2 < 0 ({row[second_col]:.2e})")
+                    has_blocked_issue = True
+                continue
+
+            s = row[first_col]
+            ss = row[second_col]
             
             # Variance feasibility: ss - s^2/n >= -tolerance
             implied_ss = ss - (s**2 / n)
@@ -302,7 +337,8 @@ def detect_srm(
 
 def run_health_check(
     df: pd.DataFrame,
-    expected_split: list[float] | None = None
+    expected_split: list[float] | None = None,
+    dimensions: list[str] | None = None
 ) -> dict:
     """
     전체 Health Check 실행 (스키마 검증 + SRM 탐지)
@@ -311,6 +347,7 @@ def run_health_check(
         df: 업로드된 데이터프레임
         expected_split: 기대 트래픽 분배 리스트 (기본: None -> Equal Split)
                         2개일 경우 (50, 50) 등.
+        dimensions: segment 컬럼 목록. 지정하면 SRM은 segment를 합산한 variant별 users로 검사
     
     Returns:
         dict: {
@@ -320,7 +357,7 @@ def run_health_check(
         }
     """
     # 1. 스키마 검증
-    schema_result = validate_schema(df.copy())
+    schema_result = validate_schema(df.copy(), dimensions=dimensions)
     
     result = {
         "schema": schema_result,
@@ -337,7 +374,11 @@ def run_health_check(
         # Extract users per variant
         # Ensure correct order logic or pass as dict
         # Assuming df has unique variants (checked in schema)
-        variants_map = dict(zip(df["variant"], df["users"]))
+        if dimensions:
+            totals = df.groupby("variant", sort=False)["users"].sum()
+            variants_map = dict(zip(totals.index, totals.tolist()))
+        else:
+            variants_map = dict(zip(df["variant"], df["users"]))
         
         # If expected_split provided, ensure we map it correctly.
         # But for generic purpose, simplest is assuming df order/map matches expected_split order if provided list.
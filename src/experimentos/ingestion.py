@@ -0,0 +1,440 @@
+"""
+User-level 데이터 ingestion 모듈
+
+user 1명당 1행인 원시 데이터(user_id, variant, converted, metric 값, 선택적 segment 컬럼)를
+CSV 또는 Parquet에서 읽어, 기존 분석 함수가 그대로 받는 variant 집계 프레임
+(variant, users, conversions, {metric}_sum, {metric}_sum_sq)으로 만듭니다.
+
+- 파일을 chunk 단위 작업(CSV 바이트 구간 / Parquet row group 묶음)으로 나눠
+  worker process가 각자 읽고 집계하므로, 메모리는 worker 수 × chunk 크기로 제한됩니다.
+- chunk 집계는 (n, mean, M2) 형식으로 만들어 moments.merge_shards로 병합하므로
+  chunk 분할·완료 순서와 무관하게 결과가 같고, 큰 값에서도 자릿수 상쇄가 없습니다.
+- 압축된 CSV(.gz 등)는 구간 분할이 불가능해 메인 process에서 순차로 읽고 집계만 분산합니다.
+- 같은 (segment, variant) 안에서 user_id가 두 번 이상 나오면(재노출, event 단위 export 등)
+  users·conversions·metric이 중복 집계되므로 IngestionError로 거부합니다. 작업마다 (key, user_id)
+  64-bit hash를 돌려받아 메인 process에서 모아 확인하므로, 추가 메모리는 행당 8바이트입니다.
+
+제약: CSV의 따옴표 안 개행은 지원하지 않습니다 (구간 경계를 개행으로 찾음).
+"""
+
+import argparse
+import io
+import logging
+import os
+from collections.abc import Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .moments import merge_shards
+from .schema import ExperimentSchema
+
+logger = logging.getLogger("experimentos")
+
+USER_ID_COLUMN = "user_id"
+VARIANT_COLUMN = "variant"
+CONVERTED_COLUMN = "converted"
+REQUIRED_COLUMNS: tuple[str, ...] = (USER_ID_COLUMN, VARIANT_COLUMN, CONVERTED_COLUMN)
+"""User-level 입력 필수 컬럼"""
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+"""집계 worker process 수 (1이면 메인 process에서 순차 처리)"""
+
+INGEST_CHUNK_BYTES = int(os.getenv("INGEST_CHUNK_BYTES", str(64 * 1024 * 1024)))
+"""비압축 CSV 작업 1개의 바이트 크기"""
+
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "1000000"))
+"""Parquet / 압축 CSV 작업 1개의 최대 행 수"""
+
+DTYPE_SAMPLE_ROWS = 10000
+"""metrics=None일 때 CSV 숫자 컬럼 판별에 읽는 첫 chunk 행 수"""
+
+_COMPRESSED_SUFFIXES = (".gz", ".bz2", ".zip", ".xz", ".zst")
+
+
+class IngestionError(ValueError):
+    """입력 파일이 user-level 스키마와 맞지 않는 경우"""
+
+
+def aggregate_user_level(
+    source: str | os.PathLike[str],
+    metrics: Sequence[str] | None = None,
+    dimensions: Sequence[str] = (),
+    *,
+    workers: int = INGEST_WORKERS,
+    chunk_bytes: int = INGEST_CHUNK_BYTES,
+    chunk_rows: int = INGEST_CHUNK_ROWS,
+    output: str = "sums",
+) -> pd.DataFrame:
+    """
+    User-level 파일을 variant(× segment) 집계 프레임으로 변환
+
+    Args:
+        source: CSV(.csv, .csv.gz 등) 또는 Parquet(.parquet, .pq) 경로
+        metrics: continuous metric 컬럼 (None이면 필수/segment 컬럼을 뺀 숫자 컬럼 전부,
+            Parquet은 schema, CSV는 첫 chunk의 dtype으로 판별). 빈 값은 0으로 취급합니다
+            (metric per user).
+        dimensions: segment 컬럼 (결과에서 variant 앞의 key가 됨)
+        workers: worker process 수
+        chunk_bytes: 비압축 CSV 작업 크기
+        chunk_rows: Parquet / 압축 CSV 작업 최대 행 수
+        output: "sums" → {metric}_sum/_sum_sq, "moments" → {metric}_mean/_m2
+
+    Returns:
+        DataFrame: dimensions + variant, users, conversions, metric 컬럼
+        (segment별 control 행이 먼저)
+
+    Raises:
+        IngestionError: 필수 컬럼 누락, 알 수 없는 metric/segment 컬럼, 지원하지 않는 형식,
+            metric 또는 converted에 숫자가 아닌 값이 있는 경우, user_id가 비어 있거나
+            같은 (segment, variant) 안에서 중복된 경우
+    """
+    if output not in ("sums", "moments"):
+        raise ValueError(f"Unknown output format: {output}. Use 'sums' or 'moments'.")
+
+    path = Path(source)
+    fmt = _detect_format(path)
+    header = _read_header(path, fmt)
+    dimensions = list(dimensions)
+    metrics = _resolve_metrics(path, fmt, header, metrics, dimensions)
+    keys = dimensions + [VARIANT_COLUMN]
+    columns = [USER_ID_COLUMN] + keys + [CONVERTED_COLUMN] + metrics
+
+    tasks = _plan_tasks(path, fmt, header, columns, chunk_bytes, chunk_rows)
+    merged = _run_tasks(tasks, metrics, keys, workers)
+    if merged is None:
+        merged = _empty_aggregate(keys, metrics)
+    return _finalize(merged, keys, metrics, output)
+
+
+def aggregate_chunk(chunk: pd.DataFrame, metrics: Sequence[str], keys: Sequence[str]) -> pd.DataFrame:
+    """
+    user-level chunk 하나를 key별 (users, conversions, {metric}_mean, {metric}_m2)로 집계
+
+    chunk 안에서는 two-pass(평균 → 편차 제곱합)로 계산하므로 상쇄가 없습니다.
+    key(variant/segment)가 비어 있는 행은 제외합니다. converted/metric의 빈 값은 0이며,
+    값이 있는데 숫자가 아니면 IngestionError입니다.
+    """
+    keys = list(keys)
+    chunk = chunk.dropna(subset=keys)
+    codes = chunk.groupby(keys, sort=False).ngroup().to_numpy()
+    _, first_rows = np.unique(codes, return_index=True)
+    n_groups = len(first_rows)
+    result = chunk[keys].iloc[first_rows].reset_index(drop=True)
+
+    users = np.bincount(codes, minlength=n_groups)
+    converted = _numeric_values(chunk, CONVERTED_COLUMN) > 0
+    result["users"] = users
+    result["conversions"] = np.bincount(codes, weights=converted, minlength=n_groups).astype(np.int64)
+    for metric in metrics:
+        x = _numeric_values(chunk, metric)
+        mean = np.bincount(codes, weights=x, minlength=n_groups) / users
+        result[ExperimentSchema.mean_column(metric)] = mean
+        result[ExperimentSchema.m2_column(metric)] = np.bincount(
+            codes, weights=(x - mean[codes]) ** 2, minlength=n_groups
+        )
+    return result
+
+
+def _numeric_values(chunk: pd.DataFrame, column: str) -> np.ndarray:
+    """숫자 컬럼을 float64로 (빈 값 → 0, 숫자가 아닌 값 → IngestionError)"""
+    raw = chunk[column]
+    values = pd.to_numeric(raw, errors="coerce")
+    present = raw.notna()
+    if raw.dtype == object:
+        present &= raw.astype(str).str.strip() != ""
+    invalid = values.isna() & present
+    if invalid.any():
+        examples = raw[invalid].astype(str).unique()[:3].tolist()
+        raise IngestionError(f"Non-numeric values in column '{column}': {examples}")
+    return values.fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def _detect_format(path: Path) -> str:
+    name = path.name.lower()
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith(".csv") or any(name.endswith(f".csv{s}") for s in _COMPRESSED_SUFFIXES):
+        return "csv"
+    raise IngestionError(f"Unsupported file format: {path.name} (expected CSV or Parquet)")
+
+
+def _read_header(path: Path, fmt: str) -> list[str]:
+    if fmt == "parquet":
+        pq = _pyarrow_parquet()
+        header = list(pq.ParquetFile(path).schema_arrow.names)
+    else:
+        header = list(pd.read_csv(path, nrows=0).columns)
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise IngestionError(f"Missing required user-level columns: {missing}")
+    return header
+
+
+def _resolve_metrics(
+    path: Path,
+    fmt: str,
+    header: list[str],
+    metrics: Sequence[str] | None,
+    dimensions: list[str],
+) -> list[str]:
+    unknown = [c for c in dimensions if c not in header]
+    if unknown:
+        raise IngestionError(f"Unknown segment columns: {unknown}")
+    if metrics is None:
+        reserved = set(REQUIRED_COLUMNS) | set(dimensions)
+        candidates = [c for c in header if c not in reserved]
+        numeric = _numeric_columns(path, fmt, candidates)
+        skipped = [c for c in candidates if c not in numeric]
+        if skipped:
+            logger.info(f"Skipping non-numeric columns (not metrics): {skipped}")
+        return [c for c in candidates if c in numeric]
+    unknown = [c for c in metrics if c not in header]
+    if unknown:
+        raise IngestionError(f"Unknown metric columns: {unknown}")
+    return list(metrics)
+
+
+def _numeric_columns(path: Path, fmt: str, columns: list[str]) -> set[str]:
+    """
+    Parquet schema 또는 CSV 첫 chunk의 dtype 기준 숫자 컬럼 (bool 제외)
+
+    CSV 첫 chunk에서 값이 모두 비어 있는 컬럼은 판별할 근거가 없으므로 숫자로 봅니다
+    (빈 값 → 0 규칙과 같고, 이후 chunk에 텍스트가 있으면 집계 중 IngestionError).
+    """
+    if not columns:
+        return set()
+    if fmt == "parquet":
+        import pyarrow as pa
+
+        schema = _pyarrow_parquet().ParquetFile(path).schema_arrow
+        return {
+            c for c in columns
+            if pa.types.is_integer(schema.field(c).type)
+            or pa.types.is_floating(schema.field(c).type)
+            or pa.types.is_decimal(schema.field(c).type)
+        }
+    sample = pd.read_csv(path, usecols=columns, nrows=DTYPE_SAMPLE_ROWS)
+    return {
+        c for c in columns
+        if sample[c].isna().all()
+        or (pd.api.types.is_numeric_dtype(sample[c]) and not pd.api.types.is_bool_dtype(sample[c]))
+    }
+
+
+def _pyarrow_parquet() -> Any:
+    try:
+        import pyarrow.parquet
+    except ImportError as e:
+        raise IngestionError("Parquet ingestion requires the 'pyarrow' package") from e
+    return pyarrow.parquet
+
+
+# ---------------------------------------------------------------------------
+# Task planning: 작업은 (kind, ...) 튜플이며 worker가 직접 파일을 읽습니다
+# ---------------------------------------------------------------------------
+
+def _plan_tasks(
+    path: Path,
+    fmt: str,
+    header: list[str],
+    columns: list[str],
+    chunk_bytes: int,
+    chunk_rows: int,
+) -> Iterator[tuple[Any, ...] | pd.DataFrame]:
+    if fmt == "parquet":
+        metadata = _pyarrow_parquet().ParquetFile(path).metadata
+        batch: list[int] = []
+        rows = 0
+        for i in range(metadata.num_row_groups):
+            batch.append(i)
+            rows += metadata.row_group(i).num_rows
+            if rows >= chunk_rows:
+                yield ("parquet", str(path), tuple(batch), tuple(columns))
+                batch, rows = [], 0
+        if batch:
+            yield ("parquet", str(path), tuple(batch), tuple(columns))
+        return
+
+    dtypes = {c: "str" for c in columns[: columns.index(CONVERTED_COLUMN)]}
+    if path.name.lower().endswith(_COMPRESSED_SUFFIXES):
+        # 압축 스트림은 구간 분할이 불가능: 메인 process에서 순차 파싱
+        yield from pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_rows)
+        return
+
+    with open(path, "rb") as f:
+        data_start = len(f.readline())
+    size = path.stat().st_size
+    for start in range(data_start, size, max(chunk_bytes, 1)):
+        end = min(start + chunk_bytes, size)
+        yield ("csv", str(path), start, end, tuple(header), tuple(columns))
+
+
+def _load_task(task: tuple[Any, ...] | pd.DataFrame) -> pd.DataFrame:
+    if isinstance(task, pd.DataFrame):
+        return task
+    if task[0] == "parquet":
+        _, path, row_groups, columns = task
+        table = _pyarrow_parquet().ParquetFile(path).read_row_groups(list(row_groups), columns=list(columns))
+        return table.to_pandas()
+
+    _, path, start, end, header, columns = task
+    with open(path, "rb") as f:
+        # 구간 [start, end)에서 시작하는 줄만 담당 (경계에 걸친 줄은 시작한 구간이 끝까지 읽음)
+        f.seek(start - 1)
+        f.readline()
+        position = f.tell()
+        data = f.read(max(end - position, 0)) if position < end else b""
+        if data and not data.endswith(b"\n"):
+            data += f.readline()
+    if not data.strip():
+        return pd.DataFrame(columns=list(columns))
+    dtypes = {c: "str" for c in columns[: columns.index(CONVERTED_COLUMN)]}
+    return pd.read_csv(io.BytesIO(data), header=None, names=list(header), usecols=list(columns), dtype=dtypes)
+
+
+def _aggregate_task(
+    task: tuple[Any, ...] | pd.DataFrame, metrics: list[str], keys: list[str]
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """worker 진입점: 작업 하나를 읽고 (집계, user fingerprint)를 반환"""
+    chunk = _load_task(task)
+    if chunk.empty:
+        return _empty_aggregate(keys, metrics), np.empty(0, dtype=np.uint64)
+    return aggregate_chunk(chunk, metrics, keys), _user_fingerprints(chunk, keys)
+
+
+def _user_fingerprints(chunk: pd.DataFrame, keys: list[str]) -> np.ndarray:
+    """
+    행별 (key, user_id) 64-bit hash (정렬됨)
+
+    chunk 안의 중복은 여기서 user_id 예시와 함께 거부하고, chunk 사이의 중복은
+    _check_unique_users가 확인합니다. key가 비어 있는 행은 집계와 같이 제외합니다.
+    """
+    chunk = chunk.dropna(subset=keys)
+    if chunk[USER_ID_COLUMN].isna().any():
+        raise IngestionError(f"Missing values in column '{USER_ID_COLUMN}'")
+    identity = keys + [USER_ID_COLUMN]
+    fingerprints = np.sort(pd.util.hash_pandas_object(chunk[identity], index=False).to_numpy())
+    if (fingerprints[1:] == fingerprints[:-1]).any():
+        repeated = chunk.loc[chunk.duplicated(identity, keep=False), USER_ID_COLUMN]
+        raise IngestionError(
+            f"Duplicate {USER_ID_COLUMN} within a variant/segment (expected one row per user): "
+            f"{repeated.astype(str).unique()[:3].tolist()}"
+        )
+    return fingerprints
+
+
+def _check_unique_users(fingerprints: list[np.ndarray]) -> None:
+    """작업 사이에 같은 (key, user_id)가 있으면 IngestionError"""
+    if len(fingerprints) < 2:
+        return
+    merged = np.sort(np.concatenate(fingerprints))
+    duplicates = int(np.count_nonzero(merged[1:] == merged[:-1]))
+    if duplicates:
+        raise IngestionError(
+            f"Duplicate {USER_ID_COLUMN} within a variant/segment (expected one row per user): "
+            f"{duplicates} repeated rows across chunks"
+        )
+
+
+def _run_tasks(
+    tasks: Iterator[tuple[Any, ...] | pd.DataFrame],
+    metrics: list[str],
+    keys: list[str],
+    workers: int,
+) -> pd.DataFrame | None:
+    """
+    작업을 실행하며 완료된 부분 집계를 바로 병합
+
+    동시에 진행 중인 작업은 2 × workers개로 제한합니다 (메인 process가 파싱한
+    압축 CSV chunk가 큐에 쌓이지 않도록). 모든 작업이 끝나면 작업 사이의
+    user_id 중복을 확인합니다.
+    """
+    merged: pd.DataFrame | None = None
+    fingerprints: list[np.ndarray] = []
+
+    def absorb(result: tuple[pd.DataFrame, np.ndarray]) -> None:
+        nonlocal merged
+        part, users = result
+        if part.empty:
+            return
+        fingerprints.append(users)
+        merged = part if merged is None else merge_shards(pd.concat([merged, part], ignore_index=True), keys)
+
+    if workers <= 1:
+        for task in tasks:
+            absorb(_aggregate_task(task, metrics, keys))
+        _check_unique_users(fingerprints)
+        return merged
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set[Future[tuple[pd.DataFrame, np.ndarray]]] = set()
+        for task in tasks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    absorb(future.result())
+            pending.add(pool.submit(_aggregate_task, task, metrics, keys))
+        for future in wait(pending).done:
+            absorb(future.result())
+    _check_unique_users(fingerprints)
+    return merged
+
+
+def _empty_aggregate(keys: list[str], metrics: list[str]) -> pd.DataFrame:
+    columns = keys + ["users", "conversions"]
+    for metric in metrics:
+        columns += [ExperimentSchema.mean_column(metric), ExperimentSchema.m2_column(metric)]
+    return pd.DataFrame(columns=columns)
+
+
+def _finalize(merged: pd.DataFrame, keys: list[str], metrics: list[str], output: str) -> pd.DataFrame:
+    """control 행을 segment별로 앞에 두고, 요청한 continuous 형식으로 변환"""
+    variant = merged[VARIANT_COLUMN].astype(str).to_numpy()
+    sort_keys = [variant, variant != "control"]
+    sort_keys += [merged[d].astype(str).to_numpy() for d in reversed(keys[:-1])]
+    result = merged.iloc[np.lexsort(sort_keys)].reset_index(drop=True)
+    result = result.astype({"users": np.int64, "conversions": np.int64})
+
+    if output == "moments":
+        return result
+    n = result["users"].to_numpy(dtype=np.float64)
+    for metric in metrics:
+        mean = result.pop(ExperimentSchema.mean_column(metric)).to_numpy(dtype=np.float64)
+        m2 = result.pop(ExperimentSchema.m2_column(metric)).to_numpy(dtype=np.float64)
+        total = n * mean
+        result[ExperimentSchema.sum_column(metric)] = total
+        result[ExperimentSchema.sum_sq_column(metric)] = m2 + total * mean
+    return result
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """CLI: python -m src.experimentos.ingestion INPUT OUTPUT [--dimensions ...]"""
+    parser = argparse.ArgumentParser(description="Aggregate user-level rows into an ExperimentOS input file.")
+    parser.add_argument("input", help="User-level CSV or Parquet file")
+    parser.add_argument("output", help="Aggregated output (.csv or .parquet)")
+    parser.add_argument("--metrics", nargs="*", default=None, help="Continuous metric columns (default: all others)")
+    parser.add_argument("--dimensions", nargs="*", default=[], help="Segment columns")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    parser.add_argument("--moments", action="store_true", help="Write {metric}_mean/_m2 instead of _sum/_sum_sq")
+    args = parser.parse_args(argv)
+
+    result = aggregate_user_level(
+        args.input,
+        metrics=args.metrics,
+        dimensions=args.dimensions,
+        workers=args.workers,
+        output="moments" if args.moments else "sums",
+    )
+    if args.output.lower().endswith((".parquet", ".pq")):
+        result.to_parquet(args.output, index=False)
+    else:
+        result.to_csv(args.output, index=False)
+    logger.info(f"Aggregated {int(result['users'].sum())} users into {len(result)} rows → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
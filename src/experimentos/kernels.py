@@ -0,0 +1,559 @@
+"""
+벡터화 통계 커널
+
+statsmodels의 스칼라 호출(proportions_ztest, confint_proportions_2indep)과
+동일한 결과를 NumPy 배열 연산으로 한 번에 계산합니다.
+모든 함수는 broadcasting을 지원하므로 variant 벡터, variant × variant 행렬,
+variant × guardrail 행렬 어디에나 그대로 사용할 수 있습니다.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.stats import beta as beta_dist, chi2, norm, t as student_t
+
+from .moments import moments_from_sums
+
+ArrayLike = np.ndarray | float | int
+
+
+def proportions_ztest_2samp(
+    count_a: ArrayLike,
+    nobs_a: ArrayLike,
+    count_b: ArrayLike,
+    nobs_b: ArrayLike,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Two-proportion z-test (pooled variance, two-sided), 원소별 계산
+
+    ``proportions_ztest([count_a, count_b], [nobs_a, nobs_b])``와 같은 값을 반환합니다.
+    pooled 분산이 0이면(전환 0건 또는 전부 전환) statsmodels와 동일하게 NaN입니다.
+
+    Returns:
+        (z, p_value): a - b 기준 z 통계량과 양측 p-value
+    """
+    count_a = np.asarray(count_a, dtype=np.float64)
+    count_b = np.asarray(count_b, dtype=np.float64)
+    nobs_a = np.asarray(nobs_a, dtype=np.float64)
+    nobs_b = np.asarray(nobs_b, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_pooled = (count_a + count_b) / (nobs_a + nobs_b)
+        std_diff = np.sqrt(p_pooled * (1 - p_pooled) * (1.0 / nobs_a + 1.0 / nobs_b))
+        z = (count_a / nobs_a - count_b / nobs_b) / std_diff
+    p_value = 2 * norm.sf(np.abs(z))
+    return z, p_value
+
+
+def agresti_caffo_interval(
+    count_a: ArrayLike,
+    nobs_a: ArrayLike,
+    count_b: ArrayLike,
+    nobs_b: ArrayLike,
+    alpha: float = 0.05,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    p_a - p_b의 Agresti-Caffo 신뢰구간, 원소별 계산
+
+    ``confint_proportions_2indep(..., compare='diff', method='agresti-caffo')``와
+    같은 값을 반환합니다 (각 그룹에 성공 1, 실패 1을 더한 Wald 구간).
+
+    Returns:
+        (lower, upper)
+    """
+    count_a = np.asarray(count_a, dtype=np.float64) + 1
+    count_b = np.asarray(count_b, dtype=np.float64) + 1
+    nobs_a = np.asarray(nobs_a, dtype=np.float64) + 2
+    nobs_b = np.asarray(nobs_b, dtype=np.float64) + 2
+
+    p_a = count_a / nobs_a
+    p_b = count_b / nobs_b
+    diff = p_a - p_b
+    half_width = norm.isf(alpha / 2) * np.sqrt(p_a * (1 - p_a) / nobs_a + p_b * (1 - p_b) / nobs_b)
+    return diff - half_width, diff + half_width
+
+
+def safe_rate(count: ArrayLike, nobs: ArrayLike) -> np.ndarray:
+    """count / nobs, nobs가 0이면 0.0"""
+    count = np.asarray(count, dtype=np.float64)
+    nobs = np.asarray(nobs, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(nobs > 0, count / nobs, 0.0)
+
+
+@dataclass
+class WelchResult:
+    """welch_ttest_from_sums / welch_ttest_from_moments 결과 (모든 필드는 입력과 같은 shape의 배열)"""
+
+    control_mean: np.ndarray
+    treatment_mean: np.ndarray
+    absolute_lift: np.ndarray
+    relative_lift: np.ndarray
+    """mean_c가 0이면 0.0 (calculate_continuous_lift와 동일)"""
+    std_err: np.ndarray
+    dof: np.ndarray
+    """Welch-Satterthwaite 자유도 (정의되지 않는 셀은 NaN)"""
+    p_value: np.ndarray
+    ci_lower: np.ndarray
+    ci_upper: np.ndarray
+    is_valid: np.ndarray
+    insufficient_n: np.ndarray
+    """n < 2 (분산 계산 불가)"""
+    invalid_variance: np.ndarray
+    """M2 < 0 (sum 형식이면 sum_sq < sum^2/n, 허용 오차 초과)"""
+
+
+def welch_ttest_from_sums(
+    sum_c: ArrayLike,
+    sum_sq_c: ArrayLike,
+    n_c: ArrayLike,
+    sum_t: ArrayLike,
+    sum_sq_t: ArrayLike,
+    n_t: ArrayLike,
+    alpha: float = 0.05,
+    var_tolerance: float = 1e-9,
+) -> WelchResult:
+    """
+    Sufficient statistics (sum, sum_sq, n) 기반 Welch t-test, 원소별 계산
+
+    (n, mean, M2)로 변환한 뒤 welch_ttest_from_moments로 계산합니다.
+    변환 과정의 자릿수 상쇄로 생긴 작은 음수 M2는 var_tolerance까지 허용합니다.
+    """
+    n_c, mean_c, m2_c = moments_from_sums(sum_c, sum_sq_c, n_c)
+    n_t, mean_t, m2_t = moments_from_sums(sum_t, sum_sq_t, n_t)
+    return welch_ttest_from_moments(
+        n_c, mean_c, m2_c, n_t, mean_t, m2_t, alpha=alpha, var_tolerance=var_tolerance
+    )
+
+
+def welch_ttest_from_moments(
+    n_c: ArrayLike,
+    mean_c: ArrayLike,
+    m2_c: ArrayLike,
+    n_t: ArrayLike,
+    mean_t: ArrayLike,
+    m2_t: ArrayLike,
+    alpha: float = 0.05,
+    var_tolerance: float = 0.0,
+) -> WelchResult:
+    """
+    Sufficient statistics (n, mean, M2) 기반 Welch t-test, 원소별 계산
+
+    metric × variant 전체를 한 번의 scipy 호출(t.sf, t.ppf)로 계산합니다.
+    퇴화 케이스는 마스크로 처리하며 calculate_continuous_lift와 같은 값을 냅니다.
+
+    - n < 2 또는 M2 < -var_tolerance: is_valid=False (나머지 값은 0, p_value=1.0)
+    - 양쪽 분산 0 (또는 표준오차 underflow): 평균이 같으면 p=1.0, 다르면 0.0, CI 폭 0
+    """
+    arrays = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (n_c, mean_c, m2_c, n_t, mean_t, m2_t))
+    )
+    n_c, mean_c, m2_c, n_t, mean_t, m2_t = arrays
+
+    insufficient_n = (n_c < 2) | (n_t < 2)
+    invalid_variance = ~insufficient_n & ((m2_c < -var_tolerance) | (m2_t < -var_tolerance))
+    is_valid = ~insufficient_n & ~invalid_variance
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_c = np.maximum(m2_c, 0.0) / (n_c - 1)
+        var_t = np.maximum(m2_t, 0.0) / (n_t - 1)
+        se2_c = var_c / n_c
+        se2_t = var_t / n_t
+        std_err = np.sqrt(se2_c + se2_t)
+
+        testable = is_valid & (std_err > 0)
+        den = se2_c**2 / (n_c - 1) + se2_t**2 / (n_t - 1)
+        dof = np.where(den > 0, (se2_c + se2_t) ** 2 / den, n_c + n_t - 2)
+        dof = np.where(testable, dof, np.nan)
+        t_stat = (mean_t - mean_c) / std_err
+
+    safe_dof = np.where(testable, dof, 1.0)
+    p_tested = 2 * student_t.sf(np.abs(np.where(testable, t_stat, 0.0)), safe_dof)
+    p_degenerate = np.where(mean_c == mean_t, 1.0, 0.0)
+    p_value = np.where(testable, p_tested, p_degenerate)
+
+    margin = np.where(testable, student_t.ppf(1 - alpha / 2, safe_dof) * std_err, 0.0)
+    absolute_lift = mean_t - mean_c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_lift = np.where(mean_c != 0, absolute_lift / mean_c, 0.0)
+
+    zero = np.zeros_like(mean_c)
+    return WelchResult(
+        control_mean=np.where(is_valid, mean_c, zero),
+        treatment_mean=np.where(is_valid, mean_t, zero),
+        absolute_lift=np.where(is_valid, absolute_lift, zero),
+        relative_lift=np.where(is_valid, relative_lift, zero),
+        std_err=np.where(is_valid, std_err, zero),
+        dof=dof,
+        p_value=np.where(is_valid, p_value, 1.0),
+        ci_lower=np.where(is_valid, absolute_lift - margin, zero),
+        ci_upper=np.where(is_valid, absolute_lift + margin, zero),
+        is_valid=is_valid,
+        insufficient_n=insufficient_n,
+        invalid_variance=invalid_variance,
+    )
+
+
+@dataclass
+class RatioResult:
+    """ratio_delta_method 결과 (모든 필드는 입력과 같은 shape의 배열)"""
+
+    control_ratio: np.ndarray
+    treatment_ratio: np.ndarray
+    absolute_lift: np.ndarray
+    relative_lift: np.ndarray
+    """control_ratio가 0이면 0.0"""
+    std_err: np.ndarray
+    p_value: np.ndarray
+    ci_lower: np.ndarray
+    ci_upper: np.ndarray
+    is_valid: np.ndarray
+    insufficient_n: np.ndarray
+    """n < 2 (분산 계산 불가)"""
+    zero_denominator: np.ndarray
+    """분모 합이 0 (ratio 정의 불가)"""
+    invalid_variance: np.ndarray
+    """분자/분모 분산 또는 delta-method 분산이 음수 (허용 오차 초과)"""
+
+
+def ratio_delta_method(
+    num_c: ArrayLike,
+    den_c: ArrayLike,
+    num_sq_c: ArrayLike,
+    den_sq_c: ArrayLike,
+    num_den_c: ArrayLike,
+    n_c: ArrayLike,
+    num_t: ArrayLike,
+    den_t: ArrayLike,
+    num_sq_t: ArrayLike,
+    den_sq_t: ArrayLike,
+    num_den_t: ArrayLike,
+    n_t: ArrayLike,
+    alpha: float = 0.05,
+    var_tolerance: float = 1e-9,
+) -> RatioResult:
+    """
+    Ratio metric (Σnum / Σden) 차이 검정, delta method, 원소별 계산
+
+    분석 단위(user)별 분자 x, 분모 y의 합·제곱합·곱의 합과 단위 수 n만으로
+    Var(R) ≈ (Var(x) - 2R·Cov(x, y) + R²·Var(y)) / (n·mean(y)²)를 계산하고
+    두 arm의 차이를 z-test합니다. metric × variant 전체를 한 번의 norm.sf / norm.ppf로 계산합니다.
+
+    - n < 2, 분모 합 0, 분산 검증 실패: is_valid=False (나머지 값은 0, p_value=1.0)
+    - 양쪽 분산 0: ratio가 같으면 p=1.0, 다르면 0.0, CI 폭 0
+    """
+    arrays = np.broadcast_arrays(*(
+        np.asarray(a, dtype=np.float64)
+        for a in (num_c, den_c, num_sq_c, den_sq_c, num_den_c, n_c,
+                  num_t, den_t, num_sq_t, den_sq_t, num_den_t, n_t)
+    ))
+    ratio_c, var_c, bad_var_c = _ratio_variance(*arrays[:6], var_tolerance)
+    ratio_t, var_t, bad_var_t = _ratio_variance(*arrays[6:], var_tolerance)
+    den_c, n_c, den_t, n_t = arrays[1], arrays[5], arrays[7], arrays[11]
+
+    insufficient_n = (n_c < 2) | (n_t < 2)
+    zero_denominator = ~insufficient_n & ((den_c == 0) | (den_t == 0))
+    invalid_variance = ~insufficient_n & ~zero_denominator & (bad_var_c | bad_var_t)
+    is_valid = ~insufficient_n & ~zero_denominator & ~invalid_variance
+
+    absolute_lift = ratio_t - ratio_c
+    std_err = np.sqrt(np.maximum(var_c, 0.0) + np.maximum(var_t, 0.0))
+    testable = is_valid & (std_err > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(testable, absolute_lift / std_err, 0.0)
+        relative_lift = np.where(ratio_c != 0, absolute_lift / ratio_c, 0.0)
+    p_value = np.where(testable, 2 * norm.sf(np.abs(z)), np.where(ratio_c == ratio_t, 1.0, 0.0))
+    margin = np.where(testable, norm.ppf(1 - alpha / 2) * std_err, 0.0)
+
+    zero = np.zeros_like(ratio_c)
+    return RatioResult(
+        control_ratio=np.where(is_valid, ratio_c, zero),
+        treatment_ratio=np.where(is_valid, ratio_t, zero),
+        absolute_lift=np.where(is_valid, absolute_lift, zero),
+        relative_lift=np.where(is_valid, relative_lift, zero),
+        std_err=np.where(is_valid, std_err, zero),
+        p_value=np.where(is_valid, p_value, 1.0),
+        ci_lower=np.where(is_valid, absolute_lift - margin, zero),
+        ci_upper=np.where(is_valid, absolute_lift + margin, zero),
+        is_valid=is_valid,
+        insufficient_n=insufficient_n,
+        zero_denominator=zero_denominator,
+        invalid_variance=invalid_variance,
+    )
+
+
+def _ratio_variance(
+    num: np.ndarray,
+    den: np.ndarray,
+    num_sq: np.ndarray,
+    den_sq: np.ndarray,
+    num_den: np.ndarray,
+    n: np.ndarray,
+    var_tolerance: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """한 arm의 (ratio, delta-method 분산, 분산 검증 실패 마스크)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = num / den
+        mean_den = den / n
+        ss_num = num_sq - num**2 / n
+        ss_den = den_sq - den**2 / n
+        cross = num_den - num * den / n
+        # (n - 1)로 나눈 표본 (공)분산 기준
+        var = (ss_num - 2 * ratio * cross + ratio**2 * ss_den) / ((n - 1) * n * mean_den**2)
+    bad = (ss_num < -var_tolerance) | (ss_den < -var_tolerance) | (var < -var_tolerance)
+    return ratio, var, bad
+
+
+def chisquare_uniform_grouped(
+    observed: ArrayLike, groups: np.ndarray, n_groups: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    그룹별 chi-square goodness-of-fit (균등 분배 기대), 한 번에 계산
+
+    그룹 g에 속한 관측치에 대해 ``stats.chisquare(observed[groups == g])``와 같은 값을 냅니다.
+
+    Returns:
+        (chi2_stat, p_value, total): 길이 n_groups 배열. 관측치가 2개 미만이거나
+        합이 0인 그룹은 NaN
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    k = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    total = np.bincount(groups, weights=observed, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = (total / k)[groups]
+        stat = np.bincount(groups, weights=(observed - expected) ** 2 / expected, minlength=n_groups)
+        testable = (k >= 2) & (total > 0)
+        stat = np.where(testable, stat, np.nan)
+        p_value = np.where(testable, chi2.sf(stat, np.maximum(k - 1, 1)), np.nan)
+    return stat, p_value, total
+
+
+def correct_p_values_grouped(
+    p_values: ArrayLike, groups: np.ndarray, method: str = "bonferroni"
+) -> np.ndarray:
+    """
+    그룹(family)별 다중 비교 보정, 그룹 루프 없이 계산
+
+    각 그룹에 statsmodels ``multipletests(method=...)``를 따로 적용한 것과 같은 값을 냅니다.
+    NaN p-value는 보정에서 1.0으로 취급하고 결과에서는 NaN으로 유지합니다.
+
+    Args:
+        p_values: p-value 배열
+        groups: 같은 길이의 정수 그룹 코드 (0 이상)
+        method: 'bonferroni', 'holm', 'fdr_bh', 'none'
+    """
+    p = np.asarray(p_values, dtype=np.float64)
+    if method == "none" or p.size == 0:
+        return p.copy()
+    if method not in ("bonferroni", "holm", "fdr_bh"):
+        raise ValueError(f"Unknown correction method: {method}")
+
+    nan_mask = np.isnan(p)
+    p_filled = np.where(nan_mask, 1.0, p)
+    groups = np.asarray(groups, dtype=np.int64)
+    m = np.bincount(groups)[groups].astype(np.float64)
+
+    if method == "bonferroni":
+        adjusted = np.minimum(p_filled * m, 1.0)
+    else:
+        # Sort by (group, p); rank within each group starts at 1
+        order = np.lexsort((p_filled, groups))
+        g_sorted = groups[order]
+        p_sorted = p_filled[order]
+        m_sorted = m[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(g_sorted)) + 1]
+        starts = np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+        rank = np.arange(len(order)) - starts + 1
+
+        # Segmented running max/min within each group (no cross-group carry)
+        if method == "holm":
+            raw = np.minimum((m_sorted - rank + 1) * p_sorted, 1.0)
+            adj_sorted = pd.Series(raw).groupby(g_sorted).cummax().to_numpy()
+        else:
+            raw = np.minimum(p_sorted * m_sorted / rank, 1.0)
+            adj_sorted = (
+                pd.Series(raw[::-1]).groupby(g_sorted[::-1]).cummin().to_numpy()[::-1]
+            )
+
+        adjusted = np.empty_like(p_filled)
+        adjusted[order] = adj_sorted
+
+    return np.where(nan_mask, np.nan, adjusted)
+
+
+# ---------------------------------------------------------------------------
+# Beta posterior (Beta-Binomial) — quadrature, no sampling
+# ---------------------------------------------------------------------------
+
+BETA_TAIL = 1e-15
+"""적분 구간 밖에 남기는 Beta 확률질량 (양쪽 각각)"""
+
+
+@lru_cache(maxsize=8)
+def _gauss_legendre(nodes: int) -> tuple[np.ndarray, np.ndarray]:
+    """[-1, 1] Gauss-Legendre 노드와 가중치"""
+    return np.polynomial.legendre.leggauss(nodes)
+
+
+def prob_beta_greater(
+    alpha_1: ArrayLike,
+    beta_1: ArrayLike,
+    alpha_2: ArrayLike,
+    beta_2: ArrayLike,
+    nodes: int = 128,
+) -> np.ndarray:
+    """
+    P(X1 > X2), X1 ~ Beta(alpha_1, beta_1), X2 ~ Beta(alpha_2, beta_2) 독립, 원소별 계산
+
+    분산이 작은 쪽의 밀도 위에서 다른 쪽 CDF를 Gauss-Legendre로 적분합니다.
+    적분 구간은 그 분포의 [BETA_TAIL, 1 - BETA_TAIL] 분위수 구간이라 posterior가
+    아무리 좁아도 노드가 질량이 있는 곳에 모이고, 다른 쪽 CDF는 그보다 완만하게 변합니다.
+    결과는 구간 내 밀도 적분으로 정규화합니다. 난수를 쓰지 않으므로 항상 같은 값입니다.
+    """
+    a1, b1, a2, b2 = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (alpha_1, beta_1, alpha_2, beta_2))
+    )
+    var_1 = a1 * b1 / ((a1 + b1) ** 2 * (a1 + b1 + 1))
+    var_2 = a2 * b2 / ((a2 + b2) ** 2 * (a2 + b2 + 1))
+    over_1 = var_1 <= var_2
+    a_in, b_in = np.where(over_1, a1, a2), np.where(over_1, b1, b2)
+    a_out, b_out = np.where(over_1, a2, a1), np.where(over_1, b2, b1)
+
+    lo = beta_dist.ppf(BETA_TAIL, a_in, b_in)
+    hi = beta_dist.isf(BETA_TAIL, a_in, b_in)
+    x_nodes, weights = _gauss_legendre(nodes)
+    half = (hi - lo)[..., None] / 2
+    x = (lo + hi)[..., None] / 2 + half * x_nodes
+
+    density = weights * beta_dist.pdf(x, a_in[..., None], b_in[..., None])
+    # X1를 적분 변수로 두면 P = ∫ f1·F2, X2면 P = ∫ f2·(1 - F1)
+    other = np.where(
+        over_1[..., None],
+        beta_dist.cdf(x, a_out[..., None], b_out[..., None]),
+        beta_dist.sf(x, a_out[..., None], b_out[..., None]),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prob = (density * other).sum(axis=-1) / density.sum(axis=-1)
+    return np.clip(prob, 0.0, 1.0)
+
+
+def beta_expected_loss(
+    alpha_c: ArrayLike,
+    beta_c: ArrayLike,
+    alpha_t: ArrayLike,
+    beta_t: ArrayLike,
+    nodes: int = 128,
+) -> np.ndarray:
+    """
+    E[max(X_c - X_t, 0)] (treatment를 선택했을 때의 기대 손실), 원소별 계산
+
+    Beta 함수 항등식 B(a+1, b) / B(a, b) = a / (a + b)로 size-biased 분포를 써서
+    E[X_c·1{X_c > X_t}] = E[X_c]·P(Beta(a_c+1, b_c) > X_t)이므로
+
+        loss = E[X_c]·P(Beta(a_c+1, b_c) > Beta(a_t, b_t)) - E[X_t]·P(Beta(a_c, b_c) > Beta(a_t+1, b_t))
+    """
+    a_c, b_c, a_t, b_t = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (alpha_c, beta_c, alpha_t, beta_t))
+    )
+    mean_c = a_c / (a_c + b_c)
+    mean_t = a_t / (a_t + b_t)
+    loss = (
+        mean_c * prob_beta_greater(a_c + 1, b_c, a_t, b_t, nodes)
+        - mean_t * prob_beta_greater(a_c, b_c, a_t + 1, b_t, nodes)
+    )
+    return np.maximum(loss, 0.0)
+
+
+BEST_BREAKPOINTS = (1e-9, 1e-4, 0.01, 0.1, 0.5, 0.9, 0.99, 1 - 1e-4, 1 - 1e-9)
+"""P(being best) 적분 격자의 arm별 구간 경계 분위수 (BETA_TAIL 구간 양끝에 추가)"""
+
+
+def prob_beta_best(
+    alpha: ArrayLike,
+    beta: ArrayLike,
+    nodes: int = 8,
+) -> np.ndarray:
+    """
+    P(arm k가 가장 큼), X_k ~ Beta(alpha_k, beta_k) 독립, arm은 1-D 배열
+
+        P_k = ∫ f_k(x) Π_{j≠k} F_j(x) dx
+
+    를 모든 arm이 공유하는 적응형 격자에서 한 번에 적분합니다. 격자는 각 arm의
+    BEST_BREAKPOINTS 분위수를 구간 경계로 하는 composite Gauss-Legendre(구간당 nodes개)라서
+    좁은 posterior 주변에 노드가 모입니다. 적분 구간은 [max_j lo_j, max_j hi_j]이며,
+    그 아래에서는 Π F_j ≈ 0입니다. 상한이 max_j lo_j보다 작은 arm은 P = 0이고
+    그 구간에서 F = 1이므로 곱에서 빠집니다. 곱은 log 공간에서 계산하고 결과 합이 1이
+    되도록 정규화합니다.
+
+    메모리는 O(격자 × arm)이고 난수를 쓰지 않습니다. alpha, beta ≥ 1(균등 prior 이상)이면
+    구간당 8개 노드로 오차가 1e-14 이하이고, 1 미만이면 경계의 특이점 때문에 수렴이 느립니다.
+    """
+    a = np.asarray(alpha, dtype=np.float64).ravel()
+    b = np.asarray(beta, dtype=np.float64).ravel()
+    prob = np.zeros(a.shape)
+    if a.size == 0:
+        return prob
+
+    lo = beta_dist.ppf(BETA_TAIL, a, b)
+    hi = beta_dist.isf(BETA_TAIL, a, b)
+    start, stop = lo.max(), hi.max()
+    live = np.flatnonzero(hi >= start)
+    if live.size == 1:
+        prob[live] = 1.0
+        return prob
+    a, b = a[live], b[live]
+
+    quantiles = np.array(BEST_BREAKPOINTS)
+    edges = np.concatenate([[start, stop], beta_dist.ppf(quantiles[:, None], a, b).ravel()])
+    edges = np.unique(edges[(edges >= start) & (edges <= stop)])
+
+    x_nodes, weights = _gauss_legendre(nodes)
+    half = np.diff(edges)[:, None] / 2
+    x = ((edges[:-1] + edges[1:])[:, None] / 2 + half * x_nodes).ravel()
+    w = (half * weights).ravel()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_cdf = np.log(beta_dist.cdf(x, a[:, None], b[:, None]))  # (arm, grid)
+        log_pdf = beta_dist.logpdf(x, a[:, None], b[:, None])
+        others = log_cdf.sum(axis=0) - log_cdf
+        integrand = np.exp(log_pdf + others)
+    mass = np.nan_to_num(integrand, nan=0.0) @ w
+    prob[live] = mass / mass.sum()
+    return prob
+
+
+# ---------------------------------------------------------------------------
+# Normal posterior of the mean (continuous metrics) — closed form
+# ---------------------------------------------------------------------------
+
+def normal_posterior_comparison(
+    mean_c: ArrayLike,
+    std_err_c: ArrayLike,
+    mean_t: ArrayLike,
+    std_err_t: ArrayLike,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    X_c ~ N(mean_c, se_c²), X_t ~ N(mean_t, se_t²) 독립일 때 원소별 계산
+
+    Δ = mean_t - mean_c, σ = √(se_c² + se_t²)이면
+
+        P(X_t > X_c) = Φ(Δ/σ)
+        E[max(X_c - X_t, 0)] = σ·φ(Δ/σ) - Δ·Φ(-Δ/σ)
+
+    σ = 0이면 극한값(P = 1{Δ > 0}, loss = max(-Δ, 0))을 냅니다.
+
+    Returns:
+        (prob_treatment_beats_control, expected_loss)
+    """
+    mean_c, std_err_c, mean_t, std_err_t = (
+        np.asarray(a, dtype=np.float64) for a in (mean_c, std_err_c, mean_t, std_err_t)
+    )
+    delta = mean_t - mean_c
+    sigma = np.sqrt(std_err_c**2 + std_err_t**2)
+    degenerate = sigma == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = delta / np.where(degenerate, 1.0, sigma)
+        prob = np.where(degenerate, (delta > 0).astype(np.float64), norm.cdf(z))
+        loss = np.where(degenerate, np.maximum(-delta, 0.0), sigma * norm.pdf(z) - delta * norm.cdf(-z))
+    return prob, np.maximum(loss, 0.0)
@@ -6,13 +6,15 @@ Decision 룰 엔진 및 1pager Decision Memo 생성
 
 import logging
 
+from .results import GuardrailResult, PrimaryResult, as_dict
+
 logger = logging.getLogger("experimentos")
 
 
 def make_decision(
     health: dict,
-    primary: dict,
-    guardrails: list[dict] | dict,
+    primary: dict | PrimaryResult,
+    guardrails: list[dict] | list[GuardrailResult] | dict,
     sequential: dict | None = None,
 ) -> dict:
     """
@@ -20,8 +22,9 @@ def make_decision(
 
     Args:
         health: Health Check 결과 dict
-        primary: Primary 분석 결과 dict
-        guardrails: Guardrail 분석 결과 list[dict] (2-variant) 또는 dict (multi-variant)
+        primary: Primary 분석 결과 dict 또는 PrimaryResult
+        guardrails: Guardrail 분석 결과 list[dict] / list[GuardrailResult] (2-variant)
+                    또는 dict (multi-variant)
         sequential: Optional sequential testing 결과 dict.
                    If provided and can_stop=False, forces Hold decision.
 
@@ -33,6 +36,9 @@ def make_decision(
             "best_variant": str | None  (multi-variant only)
         }
     """
+    primary = as_dict(primary)
+    guardrails = as_dict(guardrails)
+
     # 룰 0: Sequential Testing — 조기 종료 불가 시 무조건 Hold
     if sequential is not None and not sequential.get("can_stop", True):
         return {
@@ -245,8 +251,8 @@ def generate_memo(
     experiment_name: str,
     decision: dict,
     health: dict,
-    primary: dict,
-    guardrails: list[dict] | dict,
+    primary: dict | PrimaryResult,
+    guardrails: list[dict] | list[GuardrailResult] | dict,
     bayesian_insights: dict | None = None,
     charter: dict | None = None,
     sequential: dict | None = None,
@@ -267,6 +273,9 @@ def generate_memo(
         str: Markdown 형식 1pager
     """
     from datetime import datetime
+
+    primary = as_dict(primary)
+    guardrails = as_dict(guardrails)
     
     # 현재 날짜
     today = datetime.now().strftime("%Y-%m-%d")
@@ -0,0 +1,244 @@
+"""
+Mergeable sufficient statistics 모듈 (n, mean, M2)
+
+sum / sum_sq 형식은 n과 값의 크기가 클 때 ``sum_sq - sum²/n``에서 자릿수 상쇄가 일어나
+분산이 음수가 되거나 정밀도를 잃습니다 (VAR_TOLERANCE는 이를 흡수할 뿐입니다).
+(n, mean, M2) 형식(Welford)은 평균 기준 편차 제곱합만 누적하므로 상쇄가 없고,
+Chan et al. 병렬 병합 공식으로 서로 다른 worker/shard의 결과를 정확하게, 순서와 무관하게
+합칠 수 있습니다.
+
+데이터프레임 입력 컬럼: {metric}_mean, {metric}_m2 (n은 users 컬럼, sum 형식과 동일)
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .schema import ExperimentSchema, resolve_schema
+
+ArrayLike = np.ndarray | float | int
+
+
+@dataclass(frozen=True, slots=True)
+class Moments:
+    """
+    단일 표본의 (n, mean, M2)
+
+    M2는 평균 기준 편차 제곱합 Σ(x - mean)²이며 표본분산은 M2 / (n - 1)입니다.
+    ``a.merge(b)`` (또는 ``a + b``)는 두 표본을 합친 것과 같은 값을 냅니다.
+    """
+
+    n: float
+    mean: float
+    m2: float
+
+    @classmethod
+    def from_values(cls, values: Sequence[float] | np.ndarray) -> "Moments":
+        """원시 값 배열에서 계산 (two-pass, 상쇄 없음)"""
+        x = np.asarray(values, dtype=np.float64)
+        if x.size == 0:
+            return cls(0.0, 0.0, 0.0)
+        mean = float(x.mean())
+        return cls(float(x.size), mean, float(((x - mean) ** 2).sum()))
+
+    @classmethod
+    def from_sums(cls, total: float, total_sq: float, n: float) -> "Moments":
+        """기존 (sum, sum_sq, n) 형식에서 변환 (M2는 음수일 수 있음, 검증은 호출부 책임)"""
+        n_, mean, m2 = moments_from_sums(total, total_sq, n)
+        return cls(float(n_), float(mean), float(m2))
+
+    @classmethod
+    def from_stats(cls, stats: "Moments | Mapping[str, float]") -> "Moments":
+        """
+        {n, mean, m2} 또는 {sum, sum_sq, n} dict를 Moments로 변환
+
+        이미 Moments면 그대로 반환합니다.
+
+        Raises:
+            KeyError: 두 형식 어디에도 맞지 않는 경우
+        """
+        if isinstance(stats, Moments):
+            return stats
+        if "m2" in stats:
+            return cls(float(stats["n"]), float(stats["mean"]), float(stats["m2"]))
+        return cls.from_sums(stats["sum"], stats["sum_sq"], stats["n"])
+
+    def merge(self, other: "Moments") -> "Moments":
+        """두 표본의 병합 (Chan et al.)"""
+        n, mean, m2 = merge_moments(self.n, self.mean, self.m2, other.n, other.mean, other.m2)
+        return Moments(float(n), float(mean), float(m2))
+
+    __add__ = merge
+
+    @property
+    def variance(self) -> float:
+        """표본분산 (n < 2면 NaN)"""
+        return self.m2 / (self.n - 1) if self.n >= 2 else float("nan")
+
+    def to_sums(self) -> tuple[float, float]:
+        """(sum, sum_sq) 형식으로 변환 (기존 입력 형식이 필요한 경우)"""
+        total = self.n * self.mean
+        return total, self.m2 + total * self.mean
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"n": self.n, "mean": self.mean, "m2": self.m2}
+
+
+def moments_from_sums(
+    total: ArrayLike, total_sq: ArrayLike, n: ArrayLike
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (sum, sum_sq, n) → (n, mean, M2), 원소별 계산
+
+    n = 0인 원소는 mean = M2 = 0입니다. 이 변환 자체가 상쇄를 포함하므로
+    큰 값에서는 M2가 음수일 수 있습니다 (VAR_TOLERANCE로 검증).
+    """
+    total = np.asarray(total, dtype=np.float64)
+    total_sq = np.asarray(total_sq, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(n > 0, total / n, 0.0)
+        m2 = np.where(n > 0, total_sq - total**2 / n, 0.0)
+    return n, mean, m2
+
+
+def merge_moments(
+    n_a: ArrayLike,
+    mean_a: ArrayLike,
+    m2_a: ArrayLike,
+    n_b: ArrayLike,
+    mean_b: ArrayLike,
+    m2_b: ArrayLike,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    두 표본의 (n, mean, M2) 병합 (Chan et al. parallel algorithm), 원소별 계산
+
+    결합법칙·교환법칙이 성립하므로 shard를 어떤 순서로 합쳐도 같은 결과입니다.
+    """
+    n_a, mean_a, m2_a, n_b, mean_b, m2_b = (
+        np.asarray(a, dtype=np.float64) for a in (n_a, mean_a, m2_a, n_b, mean_b, m2_b)
+    )
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight_b = np.where(n > 0, n_b / n, 0.0)
+        mean = mean_a + delta * weight_b
+        m2 = m2_a + m2_b + delta**2 * n_a * weight_b
+    return n, mean, m2
+
+
+def merge_moments_grouped(
+    n: ArrayLike,
+    mean: ArrayLike,
+    m2: ArrayLike,
+    groups: np.ndarray,
+    n_groups: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    그룹별 (n, mean, M2) 병합, 그룹 루프 없이 계산
+
+    그룹 g의 모든 행을 merge_moments로 차례로 합친 것과 같은 값을 냅니다.
+    pooled mean 기준 편차만 더하므로 행 수가 많아도 상쇄가 없습니다.
+
+    Args:
+        n: 행별 표본 크기 (1-D)
+        mean, m2: (행,) 또는 (행, metric) 배열
+        groups: 행별 정수 그룹 코드 (0 이상)
+        n_groups: 그룹 수
+
+    Returns:
+        (n, mean, M2): (n_groups,) 및 (n_groups, ...) 배열
+    """
+    n = np.asarray(n, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    m2 = np.asarray(m2, dtype=np.float64)
+    weights = n.reshape(n.shape + (1,) * (mean.ndim - 1))
+
+    n_total = _group_sum(n, groups, n_groups)
+    n_shaped = n_total.reshape(n_total.shape + (1,) * (mean.ndim - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled = np.where(n_shaped > 0, _group_sum(weights * mean, groups, n_groups) / n_shaped, 0.0)
+    deviation = mean - pooled[groups]
+    m2_total = _group_sum(m2 + weights * deviation**2, groups, n_groups)
+    return n_total, pooled, m2_total
+
+
+def _group_sum(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    if values.ndim == 1:
+        return np.bincount(groups, weights=values, minlength=n_groups)
+    out = np.zeros((n_groups,) + values.shape[1:])
+    np.add.at(out, groups, values)
+    return out
+
+
+def moment_arrays(
+    df: pd.DataFrame,
+    metrics: Sequence[str] | None = None,
+    schema: ExperimentSchema | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    데이터프레임의 continuous metric을 (n, mean, M2) 배열로 읽기
+
+    metric별로 {metric}_mean/_m2 형식이면 그대로, {metric}_sum/_sum_sq 형식이면 변환합니다.
+    n은 users 컬럼(소수점 버림, 숫자가 아니면 NaN)입니다.
+
+    Returns:
+        (n, mean, M2): n은 (행,), mean/M2는 (행, metric) 배열
+    """
+    schema = schema or resolve_schema(df)
+    metrics = list(schema.continuous if metrics is None else metrics)
+    n = np.trunc(pd.to_numeric(df["users"], errors="coerce").to_numpy(dtype=np.float64))
+    mean = np.empty((len(df), len(metrics)))
+    m2 = np.empty((len(df), len(metrics)))
+    moment_set = set(schema.moment_metrics)
+
+    for j, metric in enumerate(metrics):
+        if metric in moment_set:
+            mean[:, j] = df[schema.mean_column(metric)].to_numpy(dtype=np.float64)
+            m2[:, j] = df[schema.m2_column(metric)].to_numpy(dtype=np.float64)
+        else:
+            _, mean[:, j], m2[:, j] = moments_from_sums(
+                df[schema.sum_column(metric)].to_numpy(dtype=np.float64),
+                df[schema.sum_sq_column(metric)].to_numpy(dtype=np.float64),
+                n,
+            )
+    return n, mean, m2
+
+
+def merge_shards(df: pd.DataFrame, keys: Sequence[str] = ("variant",)) -> pd.DataFrame:
+    """
+    같은 key(예: variant, 또는 experiment_id + variant)의 shard 행을 하나로 병합
+
+    users, conversions, guardrail count, sum/sum_sq는 더하고,
+    {metric}_mean/_m2는 users를 n으로 Chan 병합합니다. 결과는 기존 분석 함수에
+    그대로 넣을 수 있으며, 이미 병합된 결과를 다시 병합해도(증분 병합) 값이 같습니다.
+
+    Raises:
+        ValueError: key 컬럼이 없는 경우
+    """
+    keys = list(keys)
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        raise ValueError(f"Missing key columns: {missing}")
+
+    schema = resolve_schema(df, dimensions=[k for k in keys if k != "variant"])
+    moment_cols = {
+        col
+        for metric in schema.moment_metrics
+        for col in (schema.mean_column(metric), schema.m2_column(metric))
+    }
+    additive = [c for c in df.columns if c not in keys and c not in moment_cols]
+
+    grouped = df.groupby(keys, sort=False)
+    merged = grouped[additive].sum().reset_index() if additive else grouped.size().reset_index()[keys]
+    if schema.moment_metrics:
+        codes = grouped.ngroup().to_numpy()
+        n, mean, m2 = moment_arrays(df, schema.moment_metrics, schema)
+        _, mean_total, m2_total = merge_moments_grouped(n, mean, m2, codes, len(merged))
+        for j, metric in enumerate(schema.moment_metrics):
+            merged[schema.mean_column(metric)] = mean_total[:, j]
+            merged[schema.m2_column(metric)] = m2_total[:, j]
+    return merged[list(df.columns)]
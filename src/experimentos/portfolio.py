@@ -0,0 +1,437 @@
+"""
+Portfolio 배치 분석 모듈
+
+여러 실험을 하나의 long-format 테이블(experiment_id + variant 행)로 받아
+SRM, Primary, Guardrail, Continuous 분석을 그룹 단위 벡터 연산으로 한 번에 수행합니다.
+실험 수만큼의 Python 루프가 없으므로 수만 개 실험도 단일 패스로 처리됩니다.
+
+같은 엔진으로 단일 실험의 segment(dimension 조합)별 분석도 수행합니다 (analyze_segments).
+
+결과는 tidy 테이블(DataFrame) 묶음이며, 실험 단위 검증 실패는 배치 전체를
+막지 않고 해당 실험의 status/issue로만 표시됩니다.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    GUARDRAIL_SEVERE_THRESHOLD,
+    GUARDRAIL_WORSENED_THRESHOLD,
+    MULTIPLE_TESTING_METHOD,
+    SIGNIFICANCE_ALPHA,
+    SRM_BLOCKED_THRESHOLD,
+    SRM_WARNING_THRESHOLD,
+    config,
+)
+from .continuous_analysis import ratio_arrays
+from .guardrails import detect_guardrail_columns
+from .kernels import (
+    agresti_caffo_interval,
+    chisquare_uniform_grouped,
+    correct_p_values_grouped,
+    proportions_ztest_2samp,
+    ratio_delta_method,
+    safe_rate,
+    welch_ttest_from_moments,
+)
+from .moments import moment_arrays
+from .results import to_arrow, write_parquet
+from .schema import resolve_schema
+
+PORTFOLIO_KEY_COLUMNS: tuple[str, ...] = ("experiment_id",)
+"""기본 실험 식별 컬럼"""
+
+
+@dataclass
+class PortfolioResult:
+    """
+    Portfolio 분석 결과 (tidy 테이블)
+
+    모든 테이블은 key 컬럼(기본: experiment_id)을 앞에 둡니다.
+    """
+
+    experiments: pd.DataFrame
+    """실험당 1행: variant 수, 총 유저, SRM, status/issue"""
+
+    variants: pd.DataFrame
+    """treatment variant당 1행: Primary (vs control) 결과"""
+
+    guardrails: pd.DataFrame
+    """treatment variant × guardrail당 1행"""
+
+    continuous: pd.DataFrame
+    """treatment variant × continuous metric당 1행 (metric_type: "mean" 또는 "ratio")"""
+
+    def to_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """테이블별 records 리스트 (JSON 응답용)"""
+        return {name: table.to_dict(orient="records") for name, table in self.tables().items()}
+
+    def tables(self) -> dict[str, pd.DataFrame]:
+        """테이블 이름 → DataFrame"""
+        return {
+            "experiments": self.experiments,
+            "variants": self.variants,
+            "guardrails": self.guardrails,
+            "continuous": self.continuous,
+        }
+
+    def to_arrow(self) -> dict[str, Any]:
+        """테이블별 pyarrow.Table (숫자 컬럼은 복사 없이 변환, pyarrow 필요)"""
+        return {name: to_arrow(table) for name, table in self.tables().items()}
+
+    def write_parquet(self, directory: str | Path) -> list[Path]:
+        """테이블별 {directory}/{name}.parquet 저장 후 경로 목록 반환 (pyarrow 필요)"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name, table in self.tables().items():
+            path = directory / f"{name}.parquet"
+            write_parquet(table, path)
+            paths.append(path)
+        return paths
+
+
+def _experiment_issues(
+    codes: np.ndarray,
+    n_groups: int,
+    is_control: np.ndarray,
+    duplicated: np.ndarray,
+    users: np.ndarray,
+    conversions: np.ndarray,
+) -> np.ndarray:
+    """실험별 Blocked 사유 (정상이면 None), validate_schema의 검사 순서를 따름"""
+    variant_count = np.bincount(codes, minlength=n_groups)
+    control_count = np.bincount(codes, weights=is_control, minlength=n_groups)
+    duplicate_count = np.bincount(codes, weights=duplicated, minlength=n_groups)
+    bad_users = ~np.isfinite(users) | (users <= 0)
+    bad_conversions = ~np.isfinite(conversions) | (conversions < 0) | (conversions > users)
+    bad_users_count = np.bincount(codes, weights=bad_users, minlength=n_groups)
+    bad_conversions_count = np.bincount(codes, weights=bad_conversions, minlength=n_groups)
+
+    return np.select(
+        [
+            variant_count < 2,
+            control_count == 0,
+            duplicate_count > 0,
+            bad_users_count > 0,
+            bad_conversions_count > 0,
+        ],
+        [
+            "variant는 최소 2개여야 합니다",
+            "variant에 'control' 그룹이 반드시 포함되어야 합니다",
+            "중복된 variant 라벨이 있습니다.",
+            "users가 0 이하이거나 숫자가 아닌 행이 있습니다",
+            "conversions가 음수이거나 users보다 큰 행이 있습니다",
+        ],
+        default=None,
+    )
+
+
+def analyze_portfolio(
+    df: pd.DataFrame,
+    key_columns: tuple[str, ...] | list[str] = PORTFOLIO_KEY_COLUMNS,
+    guardrail_columns: list[str] | None = None,
+    correction_method: str = MULTIPLE_TESTING_METHOD,
+    abs_threshold: float = GUARDRAIL_WORSENED_THRESHOLD,
+    severe_threshold: float = GUARDRAIL_SEVERE_THRESHOLD,
+    family_columns: list[str] | None = None,
+) -> PortfolioResult:
+    """
+    Long-format 다중 실험 테이블 배치 분석
+
+    Args:
+        df: key 컬럼 + variant, users, conversions (+ guardrail count, {metric}_sum/_sum_sq 또는 _mean/_m2, ratio 컬럼)
+        key_columns: 실험(그룹)을 식별하는 컬럼
+        guardrail_columns: Guardrail 컬럼 (None이면 자동 탐지)
+        correction_method: p-value 보정 방법 (기본 family에서는 analyze_multivariant와 동일)
+        abs_threshold: Guardrail Worsened 판정 임계치
+        severe_threshold: Guardrail Severe 판정 임계치
+        family_columns: 다중 비교 보정 family를 정하는 컬럼 (key_columns의 부분집합).
+            None이면 key_columns (실험 내 treatment 간 보정),
+            []이면 테이블 전체를 하나의 family로 보정 (segment 간 보정).
+            Guardrail은 family × guardrail 단위로 보정합니다.
+
+    Returns:
+        PortfolioResult
+
+    Raises:
+        ValueError: 필수 컬럼이 없는 경우
+
+    Note:
+        SRM은 실험 내 균등 분배를 기대값으로 합니다 (run_health_check 기본값과 동일).
+    """
+    key_columns = list(key_columns)
+    missing = [c for c in [*key_columns, "variant", "users", "conversions"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {', '.join(missing)}")
+
+    # 1. Group codes and per-row arrays (input frame is never mutated)
+    codes = df.groupby(key_columns, sort=True, dropna=False).ngroup().to_numpy()
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    first_row = np.unique(codes, return_index=True)[1]
+    keys = df[key_columns].iloc[first_row].reset_index(drop=True)
+
+    variant = df["variant"].astype(str).str.strip().str.lower()
+    users = pd.to_numeric(df["users"], errors="coerce").to_numpy(dtype=np.float64)
+    conversions = pd.to_numeric(df["conversions"], errors="coerce").to_numpy(dtype=np.float64)
+    is_control = (variant == "control").to_numpy()
+    duplicated = pd.DataFrame({"g": codes, "v": variant.to_numpy()}).duplicated().to_numpy()
+
+    # 2. Experiment validity + SRM
+    issues = _experiment_issues(codes, n_groups, is_control, duplicated, users, conversions)
+    valid_group = np.equal(issues, None)
+    srm_chi2, srm_p, total_users = chisquare_uniform_grouped(
+        np.nan_to_num(users), codes, n_groups
+    )
+    srm_status = np.select(
+        [~valid_group, srm_p < SRM_BLOCKED_THRESHOLD, srm_p < SRM_WARNING_THRESHOLD],
+        ["Blocked", "Blocked", "Warning"],
+        default="Healthy",
+    )
+
+    experiments = keys.assign(
+        variant_count=np.bincount(codes, minlength=n_groups),
+        total_users=total_users.astype(np.int64),
+        srm_chi2=np.where(valid_group, srm_chi2, np.nan),
+        srm_p_value=np.where(valid_group, srm_p, np.nan),
+        status=srm_status,
+        issue=issues,
+    )
+
+    # 3. Treatment rows paired with their experiment's control row
+    control_row = np.full(n_groups, -1, dtype=np.int64)
+    control_row[codes[is_control]] = np.flatnonzero(is_control)
+    t = np.flatnonzero(valid_group[codes] & ~is_control)
+    c = control_row[codes[t]]
+    t_keys = df[key_columns].iloc[t].reset_index(drop=True)
+    t_variant = variant.to_numpy()[t]
+
+    # 4. Primary (vs control, corrected within each experiment)
+    rate = safe_rate(conversions, users)
+    rate_t, rate_c = rate[t], rate[c]
+    _, p_value = proportions_ztest_2samp(conversions[t], users[t], conversions[c], users[c])
+    ci_lower, ci_upper = agresti_caffo_interval(conversions[t], users[t], conversions[c], users[c])
+    family_t = _family_codes(df, key_columns, family_columns, codes)[t]
+    p_corrected = correct_p_values_grouped(p_value, family_t, correction_method)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_lift = np.where(rate_c > 0, rate_t / rate_c - 1, np.nan)
+
+    variants = t_keys.assign(
+        variant=t_variant,
+        users=users[t].astype(np.int64),
+        conversions=conversions[t].astype(np.int64),
+        rate=rate_t,
+        control_rate=rate_c,
+        absolute_lift=rate_t - rate_c,
+        relative_lift=relative_lift,
+        ci_lower=ci_lower,
+        ci_upper=ci_upper,
+        p_value=p_value,
+        p_value_corrected=p_corrected,
+        is_significant=p_value < SIGNIFICANCE_ALPHA,
+        is_significant_corrected=p_corrected < SIGNIFICANCE_ALPHA,
+    )
+
+    # 5. Guardrails: (treatment rows × guardrail columns) matrix, then long format
+    if guardrail_columns is None:
+        guardrail_columns = detect_guardrail_columns(df, key_columns)
+    guardrail_columns = [col for col in guardrail_columns if col in df.columns]
+    guardrails = _guardrail_table(
+        df, guardrail_columns, t, c, users, t_keys, t_variant, family_t, correction_method,
+        abs_threshold, severe_threshold,
+    )
+
+    # 6. Continuous metrics: Welch over (treatment rows × metrics)
+    continuous = _continuous_table(df, t, c, users, t_keys, t_variant)
+
+    return PortfolioResult(
+        experiments=experiments,
+        variants=variants,
+        guardrails=guardrails,
+        continuous=continuous,
+    )
+
+
+def analyze_segments(
+    df: pd.DataFrame,
+    dimensions: list[str],
+    guardrail_columns: list[str] | None = None,
+    correction_method: str = MULTIPLE_TESTING_METHOD,
+    abs_threshold: float = GUARDRAIL_WORSENED_THRESHOLD,
+    severe_threshold: float = GUARDRAIL_SEVERE_THRESHOLD,
+) -> PortfolioResult:
+    """
+    Segment(dimension) 단위 분석
+
+    variant + N개 dimension 컬럼(예: country, platform)을 가진 단일 실험 테이블을
+    dimension 조합(segment cell)별로 나누어 SRM/Primary/Guardrail/Continuous를 계산합니다.
+    analyze_portfolio와 같은 엔진을 사용하며, experiments 테이블의 각 행이 segment cell입니다.
+
+    다중 비교 보정은 segment 내부가 아니라 전체 segment × treatment 비교를 하나의
+    family로 적용합니다 (segment를 많이 나눌수록 보정도 강해짐).
+
+    Args:
+        df: dimension 컬럼 + variant, users, conversions (+ guardrail, continuous 컬럼)
+        dimensions: segment를 정의하는 컬럼 목록 (1개 이상)
+        guardrail_columns: Guardrail 컬럼 (None이면 dimension 컬럼을 제외하고 자동 탐지)
+        correction_method: segment 간 p-value 보정 방법
+
+    Raises:
+        ValueError: dimension이 비어 있거나 필수 컬럼이 없는 경우
+    """
+    if not dimensions:
+        raise ValueError("dimension 컬럼을 1개 이상 지정해야 합니다")
+    return analyze_portfolio(
+        df,
+        key_columns=dimensions,
+        guardrail_columns=guardrail_columns,
+        correction_method=correction_method,
+        abs_threshold=abs_threshold,
+        severe_threshold=severe_threshold,
+        family_columns=[],
+    )
+
+
+def _family_codes(
+    df: pd.DataFrame,
+    key_columns: list[str],
+    family_columns: list[str] | None,
+    codes: np.ndarray,
+) -> np.ndarray:
+    """행별 보정 family 코드"""
+    if family_columns is None or list(family_columns) == key_columns:
+        return codes
+    unknown = [col for col in family_columns if col not in key_columns]
+    if unknown:
+        raise ValueError(f"family_columns는 key_columns에 포함되어야 합니다: {', '.join(unknown)}")
+    if not family_columns:
+        return np.zeros(len(df), dtype=np.int64)
+    return df.groupby(list(family_columns), sort=True, dropna=False).ngroup().to_numpy()
+
+
+def _long_format(
+    t_keys: pd.DataFrame,
+    t_variant: np.ndarray,
+    names: list[str],
+    name_column: str,
+    keep: np.ndarray,
+    columns: dict[str, np.ndarray],
+) -> pd.DataFrame:
+    """(treatment rows × names) 행렬을 keep 셀만 남긴 long-format 테이블로 변환"""
+    rows, cols = np.nonzero(keep)
+    table = t_keys.iloc[rows].reset_index(drop=True)
+    table["variant"] = t_variant[rows]
+    table[name_column] = np.asarray(names, dtype=object)[cols]
+    for name, values in columns.items():
+        table[name] = values[rows, cols]
+    return table
+
+
+def _guardrail_table(
+    df: pd.DataFrame,
+    guardrail_columns: list[str],
+    t: np.ndarray,
+    c: np.ndarray,
+    users: np.ndarray,
+    t_keys: pd.DataFrame,
+    t_variant: np.ndarray,
+    family_t: np.ndarray,
+    correction_method: str,
+    abs_threshold: float,
+    severe_threshold: float,
+) -> pd.DataFrame:
+    counts = np.trunc(
+        df[guardrail_columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    ) if guardrail_columns else np.empty((len(df), 0))
+    count_t, count_c = counts[t], counts[c]
+    users_t, users_c = users[t][:, None], users[c][:, None]
+
+    rate_t = safe_rate(count_t, users_t)
+    rate_c = safe_rate(count_c, users_c)
+    delta = rate_t - rate_c
+    _, p_value = proportions_ztest_2samp(count_t, users_t, count_c, users_c)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_lift = np.where(rate_c > 0, rate_t / rate_c - 1, np.nan)
+
+    # Long-format inputs often carry a guardrail for only some experiments
+    present = np.isfinite(count_t) & np.isfinite(count_c)
+    family = family_t[:, None] * len(guardrail_columns) + np.arange(len(guardrail_columns))
+    p_corrected = np.full_like(p_value, np.nan)
+    p_corrected[present] = correct_p_values_grouped(
+        p_value[present], family[present], correction_method
+    )
+    table = _long_format(t_keys, t_variant, guardrail_columns, "guardrail", present, {
+        "control_count": count_c,
+        "treatment_count": count_t,
+        "control_rate": rate_c,
+        "treatment_rate": rate_t,
+        "delta": delta,
+        "relative_lift": relative_lift,
+        "worsened": delta >= abs_threshold,
+        "severe": delta >= severe_threshold,
+        "p_value": p_value,
+        "p_value_corrected": p_corrected,
+    })
+    return table.astype({"control_count": np.int64, "treatment_count": np.int64})
+
+
+def _continuous_table(
+    df: pd.DataFrame,
+    t: np.ndarray,
+    c: np.ndarray,
+    users: np.ndarray,
+    t_keys: pd.DataFrame,
+    t_variant: np.ndarray,
+) -> pd.DataFrame:
+    schema = resolve_schema(df)
+    metrics = list(schema.continuous)
+    _, mean, m2 = moment_arrays(df, metrics, schema)
+
+    welch = welch_ttest_from_moments(
+        users[c][:, None], mean[c], m2[c],
+        users[t][:, None], mean[t], m2[t],
+        alpha=SIGNIFICANCE_ALPHA,
+        var_tolerance=config.VAR_TOLERANCE,
+    )
+    present = np.isfinite(mean[t]) & np.isfinite(m2[t]) & np.isfinite(mean[c]) & np.isfinite(m2[c])
+    table = _long_format(t_keys, t_variant, metrics, "metric", present, {
+        "control_mean": welch.control_mean,
+        "treatment_mean": welch.treatment_mean,
+        "absolute_lift": welch.absolute_lift,
+        "relative_lift": welch.relative_lift,
+        "ci_lower": welch.ci_lower,
+        "ci_upper": welch.ci_upper,
+        "p_value": welch.p_value,
+        "is_significant": welch.p_value < SIGNIFICANCE_ALPHA,
+        "is_valid": welch.is_valid,
+    })
+    table["metric_type"] = "mean"
+
+    ratio_metrics = list(schema.ratio_metrics)
+    if not ratio_metrics:
+        return table
+    stats = ratio_arrays(df, ratio_metrics)
+    ratio = ratio_delta_method(
+        *(a[c] for a in stats),
+        *(a[t] for a in stats),
+        alpha=SIGNIFICANCE_ALPHA,
+        var_tolerance=config.VAR_TOLERANCE,
+    )
+    present = np.logical_and.reduce([np.isfinite(a[t]) & np.isfinite(a[c]) for a in stats[:5]])
+    ratios = _long_format(t_keys, t_variant, ratio_metrics, "metric", present, {
+        "control_mean": ratio.control_ratio,
+        "treatment_mean": ratio.treatment_ratio,
+        "absolute_lift": ratio.absolute_lift,
+        "relative_lift": ratio.relative_lift,
+        "ci_lower": ratio.ci_lower,
+        "ci_upper": ratio.ci_upper,
+        "p_value": ratio.p_value,
+        "is_significant": ratio.p_value < SIGNIFICANCE_ALPHA,
+        "is_valid": ratio.is_valid,
+    })
+    ratios["metric_type"] = "ratio"
+    return pd.concat([table, ratios], ignore_index=True)
@@ -0,0 +1,261 @@
+"""
+Report 파이프라인 모듈
+
+Health check → Primary → Guardrails → Continuous → Bayesian → Decision → Memo 단계를
+하나의 DataFrame 위에서 각각 정확히 한 번 실행하고, 중간 결과를 다음 단계와 공유합니다.
+"""
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+from .analysis import (
+    analyze_multivariant,
+    calculate_bayesian_insights,
+    calculate_bayesian_insights_multivariant,
+    calculate_continuous_metrics,
+    calculate_continuous_metrics_multivariant,
+    calculate_guardrails,
+    calculate_guardrails_multivariant,
+    calculate_primary,
+    is_multivariant,
+)
+from .config import MULTIPLE_TESTING_METHOD
+from .healthcheck import run_health_check
+from .memo import export_html, generate_memo, make_decision
+
+REPORT_STAGES: tuple[str, ...] = (
+    "health",
+    "primary",
+    "guardrails",
+    "continuous",
+    "bayesian",
+    "decision",
+    "memo",
+)
+"""실행 순서대로 정렬된 전체 stage 목록"""
+
+STAGE_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "health": (),
+    "primary": (),
+    "guardrails": (),
+    "continuous": (),
+    "bayesian": ("continuous",),
+    "decision": ("health", "primary", "guardrails"),
+    "memo": ("decision",),
+}
+"""각 stage가 입력으로 사용하는 선행 stage"""
+
+STAGE_OPTIONAL_INPUTS: dict[str, tuple[str, ...]] = {
+    "memo": ("bayesian",),
+}
+"""함께 선택된 경우에만 입력으로 사용하는 stage (자동 추가되지 않음)"""
+
+STAGE_RESULT_KEYS: dict[str, str] = {
+    "health": "health_result",
+    "primary": "primary_result",
+    "guardrails": "guardrail_results",
+    "continuous": "continuous_results",
+    "bayesian": "bayesian_insights",
+    "decision": "decision",
+    "memo": "memo",
+}
+"""Report payload에서 각 stage 결과가 담기는 키 (기존 엔드포인트 응답 키와 동일)"""
+
+
+@dataclass
+class ReportOptions:
+    """Report 실행 옵션"""
+
+    guardrail_columns: list[str] | None = None
+    """Guardrail 컬럼 (None이면 자동 탐지)"""
+
+    correction_method: str = MULTIPLE_TESTING_METHOD
+    """Multi-variant 다중 비교 보정 방법"""
+
+    experiment_name: str = "Experiment"
+    """Memo 제목에 사용할 실험명"""
+
+    expected_split: list[float] | None = None
+    """SRM 탐지용 기대 트래픽 분배 (None이면 균등 분배)"""
+
+
+def resolve_stages(stages: list[str] | None = None) -> list[str]:
+    """
+    요청된 stage 목록에 선행 stage를 추가하고 실행 순서대로 정렬
+
+    Args:
+        stages: 실행할 stage 이름 목록 (None이면 전체)
+
+    Returns:
+        list[str]: REPORT_STAGES 순서로 정렬된 실행 대상 stage
+
+    Raises:
+        ValueError: 알 수 없는 stage 이름이 포함된 경우
+    """
+    if not stages:
+        return list(REPORT_STAGES)
+
+    unknown = [s for s in stages if s not in STAGE_DEPENDENCIES]
+    if unknown:
+        raise ValueError(
+            f"Unknown report stage(s): {', '.join(unknown)}. "
+            f"Valid stages: {', '.join(REPORT_STAGES)}"
+        )
+
+    selected: set[str] = set()
+    pending = list(stages)
+    while pending:
+        stage = pending.pop()
+        if stage not in selected:
+            selected.add(stage)
+            pending.extend(STAGE_DEPENDENCIES[stage])
+
+    return [s for s in REPORT_STAGES if s in selected]
+
+
+def stage_inputs(stage: str, selected: list[str]) -> tuple[str, ...]:
+    """
+    stage 실행 전에 완료되어 있어야 하는 stage
+
+    필수 선행 stage에 더해, 함께 선택된 선택적 입력 stage를 포함합니다.
+    서로 의존하지 않는 stage를 동시에 실행할 때 순서 기준으로 사용합니다.
+    """
+    optional = tuple(s for s in STAGE_OPTIONAL_INPUTS.get(stage, ()) if s in selected)
+    return STAGE_DEPENDENCIES[stage] + optional
+
+
+def _find_best_variant(primary_result: dict[str, Any]) -> str | None:
+    """Highest absolute lift among variants significant after correction."""
+    best_variant = None
+    best_lift = -float("inf")
+    for v_name, v_data in primary_result.get("variants", {}).items():
+        if v_data.get("is_significant_corrected") and v_data["absolute_lift"] > best_lift:
+            best_lift = v_data["absolute_lift"]
+            best_variant = v_name
+    return best_variant
+
+
+def run_stage(
+    stage: str,
+    df: pd.DataFrame,
+    results: dict[str, Any],
+    options: ReportOptions,
+) -> Any:
+    """
+    단일 stage 실행
+
+    Args:
+        stage: stage 이름
+        df: 실험 데이터프레임 (읽기 전용)
+        results: 이미 실행된 stage 결과 ({stage: result})
+        options: Report 옵션
+
+    Returns:
+        stage 결과 (기존 분석 함수의 반환 형태 그대로)
+    """
+    multi = is_multivariant(df)
+
+    if stage == "health":
+        return run_health_check(df, expected_split=options.expected_split)
+
+    if stage == "primary":
+        if multi:
+            primary_result = analyze_multivariant(df, options.correction_method)
+            primary_result["is_multivariant"] = True
+            primary_result["best_variant"] = _find_best_variant(primary_result)
+            return primary_result
+        return calculate_primary(df)
+
+    if stage == "guardrails":
+        if multi:
+            return calculate_guardrails_multivariant(
+                df, guardrail_columns=options.guardrail_columns
+            )
+        return calculate_guardrails(df, guardrail_columns=options.guardrail_columns)
+
+    if stage == "continuous":
+        if multi:
+            return calculate_continuous_metrics_multivariant(df)
+        return calculate_continuous_metrics(df)
+
+    if stage == "bayesian":
+        if multi:
+            return calculate_bayesian_insights_multivariant(df, results["continuous"])
+        return calculate_bayesian_insights(df, results["continuous"])
+
+    if stage == "decision":
+        return make_decision(
+            health=results["health"],
+            primary=results["primary"],
+            guardrails=results["guardrails"],
+        )
+
+    if stage == "memo":
+        memo_markdown = generate_memo(
+            experiment_name=options.experiment_name,
+            decision=results["decision"],
+            health=results["health"],
+            primary=results["primary"],
+            guardrails=results["guardrails"],
+            bayesian_insights=results.get("bayesian"),
+        )
+        return {"markdown": memo_markdown, "html": export_html(memo_markdown)}
+
+    raise ValueError(f"Unknown report stage: {stage}")
+
+
+def iter_report(
+    df: pd.DataFrame,
+    stages: list[str] | None = None,
+    options: ReportOptions | None = None,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Stage를 순서대로 실행하며 (stage, result)를 하나씩 반환
+
+    각 stage는 한 번만 실행되며, 이후 stage는 앞선 결과를 재사용합니다.
+    """
+    options = options or ReportOptions()
+    results: dict[str, Any] = {}
+    for stage in resolve_stages(stages):
+        results[stage] = run_stage(stage, df, results, options)
+        yield stage, results[stage]
+
+
+def run_report(
+    df: pd.DataFrame,
+    stages: list[str] | None = None,
+    options: ReportOptions | None = None,
+    progress: Callable[[float, str | None], None] | None = None,
+) -> dict[str, Any]:
+    """
+    전체 Report 실행 (단일 패스)
+
+    Args:
+        df: 실험 데이터프레임
+        stages: 실행할 stage 목록 (None이면 전체, 선행 stage 자동 포함)
+        options: Report 옵션
+        progress: stage 완료 시마다 (완료 비율, stage 이름)으로 호출되는 콜백
+
+    Returns:
+        dict: {
+            "is_multivariant": bool,
+            "variant_count": int,
+            "stages": list[str],
+            "health_result": ..., "primary_result": ..., ...  # 실행된 stage만 포함
+        }
+    """
+    report: dict[str, Any] = {
+        "is_multivariant": is_multivariant(df),
+        "variant_count": int(df["variant"].nunique()),
+        "stages": [],
+    }
+    selected = resolve_stages(stages)
+    for stage, result in iter_report(df, selected, options):
+        report["stages"].append(stage)
+        report[STAGE_RESULT_KEYS[stage]] = result
+        if progress is not None:
+            progress(len(report["stages"]) / len(selected), stage)
+    return report
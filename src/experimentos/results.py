@@ -0,0 +1,285 @@
+"""
+분석 결과 타입 모듈
+
+Primary / Guardrail / Continuous / Bayesian 결과를 ``__slots__`` dataclass로 표현합니다.
+필드는 Python 기본 타입(float, int, bool)만 담으므로 응답 직렬화 시 numpy 스칼라 변환이
+필요 없고, 결과 하나당 dict 여러 개 대신 객체 하나만 할당합니다.
+
+- ``to_dict()``: 기존 분석 함수의 dict 형태 그대로 반환 (memo.make_decision 등 기존 호출부 호환)
+- ``to_record()``: 평탄한 1행 dict (테이블/Arrow/Parquet 변환용)
+- ``to_frame()`` / ``to_arrow()`` / ``write_parquet()``: 결과 목록을 컬럼 단위로 내보내기
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+
+@dataclass(slots=True)
+class ArmStats:
+    """단일 variant의 전환 집계"""
+
+    users: int
+    conversions: int
+    rate: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"users": self.users, "conversions": self.conversions, "rate": self.rate}
+
+
+@dataclass(slots=True)
+class PrimaryResult:
+    """2-variant Primary Metric 결과 (calculate_primary)"""
+
+    control: ArmStats
+    treatment: ArmStats
+    absolute_lift: float
+    relative_lift: float | None
+    """control 전환율이 0이면 None"""
+    ci_lower: float
+    ci_upper: float
+    p_value: float
+    is_significant: bool
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "control": self.control.to_dict(),
+            "treatment": self.treatment.to_dict(),
+            "absolute_lift": self.absolute_lift,
+            "relative_lift": self.relative_lift,
+            "ci_95": [self.ci_lower, self.ci_upper],
+            "p_value": self.p_value,
+            "is_significant": self.is_significant,
+        }
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "control_users": self.control.users,
+            "control_conversions": self.control.conversions,
+            "control_rate": self.control.rate,
+            "treatment_users": self.treatment.users,
+            "treatment_conversions": self.treatment.conversions,
+            "treatment_rate": self.treatment.rate,
+            "absolute_lift": self.absolute_lift,
+            "relative_lift": self.relative_lift,
+            "ci_lower": self.ci_lower,
+            "ci_upper": self.ci_upper,
+            "p_value": self.p_value,
+            "is_significant": self.is_significant,
+        }
+
+
+@dataclass(slots=True)
+class GuardrailResult:
+    """단일 (variant, guardrail) 결과"""
+
+    name: str
+    control_count: int
+    treatment_count: int
+    control_rate: float
+    treatment_rate: float
+    delta: float
+    relative_lift: float | None
+    worsened: bool
+    severe: bool
+    p_value: float
+    variant: str | None = None
+    """Multi-variant 결과에서만 설정"""
+    error: str | None = None
+    """count 변환 실패 메시지 (정상이면 None)"""
+
+    def to_dict(self) -> dict[str, Any]:
+        record: dict[str, Any] = {"name": self.name}
+        if self.variant is not None:
+            record["variant"] = self.variant
+        record.update({
+            "control_count": self.control_count,
+            "treatment_count": self.treatment_count,
+            "control_rate": self.control_rate,
+            "treatment_rate": self.treatment_rate,
+            "delta": self.delta,
+            "relative_lift": self.relative_lift,
+            "worsened": self.worsened,
+            "severe": self.severe,
+            "p_value": self.p_value,
+        })
+        if self.error is not None:
+            record["error"] = self.error
+        return record
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "variant": self.variant,
+            "name": self.name,
+            "control_count": self.control_count,
+            "treatment_count": self.treatment_count,
+            "control_rate": self.control_rate,
+            "treatment_rate": self.treatment_rate,
+            "delta": self.delta,
+            "relative_lift": self.relative_lift,
+            "worsened": self.worsened,
+            "severe": self.severe,
+            "p_value": self.p_value,
+            "error": self.error,
+        }
+
+
+@dataclass(slots=True)
+class ContinuousResult:
+    """
+    단일 continuous metric 결과
+
+    metric_type="mean": per-user 평균 Welch t-test (calculate_continuous_lift)
+    metric_type="ratio": Σnum / Σden delta-method z-test (calculate_ratio_lift),
+    control_mean/treatment_mean에는 ratio 값이 담깁니다.
+    """
+
+    metric_name: str
+    is_valid: bool
+    control_mean: float
+    treatment_mean: float
+    absolute_lift: float
+    relative_lift: float
+    p_value: float
+    ci_lower: float
+    ci_upper: float
+    is_significant: bool
+    error: str | None = None
+    """is_valid=False인 경우 사유"""
+    metric_type: str = "mean"
+
+    @classmethod
+    def invalid(cls, metric_name: str, reason: str, metric_type: str = "mean") -> "ContinuousResult":
+        """분석 불가 결과 (모든 값 0, p_value=1.0)"""
+        return cls(
+            metric_name=metric_name,
+            is_valid=False,
+            control_mean=0.0,
+            treatment_mean=0.0,
+            absolute_lift=0.0,
+            relative_lift=0.0,
+            p_value=1.0,
+            ci_lower=0.0,
+            ci_upper=0.0,
+            is_significant=False,
+            error=reason,
+            metric_type=metric_type,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        record: dict[str, Any] = {"metric_name": self.metric_name, "is_valid": self.is_valid}
+        if self.error is not None:
+            record["error"] = self.error
+        record.update({
+            "control_mean": self.control_mean,
+            "treatment_mean": self.treatment_mean,
+            "absolute_lift": self.absolute_lift,
+            "relative_lift": self.relative_lift,
+            "p_value": self.p_value,
+            "ci_95": [self.ci_lower, self.ci_upper],
+            "is_significant": self.is_significant,
+        })
+        if self.metric_type != "mean":
+            record["metric_type"] = self.metric_type
+        return record
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "metric_name": self.metric_name,
+            "is_valid": self.is_valid,
+            "control_mean": self.control_mean,
+            "treatment_mean": self.treatment_mean,
+            "absolute_lift": self.absolute_lift,
+            "relative_lift": self.relative_lift,
+            "p_value": self.p_value,
+            "ci_lower": self.ci_lower,
+            "ci_upper": self.ci_upper,
+            "is_significant": self.is_significant,
+            "error": self.error,
+            "metric_type": self.metric_type,
+        }
+
+
+@dataclass(slots=True)
+class BayesianResult:
+    """2-variant 베이지안 비교 결과 (Beta-Binomial 또는 continuous)"""
+
+    prob_treatment_beats_control: float
+    expected_loss: float
+    control_posterior: tuple[float, float] | None = None
+    """Beta posterior (alpha, beta), continuous 결과는 None"""
+    treatment_posterior: tuple[float, float] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "prob_treatment_beats_control": self.prob_treatment_beats_control,
+            "expected_loss": self.expected_loss,
+        }
+        if self.control_posterior is not None:
+            record["control_posterior"] = _posterior_dict(self.control_posterior)
+        if self.treatment_posterior is not None:
+            record["treatment_posterior"] = _posterior_dict(self.treatment_posterior)
+        return record
+
+    def to_record(self) -> dict[str, Any]:
+        control = self.control_posterior or (None, None)
+        treatment = self.treatment_posterior or (None, None)
+        return {
+            "prob_treatment_beats_control": self.prob_treatment_beats_control,
+            "expected_loss": self.expected_loss,
+            "control_alpha": control[0],
+            "control_beta": control[1],
+            "treatment_alpha": treatment[0],
+            "treatment_beta": treatment[1],
+        }
+
+
+def _posterior_dict(posterior: tuple[float, float]) -> dict[str, float]:
+    return {"alpha": posterior[0], "beta": posterior[1]}
+
+
+def as_dict(value: Any) -> Any:
+    """
+    결과 객체를 기존 dict 형태로 변환 (호환 어댑터)
+
+    to_dict()가 있는 객체는 변환하고, list/tuple은 원소별로 변환합니다.
+    이미 dict인 값은 그대로 반환합니다.
+    """
+    if hasattr(value, "to_dict") and not isinstance(value, (dict, pd.DataFrame)):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [as_dict(v) for v in value]
+    return value
+
+
+def to_frame(results: Iterable[Any]) -> pd.DataFrame:
+    """결과 목록을 1행 1결과 DataFrame으로 변환 (to_record 기준)"""
+    return pd.DataFrame.from_records([r.to_record() for r in results])
+
+
+def to_arrow(results: Sequence[Any] | pd.DataFrame):
+    """
+    결과 목록 또는 결과 테이블을 pyarrow.Table로 변환
+
+    DataFrame의 숫자 컬럼은 복사 없이 Arrow 버퍼로 넘어갑니다.
+
+    Raises:
+        ImportError: pyarrow가 설치되지 않은 경우
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Arrow/Parquet export requires the 'pyarrow' package") from e
+
+    frame = results if isinstance(results, pd.DataFrame) else to_frame(results)
+    return pyarrow.Table.from_pandas(frame, preserve_index=False)
+
+
+def write_parquet(results: Sequence[Any] | pd.DataFrame, path: Any) -> None:
+    """결과 목록 또는 결과 테이블을 Parquet 파일로 저장 (pyarrow 필요)"""
+    table = to_arrow(results)
+    import pyarrow.parquet
+
+    pyarrow.parquet.write_table(table, path)
@@ -0,0 +1,183 @@
+"""
+실험 데이터 스키마 모듈
+
+컬럼 이름만으로 각 컬럼의 역할(primary, guardrail count, continuous sum/sum_sq 또는
+mean/M2, ratio 분자·분모 합, dimension)을 분류합니다. 분류 결과는 컬럼 시그니처(컬럼 이름 튜플 + dimension)별로 한 번만 계산되어
+캐시되므로, 같은 DataFrame을 여러 stage가 다뤄도 컬럼 스캔은 한 번뿐입니다.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+
+import pandas as pd
+
+PRIMARY_COLUMNS: tuple[str, ...] = ("variant", "users", "conversions")
+"""필수 컬럼"""
+
+RESERVED_COLUMNS = frozenset({"metric_sum", "metric_sum_sq", "n"})
+"""어떤 역할로도 분석하지 않는 예약 컬럼"""
+
+SUM_SUFFIX = "_sum"
+SUM_SQ_SUFFIX = "_sum_sq"
+MEAN_SUFFIX = "_mean"
+M2_SUFFIX = "_m2"
+RATIO_SUFFIXES: tuple[str, ...] = ("_num_sum", "_den_sum", "_num_sum_sq", "_den_sum_sq", "_num_den_sum")
+"""Ratio metric 입력 컬럼 접미사 (분자 합, 분모 합, 각 제곱합, 분자×분모 곱의 합)"""
+CROSS_SUFFIX = "_num_den_sum"
+
+SCHEMA_CACHE_SIZE = 256
+"""캐시할 컬럼 시그니처 수"""
+
+
+@dataclass(frozen=True)
+class ExperimentSchema:
+    """
+    컬럼 역할 분류 결과 (불변, 컬럼 시그니처별로 공유됨)
+
+    - continuous: {metric}_sum + {metric}_sum_sq 또는 {metric}_mean + {metric}_m2가 있는 metric 이름
+    - moment_metrics: continuous 중 (mean, M2) 형식인 metric (두 형식이 모두 있으면 이쪽 우선)
+    - orphan_sums: {metric}_sum_sq가 없는 {metric}_sum 컬럼 (스키마 오류)
+    - orphan_moments: {metric}_mean이 없는 {metric}_m2 컬럼 (스키마 오류)
+    - ratio_metrics: RATIO_SUFFIXES 5개 컬럼이 모두 있는 metric (분자 합 / 분모 합)
+    - orphan_ratios: 나머지 ratio 컬럼이 빠진 {metric}_num_den_sum 컬럼 (스키마 오류)
+    - guardrails: 위 어디에도 속하지 않는 나머지 컬럼 (count로 취급)
+    """
+
+    columns: tuple[str, ...]
+    primary: tuple[str, ...]
+    missing_primary: tuple[str, ...]
+    dimensions: tuple[str, ...]
+    guardrails: tuple[str, ...]
+    continuous: tuple[str, ...]
+    orphan_sums: tuple[str, ...]
+    moment_metrics: tuple[str, ...]
+    orphan_moments: tuple[str, ...]
+    ratio_metrics: tuple[str, ...]
+    orphan_ratios: tuple[str, ...]
+
+    @staticmethod
+    def sum_column(metric: str) -> str:
+        return f"{metric}{SUM_SUFFIX}"
+
+    @staticmethod
+    def sum_sq_column(metric: str) -> str:
+        return f"{metric}{SUM_SQ_SUFFIX}"
+
+    @staticmethod
+    def mean_column(metric: str) -> str:
+        return f"{metric}{MEAN_SUFFIX}"
+
+    @staticmethod
+    def m2_column(metric: str) -> str:
+        return f"{metric}{M2_SUFFIX}"
+
+    @staticmethod
+    def ratio_columns(metric: str) -> tuple[str, str, str, str, str]:
+        """(num_sum, den_sum, num_sum_sq, den_sum_sq, num_den_sum) 컬럼 이름"""
+        num, den, num_sq, den_sq, cross = (f"{metric}{suffix}" for suffix in RATIO_SUFFIXES)
+        return num, den, num_sq, den_sq, cross
+
+    def value_columns(self, metric: str) -> tuple[str, str]:
+        """continuous metric의 입력 컬럼 쌍: (mean, m2) 또는 (sum, sum_sq)"""
+        if metric in self.moment_metrics:
+            return self.mean_column(metric), self.m2_column(metric)
+        return self.sum_column(metric), self.sum_sq_column(metric)
+
+    @property
+    def sum_metrics(self) -> tuple[str, ...]:
+        """continuous 중 (sum, sum_sq) 형식인 metric"""
+        return tuple(m for m in self.continuous if m not in self.moment_metrics)
+
+    @property
+    def sum_columns(self) -> list[str]:
+        return [self.sum_column(m) for m in self.sum_metrics]
+
+    @property
+    def sum_sq_columns(self) -> list[str]:
+        return [self.sum_sq_column(m) for m in self.sum_metrics]
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _classify(columns: tuple[str, ...], dimensions: tuple[str, ...]) -> ExperimentSchema:
+    column_set = set(columns)
+    dimension_set = set(dimensions)
+    guardrails: list[str] = []
+    continuous: list[str] = []
+    orphan_sums: list[str] = []
+    orphan_moments: list[str] = []
+    ratios: list[str] = []
+    orphan_ratios: list[str] = []
+    ratio_owner: dict[str, str] = {}
+    for col in columns:
+        name = str(col)
+        if name.endswith(CROSS_SUFFIX):
+            metric = name[: -len(CROSS_SUFFIX)]
+            members = ExperimentSchema.ratio_columns(metric)
+            if all(m in column_set for m in members):
+                ratio_owner.update(dict.fromkeys(members, metric))
+    moment_set = {
+        str(col)[: -len(M2_SUFFIX)]
+        for col in columns
+        if str(col).endswith(M2_SUFFIX) and f"{str(col)[: -len(M2_SUFFIX)]}{MEAN_SUFFIX}" in column_set
+    }
+
+    for col in columns:
+        if col in PRIMARY_COLUMNS or col in RESERVED_COLUMNS or col in dimension_set:
+            continue
+        name = str(col)
+        if name in ratio_owner:
+            if ratio_owner[name] not in ratios:
+                ratios.append(ratio_owner[name])
+            continue
+        if name.endswith(CROSS_SUFFIX):
+            orphan_ratios.append(col)
+            continue
+        if name.endswith(SUM_SQ_SUFFIX):
+            continue
+        if name.endswith(SUM_SUFFIX):
+            metric = name[: -len(SUM_SUFFIX)]
+            if metric in moment_set:
+                continue
+            if f"{metric}{SUM_SQ_SUFFIX}" in column_set:
+                continuous.append(metric)
+            else:
+                orphan_sums.append(col)
+            continue
+        if name.endswith(M2_SUFFIX):
+            if name[: -len(M2_SUFFIX)] not in moment_set:
+                orphan_moments.append(col)
+            continue
+        if name.endswith(MEAN_SUFFIX) and name[: -len(MEAN_SUFFIX)] in moment_set:
+            continuous.append(name[: -len(MEAN_SUFFIX)])
+            continue
+        guardrails.append(col)
+
+    return ExperimentSchema(
+        columns=columns,
+        primary=tuple(c for c in PRIMARY_COLUMNS if c in column_set),
+        missing_primary=tuple(c for c in PRIMARY_COLUMNS if c not in column_set),
+        dimensions=tuple(d for d in dimensions if d in column_set),
+        guardrails=tuple(guardrails),
+        continuous=tuple(continuous),
+        orphan_sums=tuple(orphan_sums),
+        moment_metrics=tuple(m for m in continuous if m in moment_set),
+        orphan_moments=tuple(orphan_moments),
+        ratio_metrics=tuple(ratios),
+        orphan_ratios=tuple(orphan_ratios),
+    )
+
+
+def resolve_schema(
+    data: pd.DataFrame | Iterable[str],
+    dimensions: Iterable[str] = (),
+) -> ExperimentSchema:
+    """
+    DataFrame(또는 컬럼 목록)의 ExperimentSchema 반환 (컬럼 시그니처 기준 memoize)
+
+    Args:
+        data: DataFrame 또는 컬럼 이름 목록
+        dimensions: segment/실험 key 컬럼 (guardrail 자동 탐지에서 제외)
+    """
+    columns = data.columns if isinstance(data, pd.DataFrame) else data
+    return _classify(tuple(columns), tuple(dimensions))
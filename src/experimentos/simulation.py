@@ -0,0 +1,313 @@
+"""
+Monte Carlo posterior 비교 모듈 (chunked, precision-target)
+
+닫힌 형태가 없는 경우(정확 계산 fallback, 사용자 정의 posterior 등)에 쓰는 시뮬레이션 엔진입니다.
+arm 0이 control이며, 모든 arm의 표본을 chunk 단위로 뽑아 다음 값을 누적합니다.
+
+- P(arm > control)
+- E[max(control - arm, 0)]
+- P(being best)
+
+tolerance가 없으면 ``samples``개를 한 chunk로 뽑으므로 기존 고정 크기 시뮬레이션과
+같은 난수열·같은 결과를 냅니다. tolerance가 있으면 chunk마다 Monte Carlo 표준오차(MCSE)를
+확인하고, 모든 treatment에서 목표 이하가 되면 멈춥니다. 승자가 뚜렷하면 첫 chunk에서 끝납니다.
+
+float32 모드는 표본을 float32로 직접 생성합니다(Beta는 standard_gamma 비율, Normal은
+standard_normal). chunk 메모리가 절반이 되며 누적은 항상 float64로 합니다.
+
+simulate_batch는 여러 작업을 thread/process pool에 나눠 실행하고, simulate_split은 비교 하나의
+고정 표본을 SIMULATION_SHARD_SAMPLES 단위 shard로 나눠 같은 pool에서 실행한 뒤 합칩니다.
+작업·shard마다 SeedSequence.spawn으로 만든 독립 난수열을 쓰므로 worker 수와 무관하게 같은
+결과가 나옵니다. pool은 (executor, worker 수)마다 처음 필요할 때 한 번 만들어 재사용합니다.
+"""
+
+import atexit
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+
+Sampler = Callable[[np.random.Generator, int], np.ndarray]
+"""(rng, size) → (arm, size) 표본 배열"""
+
+DTYPES = {"float64": np.float64, "float32": np.float32}
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(os.cpu_count() or 1)))
+"""simulate_batch/simulate_split worker 수 (1이면 순차 실행, 결과는 worker 수와 무관)"""
+
+SIMULATION_EXECUTOR = os.getenv("SIMULATION_EXECUTOR", "thread")
+"""simulate_batch executor ('thread' | 'process'). numpy 난수 생성은 GIL을 풀어 thread로도 확장됩니다"""
+
+SIMULATION_SHARD_SAMPLES = int(os.getenv("SIMULATION_SHARD_SAMPLES", "2500"))
+"""simulate_split shard당 표본 수. shard 수는 표본 수로만 정해지므로 결과는 worker 수와 무관합니다"""
+
+_POOLS: dict[tuple[str, int], Executor] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Monte Carlo 비교 결과 (treatment 축은 arm 1..K-1)"""
+
+    prob_beats_control: np.ndarray
+    expected_loss: np.ndarray
+    prob_being_best: np.ndarray
+    draws: int
+    """실제로 사용한 arm당 표본 수"""
+
+
+def _resolve_dtype(dtype: str) -> type:
+    try:
+        return DTYPES[dtype]
+    except KeyError:
+        raise ValueError(f"Unsupported simulation dtype: {dtype}") from None
+
+
+@dataclass(frozen=True)
+class BetaSampler:
+    """Beta(alpha_k, beta_k) arm 표본 생성기 (process pool로 보낼 수 있도록 pickle 가능)"""
+
+    alpha: np.ndarray
+    beta: np.ndarray
+    dtype: str = "float64"
+
+    def __call__(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        a, b = self.alpha[:, None], self.beta[:, None]
+        if _resolve_dtype(self.dtype) is np.float64:
+            return rng.beta(a, b, size=(len(a), size))
+        x = rng.standard_gamma(np.broadcast_to(a, (len(a), size)).astype(np.float32), dtype=np.float32)
+        y = rng.standard_gamma(np.broadcast_to(b, (len(b), size)).astype(np.float32), dtype=np.float32)
+        return x / (x + y)
+
+
+@dataclass(frozen=True)
+class NormalSampler:
+    """
+    Normal(mean_k, std_err_k) arm 표본 생성기
+
+    float32에서는 모든 arm을 control 평균만큼 평행이동해 생성합니다. 비교·차이만
+    사용하므로 결과는 같고, 큰 평균값에서 float32 유효숫자가 차이를 지우지 않습니다.
+    """
+
+    mean: np.ndarray
+    std_err: np.ndarray
+    dtype: str = "float64"
+
+    def __call__(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        mu, sd = self.mean[:, None], self.std_err[:, None]
+        if _resolve_dtype(self.dtype) is np.float64:
+            return rng.normal(mu, sd, size=(len(mu), size))
+        z = rng.standard_normal((len(mu), size), dtype=np.float32)
+        return z * sd.astype(np.float32) + (mu - mu[0]).astype(np.float32)
+
+
+def beta_sampler(alpha: Sequence[float], beta: Sequence[float], dtype: str = "float64") -> BetaSampler:
+    """Beta(alpha_k, beta_k) arm 표본 생성기"""
+    _resolve_dtype(dtype)
+    return BetaSampler(np.asarray(alpha, dtype=np.float64), np.asarray(beta, dtype=np.float64), dtype)
+
+
+def normal_sampler(mean: Sequence[float], std_err: Sequence[float], dtype: str = "float64") -> NormalSampler:
+    """Normal(mean_k, std_err_k) arm 표본 생성기"""
+    _resolve_dtype(dtype)
+    return NormalSampler(np.asarray(mean, dtype=np.float64), np.asarray(std_err, dtype=np.float64), dtype)
+
+
+def simulate_arms(
+    draw: Sampler,
+    n_arms: int,
+    rng: np.random.Generator,
+    samples: int,
+    tolerance: float | None = None,
+    chunk_size: int = 500,
+    max_samples: int = 100_000,
+) -> SimulationResult:
+    """
+    arm 0(control) 대비 각 arm의 P(win), expected loss와 arm별 P(being best)
+
+    Args:
+        draw: (rng, size) → (n_arms, size) 표본 생성기
+        n_arms: control 포함 arm 수
+        rng: 난수 생성기
+        samples: tolerance가 없을 때의 고정 표본 수 (한 chunk)
+        tolerance: MCSE 목표. P는 MCSE(P) ≤ tolerance, expected loss는
+            MCSE(loss) ≤ tolerance × sd(control - arm)로 단위와 무관하게 판단합니다.
+        chunk_size: tolerance 모드의 chunk 크기 (판정 주기)
+        max_samples: tolerance 모드의 표본 수 상한
+
+    Returns:
+        SimulationResult
+    """
+    k = n_arms - 1
+    wins = np.zeros(k)
+    loss_sum = np.zeros(k)
+    loss_sq = np.zeros(k)
+    diff_sum = np.zeros(k)
+    diff_sq = np.zeros(k)
+    best = np.zeros(n_arms, dtype=np.int64)
+    drawn = 0
+
+    limit = samples if tolerance is None else max_samples
+    step = samples if tolerance is None else chunk_size
+    while drawn < limit:
+        size = min(step, limit - drawn)
+        chunk = draw(rng, size)
+        diff = chunk[0] - chunk[1:]
+        loss = np.maximum(diff, 0)
+        wins += np.count_nonzero(diff < 0, axis=1)
+        loss_sum += loss.sum(axis=1, dtype=np.float64)
+        loss_sq += np.square(loss, dtype=np.float64).sum(axis=1)
+        diff_sum += diff.sum(axis=1, dtype=np.float64)
+        diff_sq += np.square(diff, dtype=np.float64).sum(axis=1)
+        best += np.bincount(np.argmax(chunk, axis=0), minlength=n_arms)
+        drawn += size
+
+        if tolerance is not None and _converged(wins, loss_sum, loss_sq, diff_sum, diff_sq, drawn, tolerance):
+            break
+
+    return SimulationResult(
+        prob_beats_control=wins / drawn,
+        expected_loss=loss_sum / drawn,
+        prob_being_best=best / drawn,
+        draws=drawn,
+    )
+
+
+def _converged(wins, loss_sum, loss_sq, diff_sum, diff_sq, n, tolerance) -> bool:
+    p = wins / n
+    mcse_p = np.sqrt(p * (1 - p) / n)
+    loss_var = np.maximum(loss_sq / n - (loss_sum / n) ** 2, 0.0)
+    diff_sd = np.sqrt(np.maximum(diff_sq / n - (diff_sum / n) ** 2, 0.0))
+    mcse_loss = np.sqrt(loss_var / n)
+    return bool(np.all(mcse_p <= tolerance) and np.all(mcse_loss <= tolerance * diff_sd))
+
+
+def simulate_batch(
+    tasks: Sequence[tuple[Sampler, int]],
+    seed: int,
+    samples: int,
+    tolerance: float | None = None,
+    chunk_size: int = 500,
+    max_samples: int = 100_000,
+    workers: int | None = None,
+    executor: str | None = None,
+) -> list[SimulationResult]:
+    """
+    독립적인 simulate_arms 작업 여러 개(arm 묶음, metric, 실험 등)를 병렬로 실행
+
+    작업 i의 난수열은 ``SeedSequence(seed).spawn(len(tasks))[i]``로 정해지며 worker와
+    무관합니다. 그래서 결과는 worker 수·executor 종류와 상관없이 bit 단위로 같습니다.
+    단일 호출의 ``default_rng(seed)``와는 다른 난수열입니다.
+
+    Args:
+        tasks: (sampler, n_arms) 목록. process executor에서는 sampler가 pickle 가능해야
+            합니다 (BetaSampler, NormalSampler).
+        seed: 루트 시드
+        samples, tolerance, chunk_size, max_samples: simulate_arms와 동일
+        workers: worker 수 (기본 SIMULATION_WORKERS, 1이면 순차 실행)
+        executor: 'thread' | 'process' (기본 SIMULATION_EXECUTOR)
+
+    Returns:
+        tasks와 같은 순서의 SimulationResult 목록
+
+    Raises:
+        ValueError: 알 수 없는 executor
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    jobs = [(draw, n_arms, samples, child) for (draw, n_arms), child in zip(tasks, seeds)]
+    return _map_jobs(jobs, tolerance, chunk_size, max_samples, workers, executor)
+
+
+def simulate_split(
+    draw: Sampler,
+    n_arms: int,
+    seed: int,
+    samples: int,
+    tolerance: float | None = None,
+    chunk_size: int = 500,
+    max_samples: int = 100_000,
+    workers: int | None = None,
+    executor: str | None = None,
+) -> SimulationResult:
+    """
+    비교 하나를 shard로 나눠 병렬 실행한 simulate_arms
+
+    고정 크기 모드에서는 ``samples``를 ceil(samples / SIMULATION_SHARD_SAMPLES)개 shard로
+    나누고, shard j는 ``SeedSequence(seed).spawn(n)[j]`` 난수열로 뽑아 표본 수 가중 평균으로
+    합칩니다. tolerance 모드는 chunk마다 정지 여부를 판정하는 순차 과정이라 한 작업으로
+    실행합니다. 인자는 simulate_batch와 같습니다.
+
+    Returns:
+        SimulationResult
+    """
+    if tolerance is not None:
+        return simulate_batch(
+            [(draw, n_arms)], seed, samples, tolerance, chunk_size, max_samples, workers, executor
+        )[0]
+
+    n_shards = max(1, -(-samples // SIMULATION_SHARD_SAMPLES))
+    sizes = [len(part) for part in np.array_split(np.arange(samples), n_shards)]
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    jobs = [(draw, n_arms, size, child) for size, child in zip(sizes, seeds)]
+    shards = _map_jobs(jobs, tolerance, chunk_size, max_samples, workers, executor)
+
+    draws = sum(r.draws for r in shards)
+    return SimulationResult(
+        prob_beats_control=sum(r.prob_beats_control * r.draws for r in shards) / draws,
+        expected_loss=sum(r.expected_loss * r.draws for r in shards) / draws,
+        prob_being_best=sum(r.prob_being_best * r.draws for r in shards) / draws,
+        draws=draws,
+    )
+
+
+def _map_jobs(
+    jobs: list[tuple[Sampler, int, int, np.random.SeedSequence]],
+    tolerance: float | None,
+    chunk_size: int,
+    max_samples: int,
+    workers: int | None,
+    executor: str | None,
+) -> list[SimulationResult]:
+    workers = SIMULATION_WORKERS if workers is None else workers
+    executor = SIMULATION_EXECUTOR if executor is None else executor
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unsupported simulation executor: {executor}")
+
+    run = partial(_run_task, tolerance=tolerance, chunk_size=chunk_size, max_samples=max_samples)
+    if workers <= 1 or len(jobs) <= 1:
+        return [run(job) for job in jobs]
+    chunksize = 1 if executor == "thread" else max(1, len(jobs) // (4 * workers))
+    return list(_pool(executor, workers).map(run, jobs, chunksize=chunksize))
+
+
+def _pool(executor: str, workers: int) -> Executor:
+    """(executor, workers)별로 처음 필요할 때 만들어 프로세스 종료까지 재사용하는 pool"""
+    key = (executor, workers)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = EXECUTORS[executor](max_workers=workers)
+        return _POOLS[key]
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
+
+
+def _run_task(
+    job: tuple[Sampler, int, int, np.random.SeedSequence],
+    tolerance: float | None,
+    chunk_size: int,
+    max_samples: int,
+) -> SimulationResult:
+    draw, n_arms, samples, seed = job
+    return simulate_arms(draw, n_arms, np.random.default_rng(seed), samples, tolerance, chunk_size, max_samples)
@@ -746,6 +746,502 @@ class TestSequentialBoundaries:
         assert response.status_code in (400, 500)
 
 
+# ===================================================================
+# 9. POST /api/datasets (upload-once dataset handles)
+# ===================================================================
+
+class TestDatasets:
+    def test_upload_returns_content_hash_id(self):
+        """Uploading the same bytes twice yields the same dataset_id."""
+        first = _upload_csv("/api/datasets", make_2variant_csv)
+        second = _upload_csv("/api/datasets", make_2variant_csv)
+        assert first.status_code == 200
+        body = first.json()
+        assert body["status"] == "success"
+        assert len(body["dataset_id"]) == 64
+        assert body["rows"] == 2
+        assert "guardrail_cancel" in body["columns"]
+        assert second.json()["dataset_id"] == body["dataset_id"]
+
+    def test_analysis_endpoints_accept_dataset_id(self):
+        """Every analysis endpoint runs from a dataset_id without a file."""
+        dataset_id = _upload_csv("/api/datasets", make_2variant_continuous_csv).json()["dataset_id"]
+        for endpoint in (
+            "/api/health-check",
+            "/api/analyze",
+            "/api/continuous-metrics",
+            "/api/bayesian-analysis",
+        ):
+            response = client.post(endpoint, params={"dataset_id": dataset_id})
+            assert response.status_code == 200, endpoint
+            assert response.json()["status"] == "success"
+
+    def test_dataset_id_matches_file_upload_result(self):
+        """Analysis from a dataset_id is identical to analysis from the file."""
+        dataset_id = _upload_csv("/api/datasets", make_multivariant_csv).json()["dataset_id"]
+        by_id = client.post("/api/analyze", params={"dataset_id": dataset_id}).json()
+        by_file = _upload_csv("/api/analyze", make_multivariant_csv).json()
+        assert by_id == by_file
+
+    def test_health_check_returns_dataset_id(self):
+        response = _upload_csv("/api/health-check", make_2variant_csv)
+        dataset_id = response.json()["dataset_id"]
+        follow_up = client.post("/api/analyze", params={"dataset_id": dataset_id})
+        assert follow_up.status_code == 200
+
+    def test_unknown_dataset_id_returns_404(self):
+        response = client.post("/api/analyze", params={"dataset_id": "0" * 64})
+        assert response.status_code == 404
+
+    def test_missing_file_and_dataset_id_returns_400(self):
+        response = client.post("/api/analyze")
+        assert response.status_code == 400
+
+
+# ===================================================================
+# 10. POST /api/report (single-pass full report)
+# ===================================================================
+
+class TestReport:
+    def test_full_report(self):
+        """All stages are returned in one response."""
+        response = _upload_csv(
+            "/api/report", make_2variant_continuous_csv, experiment_name="Revenue Test"
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "success"
+        assert body["stages"] == [
+            "health", "primary", "guardrails", "continuous", "bayesian", "decision", "memo",
+        ]
+        for key in (
+            "health_result", "primary_result", "guardrail_results",
+            "continuous_results", "bayesian_insights", "decision", "memo",
+        ):
+            assert key in body
+        assert "Revenue Test" in body["memo"]["markdown"]
+        _assert_no_nan_inf(body)
+
+    def test_stage_selection(self):
+        response = _upload_csv("/api/report", make_multivariant_csv, stages="decision")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["stages"] == ["health", "primary", "guardrails", "decision"]
+        assert "bayesian_insights" not in body
+        assert body["primary_result"]["is_multivariant"] is True
+
+    def test_report_matches_analyze_endpoint(self):
+        report = _upload_csv("/api/report", make_2variant_csv, stages="primary,guardrails").json()
+        analyze = _upload_csv("/api/analyze", make_2variant_csv).json()
+        assert report["primary_result"] == analyze["primary_result"]
+        assert report["guardrail_results"] == analyze["guardrail_results"]
+
+    def test_unknown_stage_returns_400(self):
+        response = _upload_csv("/api/report", make_2variant_csv, stages="primary,bogus")
+        assert response.status_code == 400
+
+
+# ===================================================================
+# 11. Columnar / compressed uploads
+# ===================================================================
+
+class TestUploadFormats:
+    def test_gzip_csv_upload(self):
+        import gzip
+
+        raw = make_2variant_csv().getvalue()
+        response = client.post(
+            "/api/analyze",
+            files={"file": ("data.csv.gz", io.BytesIO(gzip.compress(raw)), "application/gzip")},
+        )
+        assert response.status_code == 200
+        expected = _upload_csv("/api/analyze", make_2variant_csv).json()
+        assert response.json()["primary_result"] == expected["primary_result"]
+
+    def test_parquet_upload(self):
+        pytest.importorskip("pyarrow")
+        import pandas as pd
+
+        buf = io.BytesIO()
+        pd.read_csv(make_multivariant_csv()).to_parquet(buf)
+        buf.seek(0)
+        response = client.post(
+            "/api/analyze",
+            files={"file": ("data.parquet", buf, "application/octet-stream")},
+        )
+        assert response.status_code == 200
+        assert response.json()["is_multivariant"] is True
+
+    def test_corrupt_parquet_returns_400(self):
+        pytest.importorskip("pyarrow")
+        response = client.post(
+            "/api/analyze",
+            files={"file": ("data.parquet", io.BytesIO(b"not parquet"), "application/octet-stream")},
+        )
+        assert response.status_code == 400
+
+
+# ===================================================================
+# 12. Streaming upload limits
+# ===================================================================
+
+class TestUploadLimits:
+    def test_missing_required_column_rejected_with_422(self):
+        buf = io.BytesIO(b"variant,users\ncontrol,100\ntreatment,100\n")
+        response = client.post(
+            "/api/health-check", files={"file": ("data.csv", buf, "text/csv")}
+        )
+        assert response.status_code == 422
+        assert "conversions" in response.json()["detail"]
+
+    def test_oversized_upload_rejected_with_413(self):
+        from unittest.mock import patch
+        import backend.datasets
+
+        with patch.object(backend.datasets, "UPLOAD_MAX_BYTES", 16):
+            response = _upload_csv("/api/analyze", make_2variant_csv)
+        assert response.status_code == 413
+
+
+# ===================================================================
+# 13. Async jobs (POST /api/jobs, GET /api/jobs/{job_id})
+# ===================================================================
+
+class TestJobs:
+    def test_submit_and_poll_report_job(self):
+        response = _upload_csv("/api/jobs", make_2variant_csv, stages="decision")
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] in ("queued", "running", "succeeded")
+        assert body["status_url"] == f"/api/jobs/{body['job_id']}"
+
+        job = client.get(body["status_url"], params={"wait": 10}).json()
+        assert job["status"] == "succeeded"
+        assert job["progress"] == 1.0
+        assert job["result"]["stages"] == ["health", "primary", "guardrails", "decision"]
+
+        direct = _upload_csv("/api/report", make_2variant_csv, stages="decision").json()
+        assert job["result"]["primary_result"] == direct["primary_result"]
+
+    def test_job_from_dataset_id(self):
+        dataset_id = _upload_csv("/api/datasets", make_multivariant_csv).json()["dataset_id"]
+        response = client.post("/api/jobs", params={"dataset_id": dataset_id})
+        assert response.status_code == 202
+        job = client.get(f"/api/jobs/{response.json()['job_id']}", params={"wait": 10}).json()
+        assert job["status"] == "succeeded"
+        assert job["result"]["is_multivariant"] is True
+        _assert_no_nan_inf(job)
+
+    def test_unknown_kind_returns_400(self):
+        response = _upload_csv("/api/jobs", make_2variant_csv, kind="bogus")
+        assert response.status_code == 400
+
+    def test_unknown_stage_returns_400(self):
+        response = _upload_csv("/api/jobs", make_2variant_csv, stages="bogus")
+        assert response.status_code == 400
+
+    def test_unknown_job_returns_404(self):
+        response = client.get("/api/jobs/does-not-exist")
+        assert response.status_code == 404
+
+    def test_queue_full_returns_503(self):
+        from unittest.mock import patch
+        from backend.jobs import JobQueueFullError
+        import backend.main
+
+        with patch.object(
+            backend.main.job_manager, "submit", side_effect=JobQueueFullError("full")
+        ):
+            response = _upload_csv("/api/jobs", make_2variant_csv)
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+
+# ===================================================================
+# 14. SSE report streaming (/api/report/stream)
+# ===================================================================
+
+def _parse_sse(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestReportStream:
+    def test_streams_each_stage_then_done(self):
+        response = _upload_csv("/api/report/stream", make_2variant_continuous_csv)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = _parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names[0] == "start"
+        assert names[-1] == "done"
+        streamed = [data["stage"] for name, data in events if name == "stage"]
+        assert sorted(streamed) == sorted(events[0][1]["stages"])
+        # dependencies are respected regardless of completion order
+        assert streamed.index("continuous") < streamed.index("bayesian")
+        assert streamed.index("decision") < streamed.index("memo")
+
+    def test_stage_payloads_match_report(self):
+        report = _upload_csv("/api/report", make_multivariant_csv).json()
+        events = _parse_sse(_upload_csv("/api/report/stream", make_multivariant_csv).text)
+        for name, data in events:
+            if name == "stage":
+                assert data["result"] == report[data["key"]]
+
+    def test_get_with_dataset_id(self):
+        dataset_id = _upload_csv("/api/datasets", make_2variant_csv).json()["dataset_id"]
+        response = client.get(
+            "/api/report/stream", params={"dataset_id": dataset_id, "stages": "primary"}
+        )
+        events = _parse_sse(response.text)
+        assert [name for name, _ in events] == ["start", "stage", "done"]
+        assert events[0][1]["dataset_id"] == dataset_id
+
+    def test_stage_failure_emits_error_event(self):
+        from unittest.mock import patch
+        import backend.main
+
+        with patch.object(backend.main, "run_stage", side_effect=RuntimeError("stage blew up")):
+            response = _upload_csv("/api/report/stream", make_2variant_csv, stages="health")
+        events = _parse_sse(response.text)
+        assert events[-1] == ("error", {"stage": "health", "detail": "stage blew up"})
+
+    def test_unknown_stage_returns_400(self):
+        response = _upload_csv("/api/report/stream", make_2variant_csv, stages="bogus")
+        assert response.status_code == 400
+
+
+# ===================================================================
+# 15. Response cache (ETag / If-None-Match)
+# ===================================================================
+
+class TestResponseCaching:
+    def setup_method(self):
+        from backend.caching import response_cache
+
+        response_cache.clear()
+
+    def test_etag_and_304(self):
+        first = _upload_csv("/api/analyze", make_2variant_csv)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        revisit = _upload_csv("/api/analyze", make_2variant_csv)
+        assert revisit.headers["ETag"] == etag
+        assert revisit.content == first.content
+
+        dataset_id = _upload_csv("/api/datasets", make_2variant_csv).json()["dataset_id"]
+        not_modified = client.post(
+            "/api/analyze",
+            params={"dataset_id": dataset_id},
+            headers={"If-None-Match": etag},
+        )
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    def test_cache_hit_skips_computation(self):
+        from unittest.mock import patch
+        import backend.main
+
+        first = _upload_csv("/api/report", make_2variant_csv, stages="primary")
+        with patch.object(backend.main, "run_report", side_effect=AssertionError("recomputed")):
+            second = _upload_csv("/api/report", make_2variant_csv, stages="primary")
+        assert second.status_code == 200
+        assert second.json() == first.json()
+
+    def test_params_change_etag(self):
+        a = _upload_csv("/api/analyze", make_2variant_csv, guardrails="guardrail_cancel")
+        b = _upload_csv("/api/analyze", make_2variant_csv, guardrails="guardrail_error")
+        assert a.headers["ETag"] != b.headers["ETag"]
+
+    def test_errors_are_not_cached(self):
+        from unittest.mock import patch
+        import backend.main
+
+        with patch.object(backend.main, "run_report", side_effect=RuntimeError("boom")):
+            failed = _upload_csv("/api/continuous-metrics", make_2variant_continuous_csv)
+        assert failed.status_code == 500
+        assert "ETag" not in failed.headers
+        ok = _upload_csv("/api/continuous-metrics", make_2variant_continuous_csv)
+        assert ok.status_code == 200
+
+
+# ===================================================================
+# 16. Request coalescing (single-flight)
+# ===================================================================
+
+class TestRequestCoalescing:
+    def setup_method(self):
+        from backend.caching import response_cache
+
+        response_cache.clear()
+
+    @staticmethod
+    async def _concurrent_requests(method: str, url: str, n: int, **kwargs):
+        import asyncio
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.request(method, url, **kwargs) for _ in range(n)))
+
+    def test_concurrent_analyze_runs_once(self):
+        import asyncio
+        import time
+        from unittest.mock import patch
+        import backend.main
+
+        dataset_id = _upload_csv("/api/datasets", make_2variant_csv).json()["dataset_id"]
+        real_run_report = backend.main.run_report
+        calls = []
+
+        def slow_run_report(*args, **kwargs):
+            calls.append(1)
+            time.sleep(0.2)
+            return real_run_report(*args, **kwargs)
+
+        with patch.object(backend.main, "run_report", side_effect=slow_run_report):
+            responses = asyncio.run(self._concurrent_requests(
+                "POST", "/api/analyze", 8, params={"dataset_id": dataset_id}
+            ))
+
+        assert [r.status_code for r in responses] == [200] * 8
+        assert len({r.content for r in responses}) == 1
+        assert len(calls) == 1
+
+    def test_concurrent_integration_analyze_fetches_once(self):
+        import asyncio
+        import time
+        from unittest.mock import MagicMock, patch
+        from src.experimentos.integrations.schema import IntegrationResult, IntegrationVariant
+
+        calls = []
+
+        def slow_fetch(experiment_id):
+            calls.append(experiment_id)
+            time.sleep(0.2)
+            return IntegrationResult(
+                experiment_id=experiment_id,
+                variants=[
+                    IntegrationVariant(name="control", users=1000, conversions=100),
+                    IntegrationVariant(name="treatment", users=1000, conversions=120),
+                ],
+            )
+
+        provider = MagicMock()
+        provider.fetch_experiment.side_effect = slow_fetch
+        with patch("backend.routers.integrations.registry.get_provider", return_value=provider):
+            responses = asyncio.run(self._concurrent_requests(
+                "GET", "/api/integrations/statsig/experiments/exp_1/analyze", 6,
+                headers={"X-Integration-Api-Key": "key"},
+            ))
+
+        assert [r.status_code for r in responses] == [200] * 6
+        assert calls == ["exp_1"]
+
+
+# ===================================================================
+# 17. Portfolio batch analysis (POST /api/portfolio)
+# ===================================================================
+
+def make_portfolio_csv() -> io.BytesIO:
+    """Long-format CSV: two valid experiments and one without a control."""
+    return _make_csv_bytes("""
+        experiment_id,variant,users,conversions,guardrail_error,revenue_sum,revenue_sum_sq
+        exp_a,control,10000,1200,35,50000,3000000
+        exp_a,treatment,10050,1320,33,52000,3100000
+        exp_b,control,5000,500,10,20000,900000
+        exp_b,variant_a,5100,560,12,21000,950000
+        exp_b,variant_b,4900,480,30,19000,880000
+        exp_c,variant_a,100,10,1,100,200
+        exp_c,variant_b,100,12,1,100,200
+    """)
+
+
+class TestPortfolio:
+    def test_portfolio_tables(self):
+        response = _upload_csv("/api/portfolio", make_portfolio_csv)
+        assert response.status_code == 200
+        body = response.json()
+        _assert_no_nan_inf(body)
+
+        experiments = {e["experiment_id"]: e for e in body["experiments"]}
+        assert experiments["exp_a"]["status"] == "Healthy"
+        assert experiments["exp_c"]["status"] == "Blocked"
+        assert experiments["exp_c"]["issue"]
+
+        assert [(v["experiment_id"], v["variant"]) for v in body["variants"]] == [
+            ("exp_a", "treatment"), ("exp_b", "variant_a"), ("exp_b", "variant_b"),
+        ]
+        assert {g["guardrail"] for g in body["guardrails"]} == {"guardrail_error"}
+        assert {m["metric"] for m in body["continuous"]} == {"revenue"}
+
+    def test_matches_single_experiment_analyze(self):
+        portfolio = _upload_csv("/api/portfolio", make_portfolio_csv).json()
+        exp_a = next(v for v in portfolio["variants"] if v["experiment_id"] == "exp_a")
+
+        single = _upload_csv("/api/analyze", make_2variant_csv).json()["primary_result"]
+        assert exp_a["p_value"] == pytest.approx(single["p_value"], rel=1e-12)
+        assert [exp_a["ci_lower"], exp_a["ci_upper"]] == pytest.approx(single["ci_95"], rel=1e-12)
+
+    def test_missing_key_column_returns_400(self):
+        response = _upload_csv("/api/portfolio", make_2variant_csv)
+        assert response.status_code == 400
+
+    def test_unknown_correction_method_returns_400(self):
+        response = _upload_csv("/api/portfolio", make_portfolio_csv, correction_method="bogus")
+        assert response.status_code == 400
+
+    def test_portfolio_job(self):
+        response = _upload_csv("/api/jobs", make_portfolio_csv, kind="portfolio")
+        assert response.status_code == 202
+        job = client.get(response.json()["status_url"], params={"wait": 10}).json()
+        assert job["status"] == "succeeded"
+        direct = _upload_csv("/api/portfolio", make_portfolio_csv).json()
+        assert job["result"]["variants"] == direct["variants"]
+
+
+# ===================================================================
+# 18. Segmented analysis (POST /api/segments)
+# ===================================================================
+
+def make_segmented_csv() -> io.BytesIO:
+    """One experiment sliced by platform (variant labels repeat across segments)."""
+    return _make_csv_bytes("""
+        platform,variant,users,conversions,guardrail_error
+        ios,control,5000,600,20
+        ios,treatment,5050,660,18
+        android,control,5000,550,25
+        android,treatment,4950,600,40
+    """)
+
+
+class TestSegments:
+    def test_segment_tables(self):
+        response = _upload_csv("/api/segments", make_segmented_csv, dimensions="platform")
+        assert response.status_code == 200
+        body = response.json()
+        _assert_no_nan_inf(body)
+        assert body["dimensions"] == ["platform"]
+        assert body["health_result"]["overall_status"] == "Healthy"
+        assert [e["platform"] for e in body["experiments"]] == ["android", "ios"]
+        assert len(body["variants"]) == 2
+        for variant in body["variants"]:
+            assert variant["p_value_corrected"] == pytest.approx(min(variant["p_value"] * 2, 1.0))
+
+    def test_missing_dimension_column_returns_400(self):
+        response = _upload_csv("/api/segments", make_segmented_csv, dimensions="country")
+        assert response.status_code == 400
+
+    def test_dimensions_required(self):
+        response = _upload_csv("/api/segments", make_segmented_csv, dimensions=" ")
+        assert response.status_code == 400
+
+
 # ===================================================================
 # Cross-cutting: SafeJSONResponse NaN/Inf handling
 # ===================================================================
@@ -0,0 +1,152 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from backend.caching import ByteLRUCache, ResponseCache, SingleFlight
+from backend.datasets import DatasetNotFoundError, DatasetStore, content_hash
+
+
+class TestByteLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = ByteLRUCache(max_bytes=100)
+        cache.set("a", 1, 40)
+        cache.set("b", 2, 40)
+        cache.get("a")  # touch a so b becomes LRU
+        cache.set("c", 3, 40)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.total_bytes == 80
+
+    def test_rejects_oversized_entry(self):
+        cache = ByteLRUCache(max_bytes=10)
+        assert cache.set("big", "x", 11) is False
+        assert "big" not in cache
+
+    def test_replacing_key_updates_size(self):
+        cache = ByteLRUCache(max_bytes=100)
+        cache.set("a", 1, 60)
+        cache.set("a", 2, 30)
+        assert cache.total_bytes == 30
+        assert len(cache) == 1
+
+
+class TestDatasetStore:
+    def test_round_trip(self):
+        store = DatasetStore(max_bytes=10 * 1024 * 1024)
+        df = pd.DataFrame({"variant": ["control", "treatment"], "users": [10, 12]})
+        dataset_id = content_hash(b"variant,users\ncontrol,10\ntreatment,12\n")
+        store.put(dataset_id, df)
+        assert dataset_id in store
+        assert store.get(dataset_id) is df
+
+    def test_unknown_id_raises(self):
+        store = DatasetStore(max_bytes=1024)
+        with pytest.raises(DatasetNotFoundError):
+            store.get("missing")
+
+
+class TestResponseCache:
+    def test_key_depends_on_dataset_params_and_config(self):
+        from src.experimentos.config import config
+
+        base = ResponseCache.key("analyze", "d1", {"guardrails": None})
+        assert base == ResponseCache.key("analyze", "d1", {"guardrails": None})
+        assert base != ResponseCache.key("analyze", "d2", {"guardrails": None})
+        assert base != ResponseCache.key("analyze", "d1", {"guardrails": ["g"]})
+        assert base != ResponseCache.key("report", "d1", {"guardrails": None})
+
+        original = config.BAYES_SAMPLES
+        try:
+            config.BAYES_SAMPLES = original + 1
+            assert base != ResponseCache.key("analyze", "d1", {"guardrails": None})
+        finally:
+            config.BAYES_SAMPLES = original
+
+    def test_etag_matching(self):
+        etag = ResponseCache.etag("ab" * 32)
+        assert ResponseCache.etag_matches(etag, etag)
+        assert ResponseCache.etag_matches(f'"other", W/{etag}', etag)
+        assert ResponseCache.etag_matches("*", etag)
+        assert not ResponseCache.etag_matches('"other"', etag)
+        assert not ResponseCache.etag_matches(None, etag)
+
+    def test_evicts_by_body_size(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"123456")
+        assert cache.get("a") is None
+        assert cache.get("b") == b"123456"
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def scenario():
+            return await asyncio.gather(*(flight.do("k", compute) for _ in range(10)))
+
+        assert asyncio.run(scenario()) == ["result"] * 10
+        assert len(calls) == 1
+        assert len(flight) == 0
+
+    def test_distinct_keys_run_separately(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        async def scenario():
+            return await asyncio.gather(
+                flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b"))
+            )
+
+        assert asyncio.run(scenario()) == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_exception_is_shared_and_not_retained(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def scenario():
+            results = await asyncio.gather(
+                *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+            )
+            assert all(isinstance(r, ValueError) for r in results)
+            # a later call starts a fresh computation
+            with pytest.raises(ValueError):
+                await flight.do("k", fail)
+
+        asyncio.run(scenario())
+        assert len(calls) == 2
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return 42
+
+        async def scenario():
+            first = asyncio.ensure_future(flight.do("k", compute))
+            second = asyncio.ensure_future(flight.do("k", compute))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == 42
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from backend import main
+from backend.executor import AnalysisExecutor, ExecutorSaturatedError
+
+
+def _add(a, b):
+    return a + b
+
+
+class TestAnalysisExecutor:
+    def test_runs_function_on_pool(self):
+        executor = AnalysisExecutor(kind="thread", max_workers=2, max_queue=0)
+        try:
+            assert asyncio.run(executor.run(_add, 2, b=3)) == 5
+            assert executor.in_flight == 0
+        finally:
+            executor.shutdown()
+
+    def test_does_not_run_on_event_loop_thread(self):
+        executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=0)
+
+        async def scenario():
+            loop_thread = threading.get_ident()
+            worker_thread = await executor.run(threading.get_ident)
+            return loop_thread != worker_thread
+
+        try:
+            assert asyncio.run(scenario()) is True
+        finally:
+            executor.shutdown()
+
+    def test_rejects_when_saturated(self):
+        executor = AnalysisExecutor(kind="thread", max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def scenario():
+            running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run(_add, 1, 1)
+            release.set()
+            await asyncio.gather(*running)
+            # capacity is restored once the tasks finish
+            return await executor.run(_add, 1, 1)
+
+        try:
+            assert asyncio.run(scenario()) == 2
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_process_pool(self):
+        executor = AnalysisExecutor(kind="process", max_workers=1, max_queue=0)
+        try:
+            assert asyncio.run(executor.run(_add, 20, 22)) == 42
+        finally:
+            executor.shutdown()
+
+    def test_unknown_kind_raises(self):
+        with pytest.raises(ValueError):
+            AnalysisExecutor(kind="gpu")
+
+
+def test_api_returns_503_with_retry_after_when_saturated():
+    client = TestClient(main.app)
+    csv = b"variant,users,conversions\ncontrol,1000,100\ntreatment,1000,120\n"
+    dataset_id = client.post(
+        "/api/datasets", files={"file": ("x.csv", csv, "text/csv")}
+    ).json()["dataset_id"]
+
+    async def saturated(*args, **kwargs):
+        raise ExecutorSaturatedError("full")
+
+    main.response_cache.clear()
+    with patch.object(main.analysis_executor, "run", side_effect=saturated):
+        response = client.post("/api/analyze", params={"dataset_id": dataset_id})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
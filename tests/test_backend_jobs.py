@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.jobs import JobManager, JobNotFoundError, JobQueueFullError
+
+
+def _collect(report_progress, values):
+    for i, value in enumerate(values, start=1):
+        report_progress(i / len(values), f"step{i}")
+    return sum(values)
+
+
+def _fail(report_progress):
+    raise ValueError("boom")
+
+
+def _block(report_progress, event):
+    event.wait(5)
+    return "done"
+
+
+class TestJobManager:
+    def test_job_succeeds_with_result_and_progress(self):
+        manager = JobManager(max_workers=1, max_pending=4, ttl=60)
+        try:
+            job = manager.submit("sum", _collect, [1, 2, 3])
+            job = asyncio.run(manager.wait(job.id, timeout=5))
+            assert job.status == "succeeded"
+            assert job.result == 6
+            assert job.progress == 1.0
+            assert job.stage == "step3"
+            assert job.to_dict()["result"] == 6
+        finally:
+            manager.shutdown()
+
+    def test_failed_job_reports_error(self):
+        manager = JobManager(max_workers=1, max_pending=4, ttl=60)
+        try:
+            job = manager.submit("fail", _fail)
+            job = asyncio.run(manager.wait(job.id, timeout=5))
+            assert job.status == "failed"
+            payload = job.to_dict()
+            assert payload["error"] == "boom"
+            assert "result" not in payload
+        finally:
+            manager.shutdown()
+
+    def test_wait_returns_on_timeout_while_running(self):
+        manager = JobManager(max_workers=1, max_pending=4, ttl=60)
+        release = threading.Event()
+        try:
+            job = manager.submit("block", _block, release)
+            started = time.monotonic()
+            job = asyncio.run(manager.wait(job.id, timeout=0.1))
+            assert time.monotonic() - started < 2
+            assert job.status in ("queued", "running")
+        finally:
+            release.set()
+            manager.shutdown()
+
+    def test_rejects_when_queue_full(self):
+        manager = JobManager(max_workers=1, max_pending=2, ttl=60)
+        release = threading.Event()
+        try:
+            manager.submit("block", _block, release)
+            manager.submit("block", _block, release)
+            with pytest.raises(JobQueueFullError):
+                manager.submit("block", _block, release)
+        finally:
+            release.set()
+            manager.shutdown()
+
+    def test_unknown_job_raises(self):
+        manager = JobManager()
+        with pytest.raises(JobNotFoundError):
+            manager.get("missing")
+
+    def test_finished_jobs_expire_after_ttl(self):
+        manager = JobManager(max_workers=1, max_pending=4, ttl=0)
+        try:
+            job = manager.submit("sum", _collect, [1])
+            while not job.done:
+                time.sleep(0.01)
+            time.sleep(0.01)
+            with pytest.raises(JobNotFoundError):
+                manager.get(job.id)
+        finally:
+            manager.shutdown()
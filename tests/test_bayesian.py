@@ -1,5 +1,8 @@
+import numpy as np
 import pytest
-from src.experimentos.bayesian import calculate_beta_binomial, calculate_continuous_bayes
+from src.experimentos import bayesian
+from src.experimentos.bayesian import calculate_beta_binomial, calculate_continuous_bayes, continuous_bayes_arrays
+from src.experimentos.config import config
 
 class TestBayesianAnalysis:
     
@@ -33,3 +36,74 @@ class TestBayesianAnalysis:
         
         assert res1["prob_treatment_beats_control"] == res2["prob_treatment_beats_control"]
         assert res1["prob_treatment_beats_control"] > 0.95
+
+
+class TestBetaBinomialEngine:
+    def test_exact_agrees_with_monte_carlo(self, monkeypatch):
+        exact = calculate_beta_binomial(100, 1000, 120, 1000)
+        monkeypatch.setattr(config, "BAYES_METHOD", "monte_carlo")
+        simulated = calculate_beta_binomial(100, 1000, 120, 1000)
+        assert exact["prob_treatment_beats_control"] == pytest.approx(simulated["prob_treatment_beats_control"], abs=0.01)
+        assert exact["expected_loss"] == pytest.approx(simulated["expected_loss"], rel=0.1)
+
+    def test_exact_does_not_sample(self, monkeypatch):
+        def no_rng(*args, **kwargs):
+            raise AssertionError("exact engine must not sample")
+
+        monkeypatch.setattr(np.random, "default_rng", no_rng)
+        res = calculate_beta_binomial(100, 1000, 100, 1000)
+        assert res["prob_treatment_beats_control"] == pytest.approx(0.5, abs=1e-12)
+
+    def test_falls_back_to_monte_carlo(self, monkeypatch):
+        monkeypatch.setattr(bayesian, "_beta_binomial_exact", lambda *args: (float("nan"), float("nan")))
+        res = calculate_beta_binomial(100, 1000, 120, 1000)
+        assert 0.8 <= res["prob_treatment_beats_control"] <= 1.0
+        assert np.isfinite(res["expected_loss"])
+
+    def test_unknown_method(self, monkeypatch):
+        monkeypatch.setattr(config, "BAYES_METHOD", "laplace")
+        with pytest.raises(ValueError, match="BAYES_METHOD"):
+            calculate_beta_binomial(100, 1000, 120, 1000)
+
+
+class TestContinuousBayesArrays:
+    def test_matrix_matches_scalar_calls(self):
+        n_c, mean_c, m2_c = 400.0, np.array([10.0, 3.0]), np.array([1600.0, 90.0])
+        n_t = np.array([[380.0], [420.0], [1.0]])
+        mean_t = np.array([[10.4, 2.9], [9.8, 3.2], [12.0, 3.0]])
+        m2_t = np.array([[1500.0, 80.0], [1700.0, 100.0], [0.0, 0.0]])
+        prob, loss = continuous_bayes_arrays(n_c, mean_c, m2_c, n_t, mean_t, m2_t)
+        assert prob.shape == (3, 2)
+        for i in range(3):
+            for j in range(2):
+                single = calculate_continuous_bayes(
+                    {"n": n_c, "mean": mean_c[j], "m2": m2_c[j]},
+                    {"n": n_t[i, 0], "mean": mean_t[i, j], "m2": m2_t[i, j]},
+                )
+                assert prob[i, j] == single["prob_treatment_beats_control"]
+                assert loss[i, j] == single["expected_loss"]
+
+    def test_exact_agrees_with_monte_carlo(self, monkeypatch):
+        c_stats = {"sum": 1000, "sum_sq": 10400, "n": 100}
+        t_stats = {"sum": 1030, "sum_sq": 11100, "n": 100}
+        exact = calculate_continuous_bayes(c_stats, t_stats)
+        monkeypatch.setattr(config, "BAYES_METHOD", "monte_carlo")
+        simulated = calculate_continuous_bayes(c_stats, t_stats)
+        prob, loss = continuous_bayes_arrays(100, [10.0], [400.0], 100, [10.3], [491.0])
+        assert exact["prob_treatment_beats_control"] == pytest.approx(simulated["prob_treatment_beats_control"], abs=0.01)
+        assert exact["expected_loss"] == pytest.approx(simulated["expected_loss"], rel=0.05)
+        assert prob[0] == pytest.approx(exact["prob_treatment_beats_control"], abs=0.015)
+        assert loss[0] == pytest.approx(exact["expected_loss"], rel=0.05)
+
+    def test_monte_carlo_matrix_independent_of_workers(self, monkeypatch):
+        from src.experimentos import simulation
+
+        monkeypatch.setattr(config, "BAYES_METHOD", "monte_carlo")
+        monkeypatch.setattr(simulation, "SIMULATION_WORKERS", 1)
+        args = (400.0, [10.0, 3.0], [1600.0, 90.0], [[380.0], [420.0]], [[10.4, 2.9], [9.8, 3.2]], 1500.0)
+        serial = continuous_bayes_arrays(*args)
+        monkeypatch.setattr(simulation, "SIMULATION_WORKERS", 3)
+        parallel = continuous_bayes_arrays(*args)
+        np.testing.assert_array_equal(serial[0], parallel[0])
+        np.testing.assert_array_equal(serial[1], parallel[1])
+        assert len(set(serial[0].ravel())) == 4
@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
-from src.experimentos.continuous_analysis import calculate_continuous_lift
+import pandas as pd
+from src.experimentos.continuous_analysis import calculate_continuous_lift, continuous_lift_matrix
 
 class TestContinuousAnalysis:
     
@@ -86,3 +87,39 @@ class TestContinuousAnalysis:
         assert result["is_valid"] is True
         assert result["control_mean"] == pytest.approx(1000000.0)
         assert result["p_value"] > 0.99 # Should be effectively 1.0
+
+
+class TestContinuousLiftMatrix:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            "variant": ["control", "a", "b", "tiny"],
+            "users": [1000, 1100, 900, 1],
+            "revenue_sum": [50000.0, 56000.0, 44000.0, 10.0],
+            "revenue_sum_sq": [3000000.0, 3400000.0, 2500000.0, 100.0],
+            "orders_sum": [2000.0, 2300.0, 1700.0, 1.0],
+            "orders_sum_sq": [5000.0, 100.0, 4000.0, 1.0],
+        })
+
+    def test_matches_pairwise(self, df):
+        metrics = ["revenue", "orders"]
+        matrix = continuous_lift_matrix(df, metrics, np.array([1, 2, 3]), 0)
+        assert len(matrix) == 3
+        for i, row in zip([1, 2, 3], matrix):
+            for metric, result in zip(metrics, row):
+                control = {"sum": df.loc[0, f"{metric}_sum"], "sum_sq": df.loc[0, f"{metric}_sum_sq"], "n": df.loc[0, "users"]}
+                treatment = {"sum": df.loc[i, f"{metric}_sum"], "sum_sq": df.loc[i, f"{metric}_sum_sq"], "n": df.loc[i, "users"]}
+                expected = calculate_continuous_lift(control, treatment, metric)
+                actual = result.to_dict()
+                assert actual.keys() == expected.keys()
+                assert actual["is_valid"] == expected["is_valid"]
+                assert actual.get("error") == expected.get("error")
+                assert actual["p_value"] == pytest.approx(expected["p_value"])
+                assert actual["ci_95"] == pytest.approx(expected["ci_95"])
+
+    def test_degenerate_cells_are_masked(self, df):
+        (a_row, tiny_row) = continuous_lift_matrix(df, ["revenue", "orders"], np.array([1, 3]), 0)
+        assert a_row[0].is_valid
+        assert a_row[1].error == "Invalid variance (checksum failed)"
+        assert tiny_row[0].error == "Insufficient data (n < 2)"
+
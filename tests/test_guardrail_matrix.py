@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.stats.proportion import proportions_ztest
+
+from src.experimentos.analysis import calculate_guardrails, calculate_guardrails_multivariant
+from src.experimentos.guardrails import detect_guardrail_columns, evaluate_guardrails
+
+
+@pytest.fixture
+def wide_df():
+    rng = np.random.default_rng(3)
+    n_variants, n_guardrails = 8, 40
+    data = {
+        "variant": ["control"] + [f"v{i}" for i in range(1, n_variants)],
+        "users": rng.integers(5000, 10000, n_variants),
+        "conversions": rng.integers(100, 800, n_variants),
+        "revenue_sum": rng.uniform(1e4, 2e4, n_variants),
+        "revenue_sum_sq": rng.uniform(1e6, 2e6, n_variants),
+    }
+    for j in range(n_guardrails):
+        data[f"guardrail_{j}"] = rng.integers(0, 200, n_variants)
+    return pd.DataFrame(data)
+
+
+def _evaluate(df, columns=None):
+    is_control = df["variant"].to_numpy() == "control"
+    columns = columns or detect_guardrail_columns(df)
+    return evaluate_guardrails(df, columns, ~is_control, int(np.argmax(is_control)))
+
+
+class TestGuardrailMatrix:
+    def test_detects_columns(self, wide_df):
+        columns = detect_guardrail_columns(wide_df)
+        assert len(columns) == 40
+        assert "revenue_sum" not in columns
+
+    def test_shapes(self, wide_df):
+        matrix = _evaluate(wide_df)
+        assert matrix.delta.shape == (7, 40)
+        assert matrix.p_value.shape == (7, 40)
+        assert matrix.worsened.dtype == bool
+        assert matrix.valid.all()
+
+    def test_cells_match_scalar_computation(self, wide_df):
+        matrix = _evaluate(wide_df)
+        control = wide_df.iloc[0]
+        for i, j in [(0, 0), (3, 17), (6, 39)]:
+            row = wide_df.iloc[i + 1]
+            col = matrix.columns[j]
+            rate_c = control[col] / control["users"]
+            rate_t = row[col] / row["users"]
+            _, p_ref = proportions_ztest(
+                np.array([row[col], control[col]]), np.array([row["users"], control["users"]])
+            )
+            assert matrix.delta[i, j] == pytest.approx(rate_t - rate_c)
+            assert matrix.p_value[i, j] == pytest.approx(p_ref, rel=1e-9)
+
+    def test_summary_picks_worst_variant(self, wide_df):
+        matrix = _evaluate(wide_df)
+        summary = matrix.summary()
+        assert [s["name"] for s in summary] == matrix.columns
+        for j, entry in enumerate(summary):
+            worst = int(np.argmax(matrix.delta[:, j]))
+            assert entry["worst_variant"] == matrix.variants[worst]
+            assert entry["worst_delta"] == pytest.approx(matrix.delta[worst, j])
+            assert entry["worsened"] == bool(matrix.worsened[:, j].any())
+
+    def test_bad_cells_are_isolated(self):
+        df = pd.DataFrame({
+            "variant": ["control", "a", "b"],
+            "users": [1000, 1000, 1000],
+            "conversions": [100, 110, 120],
+            "g_ok": [10, 40, 12],
+            "g_bad": [10.0, np.nan, 30.0],
+            "g_ctrl_bad": [np.nan, 1.0, 2.0],
+        })
+        matrix = _evaluate(df)
+        assert matrix.valid.tolist() == [[True, False, False], [True, True, False]]
+        records = matrix.records(0, include_variant=True)
+        assert records[1]["error"] == "cannot convert float NaN to integer"
+        assert records[1]["p_value"] == 1.0
+        # g_bad is summarized from the valid variant only; g_ctrl_bad is dropped
+        assert [s["name"] for s in matrix.summary()] == ["g_ok", "g_bad"]
+        assert matrix.summary()[1]["worst_variant"] == "b"
+
+    def test_missing_column_reports_key_error(self):
+        df = pd.DataFrame({
+            "variant": ["control", "treatment"],
+            "users": [100, 100],
+            "conversions": [5, 6],
+            "g": [1, 2],
+        })
+        result = calculate_guardrails(df, guardrail_columns=["g", "missing"])
+        assert "error" not in result[0]
+        assert result[1]["error"] == "'missing'"
+
+
+class TestGuardrailFunctionsUseMatrix:
+    def test_two_variant_records(self):
+        df = pd.DataFrame({
+            "variant": ["control", "treatment"],
+            "users": [10000, 10000],
+            "conversions": [1000, 1100],
+            "guardrail_error": [10, 50],
+            "guardrail_cancel": [0, 5],
+        })
+        result = calculate_guardrails(df)
+        assert [r["name"] for r in result] == ["guardrail_error", "guardrail_cancel"]
+        assert result[0]["severe"] is True
+        assert result[1]["relative_lift"] is None
+        assert isinstance(result[0]["p_value"], float)
+
+    def test_multivariant_flags(self, wide_df):
+        result = calculate_guardrails_multivariant(wide_df)
+        assert len(result["by_variant"]) == 7
+        assert all(len(v) == 40 for v in result["by_variant"].values())
+        assert result["any_worsened"] == any(
+            g["worsened"] for v in result["by_variant"].values() for g in v
+        )
+        assert result["by_variant"]["v3"][0]["variant"] == "v3"
@@ -88,6 +88,60 @@ class TestValidateSchema:
         assert result["status"] == "Blocked"
         assert any("중복된 variant" in issue for issue in result["issues"])
 
+    def test_segmented_duplicates_allowed(self):
+        """dimension 지정 시 segment 내 중복만 검사 - Healthy"""
+        df = pd.DataFrame({
+            "country": ["KR", "KR", "US", "US"],
+            "variant": ["control", "treatment", "control", "treatment"],
+            "users": [5000, 5000, 5000, 5000],
+            "conversions": [600, 650, 600, 640]
+        })
+
+        assert validate_schema(df.copy())["status"] == "Blocked"
+        assert validate_schema(df.copy(), dimensions=["country"])["status"] == "Healthy"
+
+    def test_segmented_duplicate_within_segment(self):
+        """같은 segment 안의 variant 중복 - Blocked"""
+        df = pd.DataFrame({
+            "country": ["KR", "KR", "KR"],
+            "variant": ["control", "control", "treatment"],
+            "users": [5000, 5000, 5000],
+            "conversions": [600, 600, 640]
+        })
+
+        result = validate_schema(df, dimensions=["country"])
+
+        assert result["status"] == "Blocked"
+        assert any("중복된 variant" in issue for issue in result["issues"])
+
+    def test_segmented_missing_dimension(self):
+        """dimension 컬럼 누락 - Blocked"""
+        df = pd.DataFrame({
+            "variant": ["control", "treatment"],
+            "users": [10000, 10000],
+            "conversions": [1200, 1320]
+        })
+
+        result = validate_schema(df, dimensions=["country"])
+
+        assert result["status"] == "Blocked"
+        assert any("country" in issue for issue in result["issues"])
+
+    def test_segmented_srm_uses_variant_totals(self):
+        """dimension 지정 시 SRM은 segment 합산 users로 검사"""
+        df = pd.DataFrame({
+            "country": ["KR", "KR", "US", "US"],
+            "variant": ["control", "treatment", "control", "treatment"],
+            "users": [4000, 6000, 6000, 4000],
+            "conversions": [480, 720, 720, 480]
+        })
+
+        result = run_health_check(df, dimensions=["country"])
+
+        assert result["srm"]["observed"]["control"] == 10000
+        assert result["srm"]["observed"]["treatment"] == 10000
+        assert result["overall_status"] == "Healthy"
+
     def test_srm_warning(self):
         """중간 정도의 SRM - Warning"""
         # 5000 vs 5400 (Total 10400, expected 5200)
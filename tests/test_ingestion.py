@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.experimentos.analysis import calculate_continuous_metrics, calculate_primary
+from src.experimentos.ingestion import IngestionError, aggregate_chunk, aggregate_user_level, main
+
+
+@pytest.fixture
+def users():
+    rng = np.random.default_rng(11)
+    n = 3000
+    return pd.DataFrame({
+        "user_id": np.arange(n),
+        "variant": rng.choice(["treatment", "control"], size=n),
+        "country": rng.choice(["KR", "US", "JP"], size=n),
+        "converted": (rng.random(n) < 0.12).astype(int),
+        "revenue": np.where(rng.random(n) < 0.9, rng.gamma(2.0, 30.0, size=n), np.nan),
+    })
+
+
+def _expected(users, keys):
+    frame = users.assign(revenue=users["revenue"].fillna(0.0), revenue_sq=users["revenue"].fillna(0.0) ** 2)
+    return frame.groupby(keys).agg(
+        users=("user_id", "size"),
+        conversions=("converted", "sum"),
+        revenue_sum=("revenue", "sum"),
+        revenue_sum_sq=("revenue_sq", "sum"),
+    )
+
+
+def _assert_matches(result, users, keys):
+    expected = _expected(users, keys)
+    actual = result.set_index(keys).loc[expected.index]
+    assert actual["users"].tolist() == expected["users"].tolist()
+    assert actual["conversions"].tolist() == expected["conversions"].tolist()
+    np.testing.assert_allclose(actual["revenue_sum"], expected["revenue_sum"], rtol=1e-10)
+    np.testing.assert_allclose(actual["revenue_sum_sq"], expected["revenue_sum_sq"], rtol=1e-10)
+
+
+class TestAggregateUserLevel:
+    def test_csv_byte_ranges(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.to_csv(path, index=False)
+        # Tiny ranges so most boundaries fall mid-line
+        result = aggregate_user_level(path, metrics=["revenue"], workers=1, chunk_bytes=997)
+        assert result["variant"].tolist() == ["control", "treatment"]
+        _assert_matches(result, users, ["variant"])
+
+    def test_segments_and_control_first(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.to_csv(path, index=False)
+        result = aggregate_user_level(path, dimensions=["country"], workers=1, chunk_bytes=4096)
+        assert result.columns.tolist() == [
+            "country", "variant", "users", "conversions", "revenue_sum", "revenue_sum_sq",
+        ]
+        assert result["country"].tolist() == ["JP", "JP", "KR", "KR", "US", "US"]
+        assert result["variant"].tolist()[:2] == ["control", "treatment"]
+        _assert_matches(result, users, ["country", "variant"])
+
+    def test_process_pool(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.to_csv(path, index=False)
+        result = aggregate_user_level(path, dimensions=["country"], workers=2, chunk_bytes=8192)
+        _assert_matches(result, users, ["country", "variant"])
+
+    def test_compressed_csv(self, users, tmp_path):
+        path = tmp_path / "users.csv.gz"
+        users.to_csv(path, index=False)
+        result = aggregate_user_level(path, dimensions=["country"], workers=1, chunk_rows=500)
+        _assert_matches(result, users, ["country", "variant"])
+
+    def test_parquet_row_groups(self, users, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "users.parquet"
+        users.to_parquet(path, row_group_size=400)
+        result = aggregate_user_level(path, dimensions=["country"], workers=1, chunk_rows=1000)
+        _assert_matches(result, users, ["country", "variant"])
+
+    def test_moments_output(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.to_csv(path, index=False)
+        result = aggregate_user_level(path, metrics=["revenue"], workers=1, chunk_bytes=2048, output="moments")
+        revenue = users.assign(revenue=users["revenue"].fillna(0.0)).groupby("variant")["revenue"]
+        actual = result.set_index("variant")
+        np.testing.assert_allclose(actual["revenue_mean"], revenue.mean().loc[actual.index], rtol=1e-12)
+        np.testing.assert_allclose(actual["revenue_m2"], (revenue.var(ddof=0) * revenue.size()).loc[actual.index], rtol=1e-10)
+
+    def test_output_feeds_analysis(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.to_csv(path, index=False)
+        result = aggregate_user_level(path, metrics=["revenue"], workers=1)
+        assert calculate_primary(result)["control"]["users"] == int((users["variant"] == "control").sum())
+        assert [r["metric_name"] for r in calculate_continuous_metrics(result)] == ["revenue"]
+
+    def test_header_only(self, tmp_path):
+        path = tmp_path / "empty.csv"
+        path.write_text("user_id,variant,converted,revenue\n")
+        result = aggregate_user_level(path, workers=1)
+        assert result.empty
+        assert result.columns.tolist() == ["variant", "users", "conversions", "revenue_sum", "revenue_sum_sq"]
+
+
+class TestErrors:
+    def test_missing_required(self, tmp_path):
+        path = tmp_path / "bad.csv"
+        path.write_text("user_id,variant\n1,control\n")
+        with pytest.raises(IngestionError, match="converted"):
+            aggregate_user_level(path)
+
+    def test_unknown_columns(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.to_csv(path, index=False)
+        with pytest.raises(IngestionError, match="segment"):
+            aggregate_user_level(path, dimensions=["city"])
+        with pytest.raises(IngestionError, match="metric"):
+            aggregate_user_level(path, metrics=["orders"])
+
+    def test_duplicate_user_id_in_chunk(self, tmp_path):
+        path = tmp_path / "events.csv"
+        path.write_text("user_id,variant,converted,revenue\nu1,control,1,5\nu2,control,0,0\nu1,control,1,7\n")
+        with pytest.raises(IngestionError, match=r"Duplicate user_id.*'u1'"):
+            aggregate_user_level(path, workers=1)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_duplicate_user_id_across_chunks(self, users, tmp_path, workers):
+        path = tmp_path / "users.csv"
+        pd.concat([users, users.iloc[[0]]]).to_csv(path, index=False)
+        with pytest.raises(IngestionError, match="across chunks"):
+            aggregate_user_level(path, metrics=["revenue"], workers=workers, chunk_bytes=4096)
+
+    def test_missing_user_id(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text("user_id,variant,converted\nu1,control,1\n,control,0\n")
+        with pytest.raises(IngestionError, match="'user_id'"):
+            aggregate_user_level(path, workers=1)
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(IngestionError, match="Unsupported"):
+            aggregate_user_level(tmp_path / "users.json")
+
+
+class TestNumericColumns:
+    def test_default_metrics_skip_string_columns(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.assign(signup_ts="2024-01-01T00:00:00").to_csv(path, index=False)
+        result = aggregate_user_level(path, workers=1, chunk_bytes=4096)
+        assert result.columns.tolist() == ["variant", "users", "conversions", "revenue_sum", "revenue_sum_sq"]
+        assert [r["metric_name"] for r in calculate_continuous_metrics(result)] == ["revenue"]
+        _assert_matches(result, users, ["variant"])
+
+    def test_default_metrics_from_parquet_schema(self, users, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "users.parquet"
+        users.to_parquet(path)
+        result = aggregate_user_level(path, workers=1)
+        assert "country_sum" not in result.columns
+        _assert_matches(result, users, ["variant"])
+
+    def test_text_in_requested_metric_raises(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.assign(revenue=users["revenue"].astype(object).where(users.index != 5, "12,5 KRW")).to_csv(path, index=False)
+        with pytest.raises(IngestionError, match="'revenue'.*12,5 KRW"):
+            aggregate_user_level(path, metrics=["revenue"], workers=1)
+
+    def test_text_in_converted_raises(self, users, tmp_path):
+        path = tmp_path / "users.csv"
+        users.assign(converted=np.where(users["converted"] == 1, "yes", "no")).to_csv(path, index=False)
+        with pytest.raises(IngestionError, match="'converted'"):
+            aggregate_user_level(path, metrics=["revenue"], workers=1)
+
+
+class TestChunkAndCli:
+    def test_aggregate_chunk_drops_missing_keys(self):
+        chunk = pd.DataFrame({
+            "variant": ["control", None, "treatment", "control"],
+            "converted": [1, 1, 0, 0],
+            "m": [1.0, 5.0, 2.0, 3.0],
+        })
+        result = aggregate_chunk(chunk, ["m"], ["variant"])
+        assert result["variant"].tolist() == ["control", "treatment"]
+        assert result["users"].tolist() == [2, 1]
+        assert result["m_mean"].tolist() == [2.0, 2.0]
+        assert result["m_m2"].tolist() == [2.0, 0.0]
+
+    def test_cli_writes_csv(self, users, tmp_path):
+        source = tmp_path / "users.csv"
+        target = tmp_path / "agg.csv"
+        users.to_csv(source, index=False)
+        main([str(source), str(target), "--metrics", "revenue", "--workers", "1"])
+        _assert_matches(pd.read_csv(target), users, ["variant"])
@@ -0,0 +1,61 @@
+import json
+import math
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from backend import utils
+from backend.utils import SafeJSONResponse, dumps, sanitize
+
+
+PAYLOAD = {
+    "p_value": np.float64(0.012),
+    "users": np.int64(10000),
+    "is_significant": np.bool_(True),
+    "relative_lift": float("nan"),
+    "upper": np.float64("inf"),
+    "lower": -math.inf,
+    "ci_95": np.array([0.001, np.nan]),
+    "pairs": [{"variant_a": "control", "z": np.float32(1.5)}],
+    "tuple": (1, 2),
+}
+
+EXPECTED = {
+    "p_value": 0.012,
+    "users": 10000,
+    "is_significant": True,
+    "relative_lift": None,
+    "upper": None,
+    "lower": None,
+    "ci_95": [0.001, None],
+    "pairs": [{"variant_a": "control", "z": 1.5}],
+    "tuple": [1, 2],
+}
+
+
+def test_sanitize_converts_numpy_and_non_finite_in_one_walk():
+    result = sanitize(PAYLOAD)
+    assert result == EXPECTED
+    assert type(result["users"]) is int
+    assert type(result["is_significant"]) is bool
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_produces_rfc_json(use_orjson):
+    if use_orjson and utils.orjson is None:
+        pytest.skip("orjson not installed")
+    with patch.object(utils, "orjson", utils.orjson if use_orjson else None):
+        text = dumps(PAYLOAD)
+    # parse_constant would be called for NaN/Infinity tokens
+    parsed = json.loads(text, parse_constant=lambda token: pytest.fail(f"found {token}"))
+    assert parsed == EXPECTED
+
+
+def test_dumps_falls_back_for_big_integers():
+    assert json.loads(dumps({"n": 2**80})) == {"n": 2**80}
+
+
+def test_safe_json_response_renders_raw_analysis_payload():
+    response = SafeJSONResponse(PAYLOAD)
+    assert json.loads(response.body) == EXPECTED
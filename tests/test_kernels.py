@@ -0,0 +1,290 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+from statsmodels.stats.proportion import confint_proportions_2indep, proportions_ztest
+
+from src.experimentos.analysis import analyze_multivariant
+from src.experimentos.continuous_analysis import calculate_continuous_lift
+from src.experimentos.kernels import (
+    agresti_caffo_interval,
+    beta_expected_loss,
+    chisquare_uniform_grouped,
+    correct_p_values_grouped,
+    normal_posterior_comparison,
+    prob_beta_best,
+    prob_beta_greater,
+    proportions_ztest_2samp,
+    safe_rate,
+    welch_ttest_from_sums,
+)
+
+CASES = [
+    (120, 1000, 100, 1000),
+    (1320, 10050, 1200, 10000),
+    (0, 500, 3, 480),
+    (5, 20, 0, 25),
+    (999, 1000, 1000, 1000),
+]
+
+
+class TestProportionsZtest:
+    @pytest.mark.parametrize("count_a,nobs_a,count_b,nobs_b", CASES)
+    def test_matches_statsmodels(self, count_a, nobs_a, count_b, nobs_b):
+        z_ref, p_ref = proportions_ztest(
+            np.array([count_a, count_b]), np.array([nobs_a, nobs_b]), alternative="two-sided"
+        )
+        z, p = proportions_ztest_2samp(count_a, nobs_a, count_b, nobs_b)
+        assert z == pytest.approx(z_ref, rel=1e-12)
+        assert p == pytest.approx(p_ref, rel=1e-9, abs=1e-300)
+
+    def test_zero_pooled_variance_is_nan(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            _, p_ref = proportions_ztest(np.array([0, 0]), np.array([100, 100]))
+        _, p = proportions_ztest_2samp(0, 100, 0, 100)
+        assert np.isnan(p_ref) and np.isnan(p)
+
+    def test_broadcasts_over_matrix(self):
+        counts = np.array([[10, 20], [30, 40]])
+        nobs = np.array([[100], [200]])
+        _, p = proportions_ztest_2samp(counts, nobs, 15, 150)
+        assert p.shape == (2, 2)
+        _, p_ref = proportions_ztest(np.array([30, 15]), np.array([200, 150]))
+        assert p[1, 0] == pytest.approx(p_ref)
+
+
+class TestAgrestiCaffo:
+    @pytest.mark.parametrize("count_a,nobs_a,count_b,nobs_b", CASES)
+    def test_matches_statsmodels(self, count_a, nobs_a, count_b, nobs_b):
+        low_ref, high_ref = confint_proportions_2indep(
+            count_a, nobs_a, count_b, nobs_b, compare="diff", alpha=0.05, method="agresti-caffo"
+        )
+        low, high = agresti_caffo_interval(count_a, nobs_a, count_b, nobs_b)
+        assert low == pytest.approx(low_ref, rel=1e-12)
+        assert high == pytest.approx(high_ref, rel=1e-12)
+
+
+def test_safe_rate_handles_zero_nobs():
+    np.testing.assert_allclose(safe_rate([1, 5], [0, 10]), [0.0, 0.5])
+
+
+class TestVectorizedMultivariant:
+    """analyze_multivariant matches the scalar statsmodels computation."""
+
+    @pytest.fixture
+    def many_arms(self):
+        rng = np.random.default_rng(7)
+        k = 40
+        users = rng.integers(2000, 8000, k)
+        conversions = (users * rng.uniform(0.05, 0.15, k)).astype(int)
+        return pd.DataFrame({
+            "variant": ["control"] + [f"arm_{i}" for i in range(1, k)],
+            "users": users,
+            "conversions": conversions,
+        })
+
+    def test_vs_control_matches_statsmodels(self, many_arms):
+        result = analyze_multivariant(many_arms, correction_method="none")
+        control = many_arms.iloc[0]
+        for _, row in many_arms.iloc[1:].iterrows():
+            v = result["variants"][row["variant"]]
+            _, p_ref = proportions_ztest(
+                np.array([row["conversions"], control["conversions"]]),
+                np.array([row["users"], control["users"]]),
+            )
+            ci_ref = confint_proportions_2indep(
+                row["conversions"], row["users"], control["conversions"], control["users"],
+                compare="diff", alpha=0.05, method="agresti-caffo",
+            )
+            assert v["p_value"] == pytest.approx(p_ref, rel=1e-9)
+            assert v["ci_95"] == pytest.approx(list(ci_ref), rel=1e-9)
+
+    def test_all_pairs_order_and_values(self, many_arms):
+        result = analyze_multivariant(many_arms, correction_method="none")
+        k = len(many_arms)
+        assert len(result["all_pairs"]) == k * (k - 1) // 2
+        first, last = result["all_pairs"][0], result["all_pairs"][-1]
+        assert (first["variant_a"], first["variant_b"]) == ("control", "arm_1")
+        assert (last["variant_a"], last["variant_b"]) == (f"arm_{k - 2}", f"arm_{k - 1}")
+
+        a, b = many_arms.iloc[k - 2], many_arms.iloc[k - 1]
+        _, p_ref = proportions_ztest(
+            np.array([b["conversions"], a["conversions"]]), np.array([b["users"], a["users"]])
+        )
+        assert last["p_value"] == pytest.approx(p_ref, rel=1e-9)
+
+    def test_zero_user_variant_gets_neutral_result(self):
+        df = pd.DataFrame({
+            "variant": ["control", "variant_a", "variant_b"],
+            "users": [1000, 0, 1000],
+            "conversions": [100, 0, 120],
+        })
+        result = analyze_multivariant(df)
+        assert result["variants"]["variant_a"]["p_value"] == 1.0
+        assert result["variants"]["variant_a"]["ci_95"] == [0.0, 0.0]
+        assert result["variants"]["variant_a"]["rate"] == 0.0
+
+
+WELCH_CASES = [
+    # (sum_c, sum_sq_c, n_c, sum_t, sum_sq_t, n_t)
+    (250000, 15000000, 5000, 280000, 17000000, 5100),
+    (100.0, 50.0, 1000, 120.0, 60.0, 1000),
+    (10.0, 10.0, 10, 10.0, 10.0, 10),  # zero variance, equal means
+    (10.0, 10.0, 10, 20.0, 40.0, 10),  # zero variance, different means
+    (5.0, 5.0, 1, 6.0, 8.0, 5),  # n < 2
+    (10.0, 1.0, 10, 10.0, 20.0, 10),  # sum_sq < sum^2 / n
+]
+
+
+class TestWelchFromSums:
+    @pytest.mark.parametrize("case", WELCH_CASES)
+    def test_matches_calculate_continuous_lift(self, case):
+        sum_c, sum_sq_c, n_c, sum_t, sum_sq_t, n_t = case
+        ref = calculate_continuous_lift(
+            {"n": n_c, "sum": sum_c, "sum_sq": sum_sq_c},
+            {"n": n_t, "sum": sum_t, "sum_sq": sum_sq_t},
+            "m",
+        )
+        result = welch_ttest_from_sums(sum_c, sum_sq_c, n_c, sum_t, sum_sq_t, n_t)
+        assert bool(result.is_valid) == ref["is_valid"]
+        assert float(result.p_value) == pytest.approx(ref["p_value"], rel=1e-9)
+        assert float(result.absolute_lift) == pytest.approx(ref["absolute_lift"], rel=1e-12)
+        assert [float(result.ci_lower), float(result.ci_upper)] == pytest.approx(
+            ref["ci_95"], rel=1e-9
+        )
+
+    def test_broadcasts_over_matrix(self):
+        sums = np.array([[100.0, 10.0], [120.0, 12.0]])
+        result = welch_ttest_from_sums(sums[0], sums[0] * 2, 100, sums[1], sums[1] * 2, 100)
+        assert result.p_value.shape == (2,)
+
+
+class TestChisquareGrouped:
+    def test_matches_scipy_per_group(self):
+        observed = np.array([1000, 1100, 500, 520, 480, 7, 0])
+        groups = np.array([0, 0, 1, 1, 1, 2, 3])
+        stat, p, total = chisquare_uniform_grouped(observed, groups, 4)
+        for g, (ref_stat, ref_p) in enumerate(
+            [stats.chisquare([1000, 1100]), stats.chisquare([500, 520, 480])]
+        ):
+            assert stat[g] == pytest.approx(ref_stat, rel=1e-12)
+            assert p[g] == pytest.approx(ref_p, rel=1e-12)
+        assert total.tolist() == [2100, 1500, 7, 0]
+        assert np.isnan(p[2]) and np.isnan(p[3])  # single arm, empty group
+
+
+class TestCorrectPValuesGrouped:
+    @pytest.mark.parametrize("method", ["bonferroni", "holm", "fdr_bh"])
+    def test_matches_multipletests_per_group(self, method):
+        rng = np.random.default_rng(0)
+        groups = rng.integers(0, 20, size=200)
+        p = rng.uniform(0, 1, size=200) ** 4
+        adjusted = correct_p_values_grouped(p, groups, method)
+        for g in np.unique(groups):
+            mask = groups == g
+            _, ref, _, _ = multipletests(p[mask], method=method)
+            np.testing.assert_allclose(adjusted[mask], ref, rtol=1e-12)
+
+    def test_nan_and_none(self):
+        p = np.array([0.01, np.nan, 0.04])
+        groups = np.array([0, 0, 0])
+        adjusted = correct_p_values_grouped(p, groups, "bonferroni")
+        assert adjusted[0] == pytest.approx(0.03) and np.isnan(adjusted[1])
+        assert correct_p_values_grouped(p, groups, "none") is not p
+
+    def test_unknown_method_raises(self):
+        with pytest.raises(ValueError):
+            correct_p_values_grouped([0.1], [0], "bogus")
+
+
+def _miller_prob_greater(a1, b1, a2, b2):
+    """P(Beta(a1, b1) > Beta(a2, b2)) closed-form series (integer a1)"""
+    from scipy.special import betaln
+
+    terms = [
+        np.exp(betaln(a2 + i, b1 + b2) - np.log(b1 + i) - betaln(1 + i, b1) - betaln(a2, b2))
+        for i in range(int(a1))
+    ]
+    return float(np.sum(terms))
+
+
+class TestBetaQuadrature:
+    @pytest.mark.parametrize("a1, b1, a2, b2", [
+        (121, 881, 101, 901),
+        (2, 1000, 1, 1001),
+        (1, 1, 1, 1),
+        (500, 5000, 5, 50),
+        (1321, 8731, 1201, 8801),
+        (40, 60, 3, 400),
+    ])
+    def test_matches_closed_form_series(self, a1, b1, a2, b2):
+        assert prob_beta_greater(a1, b1, a2, b2) == pytest.approx(_miller_prob_greater(a1, b1, a2, b2), abs=1e-10)
+
+    def test_broadcasts_and_complements(self):
+        a = np.array([[121.0], [101.0]])
+        p = prob_beta_greater(a, 1002 - a, np.array([101.0, 121.0, 111.0]), 1002 - np.array([101.0, 121.0, 111.0]))
+        assert p.shape == (2, 3)
+        assert p[0, 1] == pytest.approx(0.5)
+        assert p[0, 0] + p[1, 1] == pytest.approx(1.0, abs=1e-12)
+
+    def test_expected_loss_matches_sampling(self):
+        rng = np.random.default_rng(0)
+        c = rng.beta(101, 901, size=2_000_000)
+        t = rng.beta(111, 891, size=2_000_000)
+        expected = np.maximum(c - t, 0).mean()
+        assert beta_expected_loss(101, 901, 111, 891) == pytest.approx(expected, rel=5e-3)
+
+    def test_expected_loss_identity(self):
+        # E[max(C - T, 0)] - E[max(T - C, 0)] = E[C] - E[T]
+        gap = beta_expected_loss(30, 70, 45, 55) - beta_expected_loss(45, 55, 30, 70)
+        assert gap == pytest.approx(0.30 - 0.45, abs=1e-12)
+
+
+class TestBetaBest:
+    def test_two_arms_match_pairwise(self):
+        p = prob_beta_best([101, 121], [901, 881])
+        assert p[1] == pytest.approx(prob_beta_greater(121, 881, 101, 901), abs=1e-12)
+        assert p.sum() == pytest.approx(1.0)
+
+    def test_matches_sampling(self):
+        alpha = np.array([101.0, 121.0, 131.0, 12.0])
+        beta = np.array([901.0, 881.0, 871.0, 90.0])
+        rng = np.random.default_rng(1)
+        samples = rng.beta(alpha[:, None], beta[:, None], size=(4, 1_000_000))
+        expected = np.bincount(samples.argmax(axis=0), minlength=4) / 1_000_000
+        np.testing.assert_allclose(prob_beta_best(alpha, beta), expected, atol=2e-3)
+
+    def test_symmetric_and_dominated_arms(self):
+        np.testing.assert_allclose(prob_beta_best([1, 1, 1], [1, 1, 1]), [1 / 3] * 3, atol=1e-12)
+        p = prob_beta_best([2, 1, 500], [1000, 1001, 5000])
+        assert p.tolist() == [0.0, 0.0, 1.0]
+
+    def test_many_arms(self):
+        alpha = np.random.default_rng(2).integers(900, 1100, size=50).astype(float)
+        p = prob_beta_best(alpha, 10000 - alpha)
+        assert p.sum() == pytest.approx(1.0)
+        assert p.argmax() == alpha.argmax()
+
+
+class TestNormalPosterior:
+    def test_matches_sampling(self):
+        rng = np.random.default_rng(0)
+        c = rng.normal(10.0, 0.3, size=2_000_000)
+        t = rng.normal(10.2, 0.4, size=2_000_000)
+        prob, loss = normal_posterior_comparison(10.0, 0.3, 10.2, 0.4)
+        assert prob == pytest.approx(np.mean(t > c), abs=1e-3)
+        assert loss == pytest.approx(np.maximum(c - t, 0).mean(), rel=5e-3)
+
+    def test_broadcasts_and_degenerate_limit(self):
+        prob, loss = normal_posterior_comparison(
+            np.array([1.0, 5.0]), np.array([0.0, 1.0]), np.array([[2.0, 5.0], [0.5, 5.0]]), 0.0
+        )
+        assert prob.shape == (2, 2)
+        assert prob[:, 0].tolist() == [1.0, 0.0]
+        assert loss[:, 0].tolist() == [0.0, 0.5]
+        assert prob[0, 1] == 0.5
+        assert loss[0, 1] == pytest.approx(stats.norm.pdf(0))
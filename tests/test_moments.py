@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.experimentos.analysis import calculate_continuous_metrics, calculate_continuous_metrics_multivariant
+from src.experimentos.bayesian import calculate_continuous_bayes
+from src.experimentos.continuous_analysis import calculate_continuous_lift
+from src.experimentos.healthcheck import validate_continuous_schema
+from src.experimentos.moments import Moments, merge_moments_grouped, merge_shards, moment_arrays
+from src.experimentos.portfolio import analyze_portfolio
+from src.experimentos.schema import resolve_schema
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(7)
+    return {
+        "control": rng.gamma(2.0, 25.0, size=4000),
+        "treatment": rng.gamma(2.0, 26.0, size=4200),
+    }
+
+
+def _frame(values, fmt):
+    rows = []
+    for variant, x in values.items():
+        row = {"variant": variant, "users": len(x), "conversions": len(x) // 10}
+        if fmt == "moments":
+            m = Moments.from_values(x)
+            row.update({"revenue_mean": m.mean, "revenue_m2": m.m2})
+        else:
+            row.update({"revenue_sum": x.sum(), "revenue_sum_sq": (x**2).sum()})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+class TestMerge:
+    def test_merge_equals_whole(self, values):
+        x = values["control"]
+        merged = Moments.from_values(x[:1000]) + Moments.from_values(x[1000:2500]) + Moments.from_values(x[2500:])
+        whole = Moments.from_values(x)
+        assert merged.n == whole.n
+        assert merged.mean == pytest.approx(whole.mean, rel=1e-12)
+        assert merged.m2 == pytest.approx(whole.m2, rel=1e-12)
+        assert merged.variance == pytest.approx(np.var(x, ddof=1), rel=1e-12)
+
+    def test_merge_with_empty(self):
+        m = Moments.from_values([1.0, 2.0, 4.0])
+        assert m + Moments.from_values([]) == m
+        assert Moments.from_values([]) + m == m
+
+    def test_grouped_matches_sequential(self, values):
+        x = values["treatment"]
+        chunks = np.array_split(x, 12)
+        stats = [Moments.from_values(c) for c in chunks]
+        groups = np.arange(12) % 3
+        n, mean, m2 = merge_moments_grouped(
+            [s.n for s in stats], [s.mean for s in stats], [s.m2 for s in stats], groups, 3
+        )
+        for g in range(3):
+            expected = Moments.from_values(np.concatenate([chunks[i] for i in range(12) if i % 3 == g]))
+            assert n[g] == expected.n
+            assert mean[g] == pytest.approx(expected.mean, rel=1e-12)
+            assert m2[g] == pytest.approx(expected.m2, rel=1e-12)
+
+    def test_grouped_2d(self):
+        mean = np.array([[1.0, 10.0], [3.0, 20.0]])
+        m2 = np.array([[2.0, 0.0], [2.0, 0.0]])
+        n, pooled, total = merge_moments_grouped([2, 2], mean, m2, np.array([0, 0]), 1)
+        assert n.tolist() == [4.0]
+        np.testing.assert_allclose(pooled, [[2.0, 15.0]])
+        np.testing.assert_allclose(total, [[8.0, 100.0]])
+
+    def test_no_cancellation_at_large_magnitude(self):
+        rng = np.random.default_rng(0)
+        x = 1e9 + rng.normal(0.0, 1.0, size=20000)
+        shards = [Moments.from_values(c) for c in np.array_split(x, 8)]
+        merged = shards[0]
+        for s in shards[1:]:
+            merged = merged + s
+        assert merged.variance == pytest.approx(np.var(x, ddof=1), rel=1e-6)
+
+        from_sums = Moments.from_sums(x.sum(), (x**2).sum(), len(x))
+        assert from_sums.variance != pytest.approx(np.var(x, ddof=1), rel=1e-2)
+
+
+class TestMomentsInput:
+    def test_schema_classification(self):
+        schema = resolve_schema([
+            "variant", "users", "conversions", "revenue_mean", "revenue_m2",
+            "aov_sum", "aov_sum_sq", "lonely_m2", "latency_mean",
+        ])
+        assert schema.continuous == ("revenue", "aov")
+        assert schema.moment_metrics == ("revenue",)
+        assert schema.sum_metrics == ("aov",)
+        assert schema.orphan_moments == ("lonely_m2",)
+        assert schema.guardrails == ("latency_mean",)
+        assert schema.value_columns("revenue") == ("revenue_mean", "revenue_m2")
+
+    def test_moments_preferred_over_sums(self):
+        schema = resolve_schema(["variant", "users", "conversions", "r_sum", "r_sum_sq", "r_mean", "r_m2"])
+        assert schema.continuous == ("r",)
+        assert schema.moment_metrics == ("r",)
+        assert schema.guardrails == ()
+
+    def test_lift_same_for_both_formats(self, values):
+        c, t = Moments.from_values(values["control"]), Moments.from_values(values["treatment"])
+        c_sum, c_sq = c.to_sums()
+        t_sum, t_sq = t.to_sums()
+        from_sums = calculate_continuous_lift(
+            {"sum": c_sum, "sum_sq": c_sq, "n": c.n}, {"sum": t_sum, "sum_sq": t_sq, "n": t.n}, "revenue"
+        )
+        from_moments = calculate_continuous_lift(c.to_dict(), t.to_dict(), "revenue")
+        assert from_moments["p_value"] == pytest.approx(from_sums["p_value"], rel=1e-9)
+        assert from_moments["ci_95"] == pytest.approx(from_sums["ci_95"], rel=1e-9)
+        assert calculate_continuous_lift(c, t, "revenue") == from_moments
+
+    def test_negative_m2_invalid(self):
+        result = calculate_continuous_lift({"n": 10, "mean": 1.0, "m2": -0.5}, {"n": 10, "mean": 1.0, "m2": 1.0}, "m")
+        assert result["is_valid"] is False
+        assert result["error"] == "Invalid variance (checksum failed)"
+
+    def test_orchestrators_accept_moment_columns(self, values):
+        by_sums = calculate_continuous_metrics(_frame(values, "sums"))
+        by_moments = calculate_continuous_metrics(_frame(values, "moments"))
+        assert len(by_moments) == 1
+        assert by_moments[0]["p_value"] == pytest.approx(by_sums[0]["p_value"], rel=1e-9)
+
+        df = _frame(values, "moments")
+        df = pd.concat([df, df.iloc[[1]].assign(variant="b")], ignore_index=True)
+        multi = calculate_continuous_metrics_multivariant(df)
+        assert set(multi["by_variant"]) == {"treatment", "b"}
+
+    def test_bayes_accepts_moments(self, values):
+        c, t = Moments.from_values(values["control"]), Moments.from_values(values["treatment"])
+        c_sum, c_sq = c.to_sums()
+        t_sum, t_sq = t.to_sums()
+        expected = calculate_continuous_bayes(
+            {"sum": c_sum, "sum_sq": c_sq, "n": c.n}, {"sum": t_sum, "sum_sq": t_sq, "n": t.n}
+        )
+        result = calculate_continuous_bayes(c, t.to_dict())
+        assert result["prob_treatment_beats_control"] == pytest.approx(expected["prob_treatment_beats_control"])
+
+    def test_portfolio_accepts_moment_columns(self, values):
+        by_moments = analyze_portfolio(_frame(values, "moments").assign(experiment_id="e1"))
+        by_sums = analyze_portfolio(_frame(values, "sums").assign(experiment_id="e1"))
+        assert by_moments.continuous["metric"].tolist() == ["revenue"]
+        np.testing.assert_allclose(by_moments.continuous["p_value"], by_sums.continuous["p_value"], rtol=1e-9)
+
+    def test_moment_arrays_mixed_formats(self):
+        df = pd.DataFrame({
+            "variant": ["control", "treatment"], "users": [4, 4], "conversions": [1, 1],
+            "a_mean": [2.0, 3.0], "a_m2": [8.0, 2.0],
+            "b_sum": [8.0, 12.0], "b_sum_sq": [24.0, 38.0],
+        })
+        n, mean, m2 = moment_arrays(df)
+        assert n.tolist() == [4.0, 4.0]
+        np.testing.assert_allclose(mean, [[2.0, 2.0], [3.0, 3.0]])
+        np.testing.assert_allclose(m2, [[8.0, 8.0], [2.0, 2.0]])
+
+
+class TestValidation:
+    def test_orphan_m2_blocked(self):
+        df = pd.DataFrame({"variant": ["control", "treatment"], "users": [10, 10], "r_m2": [1.0, 1.0]})
+        issues: list[str] = []
+        assert validate_continuous_schema(df, issues) == "Blocked"
+        assert "'r_m2' exists but 'r_mean' is missing" in issues[0]
+
+    def test_negative_m2_blocked(self):
+        df = pd.DataFrame({
+            "variant": ["control", "treatment"], "users": [10, 10],
+            "r_mean": [1.0, 1.0], "r_m2": [1.0, -0.5],
+        })
+        issues: list[str] = []
+        assert validate_continuous_schema(df, issues) == "Blocked"
+        assert any("M2 < 0" in i for i in issues)
+
+    def test_valid_moments_healthy(self, values):
+        issues: list[str] = []
+        assert validate_continuous_schema(_frame(values, "moments"), issues) == "Healthy"
+        assert issues == []
+
+
+class TestMergeShards:
+    def test_shards_merge_to_full_aggregate(self, values):
+        shard_rows = []
+        for variant, x in values.items():
+            for chunk in np.array_split(x, 5):
+                m = Moments.from_values(chunk)
+                shard_rows.append({
+                    "variant": variant, "users": len(chunk), "conversions": 3,
+                    "revenue_mean": m.mean, "revenue_m2": m.m2,
+                })
+        shards = pd.DataFrame(shard_rows)
+        merged = merge_shards(shards)
+        full = _frame(values, "moments")
+
+        assert merged.columns.tolist() == shards.columns.tolist()
+        assert merged["variant"].tolist() == ["control", "treatment"]
+        assert merged["users"].tolist() == full["users"].tolist()
+        assert merged["conversions"].tolist() == [15, 15]
+        np.testing.assert_allclose(merged["revenue_mean"], full["revenue_mean"], rtol=1e-12)
+        np.testing.assert_allclose(merged["revenue_m2"], full["revenue_m2"], rtol=1e-12)
+
+    def test_incremental_merge(self, values):
+        x = values["control"]
+        parts = [Moments.from_values(c) for c in np.array_split(x, 4)]
+        rows = pd.DataFrame([
+            {"variant": "control", "users": p.n, "conversions": 1, "r_mean": p.mean, "r_m2": p.m2} for p in parts
+        ])
+        once = merge_shards(rows)
+        twice = merge_shards(pd.concat([merge_shards(rows.iloc[:2]), merge_shards(rows.iloc[2:])]))
+        np.testing.assert_allclose(twice[["users", "r_mean", "r_m2"]], once[["users", "r_mean", "r_m2"]], rtol=1e-12)
+
+    def test_missing_key(self):
+        with pytest.raises(ValueError, match="Missing key columns"):
+            merge_shards(pd.DataFrame({"variant": ["control"], "users": [1]}), keys=["experiment_id", "variant"])
@@ -1,7 +1,12 @@
+import numpy as np
 import pytest
 import pandas as pd
-from src.experimentos.bayesian import calculate_beta_binomial_multivariant
-from src.experimentos.analysis import calculate_bayesian_insights_multivariant
+from src.experimentos.config import config
+from src.experimentos.bayesian import calculate_beta_binomial_multivariant, calculate_continuous_bayes
+from src.experimentos.analysis import (
+    calculate_bayesian_insights_multivariant,
+    calculate_continuous_metrics_multivariant,
+)
 
 
 class TestBetaBinomialMultivariant:
@@ -125,3 +130,81 @@ class TestBayesianInsightsMultivariant:
         result = calculate_bayesian_insights_multivariant(df)
 
         assert result["conversion"] is None
+
+    def test_continuous_matrix_matches_pairwise(self):
+        """variant × metric 행렬 결과가 셀별 calculate_continuous_bayes와 같다."""
+        df = pd.DataFrame({
+            "variant": ["control", "variant_a", "variant_b"],
+            "users": [400, 380, 420],
+            "conversions": [40, 45, 50],
+            "revenue_sum": [4000.0, 3990.0, 4100.0],
+            "revenue_sum_sq": [42000.0, 43000.0, 42500.0],
+            "time_mean": [3.0, 2.9, 3.2],
+            "time_m2": [90.0, 80.0, 100.0],
+        })
+        continuous = calculate_continuous_metrics_multivariant(df)
+        result = calculate_bayesian_insights_multivariant(df, continuous)["continuous"]["by_variant"]
+
+        assert set(result) == {"variant_a", "variant_b"}
+        expected = calculate_continuous_bayes(
+            {"n": 400, "mean": 3.0, "m2": 90.0}, {"n": 420, "mean": 3.2, "m2": 100.0}
+        )
+        assert result["variant_b"]["time"] == expected
+        assert set(result["variant_a"]) == {"revenue", "time"}
+
+    def test_continuous_skips_non_numeric_cells(self):
+        df = pd.DataFrame({
+            "variant": ["control", "variant_a", "variant_b"],
+            "users": [400, 380, 420],
+            "conversions": [40, 45, 50],
+            "time_mean": [3.0, np.nan, 3.2],
+            "time_m2": [90.0, 80.0, 100.0],
+        })
+        continuous = {"by_variant": {
+            "variant_a": [{"metric_name": "time"}],
+            "variant_b": [{"metric_name": "time"}],
+        }}
+        result = calculate_bayesian_insights_multivariant(df, continuous)["continuous"]["by_variant"]
+        assert result["variant_a"] == {}
+        assert set(result["variant_b"]) == {"time"}
+
+
+class TestMultivariantEngine:
+    TREATMENTS = [
+        {"name": "variant_a", "conversions": 120, "total": 1000},
+        {"name": "variant_b", "conversions": 130, "total": 1000},
+    ]
+
+    def test_exact_is_deterministic_without_sampling(self, monkeypatch):
+        def no_rng(*args, **kwargs):
+            raise AssertionError("exact engine must not sample")
+
+        monkeypatch.setattr(np.random, "default_rng", no_rng)
+        result = calculate_beta_binomial_multivariant(100, 1000, self.TREATMENTS)
+        assert sum(result["prob_being_best"].values()) == pytest.approx(1.0, abs=1e-12)
+        assert result["vs_control"]["variant_a"]["posterior"] == {"alpha": 121, "beta": 881}
+
+    def test_exact_agrees_with_monte_carlo(self, monkeypatch):
+        exact = calculate_beta_binomial_multivariant(100, 1000, self.TREATMENTS)
+        monkeypatch.setattr(config, "BAYES_METHOD", "monte_carlo")
+        simulated = calculate_beta_binomial_multivariant(100, 1000, self.TREATMENTS)
+        for name in ("control", "variant_a", "variant_b"):
+            assert exact["prob_being_best"][name] == pytest.approx(simulated["prob_being_best"][name], abs=0.02)
+        for name in ("variant_a", "variant_b"):
+            assert exact["vs_control"][name]["prob_beats_control"] == pytest.approx(
+                simulated["vs_control"][name]["prob_beats_control"], abs=0.01
+            )
+
+    def test_monte_carlo_independent_of_workers(self, monkeypatch):
+        from src.experimentos import simulation
+
+        monkeypatch.setattr(config, "BAYES_METHOD", "monte_carlo")
+        monkeypatch.setattr(simulation, "SIMULATION_WORKERS", 1)
+        serial = calculate_beta_binomial_multivariant(100, 1000, self.TREATMENTS)
+        monkeypatch.setattr(simulation, "SIMULATION_WORKERS", 3)
+        assert calculate_beta_binomial_multivariant(100, 1000, self.TREATMENTS) == serial
+
+    def test_control_only(self):
+        result = calculate_beta_binomial_multivariant(100, 1000, [])
+        assert result["vs_control"] == {}
+        assert result["prob_being_best"] == {"control": 1.0}
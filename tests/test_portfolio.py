@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.experimentos.analysis import (
+    analyze_multivariant,
+    calculate_continuous_metrics_multivariant,
+    calculate_guardrails_multivariant,
+)
+from src.experimentos.healthcheck import detect_srm
+from src.experimentos.kernels import proportions_ztest_2samp
+from src.experimentos.portfolio import analyze_portfolio, analyze_segments
+
+
+@pytest.fixture
+def portfolio_df():
+    """30 experiments with 2-5 arms each, a guardrail and a continuous metric."""
+    rng = np.random.default_rng(7)
+    rows = []
+    for e in range(30):
+        n_arms = rng.integers(2, 6)
+        for a in range(n_arms):
+            users = int(rng.integers(800, 1200))
+            rows.append({
+                "experiment_id": f"exp_{e:02d}",
+                "variant": "control" if a == 0 else f"v{a}",
+                "users": users,
+                "conversions": int(rng.binomial(users, 0.1 + 0.01 * a)),
+                "guardrail_error": int(rng.binomial(users, 0.01)),
+                "revenue_sum": float(rng.uniform(4000, 6000)),
+                "revenue_sum_sq": float(rng.uniform(4e5, 6e5)),
+            })
+    # Shuffle so experiments are interleaved in the input
+    return pd.DataFrame(rows).sample(frac=1.0, random_state=1).reset_index(drop=True)
+
+
+def _experiment(df, experiment_id):
+    sub = df[df["experiment_id"] == experiment_id].drop(columns="experiment_id")
+    control_first = sub.sort_values("variant", key=lambda s: s != "control", kind="stable")
+    return control_first.reset_index(drop=True)
+
+
+class TestAnalyzePortfolio:
+    def test_primary_matches_analyze_multivariant(self, portfolio_df):
+        result = analyze_portfolio(portfolio_df, correction_method="holm")
+        for exp_id, rows in result.variants.groupby("experiment_id"):
+            ref = analyze_multivariant(_experiment(portfolio_df, exp_id), "holm")["variants"]
+            for row in rows.itertuples():
+                expected = ref[row.variant]
+                assert row.p_value == pytest.approx(expected["p_value"], rel=1e-12)
+                assert row.p_value_corrected == pytest.approx(
+                    expected["p_value_corrected"], rel=1e-12
+                )
+                assert [row.ci_lower, row.ci_upper] == pytest.approx(expected["ci_95"], rel=1e-12)
+                assert row.is_significant_corrected == expected["is_significant_corrected"]
+
+    def test_srm_matches_detect_srm(self, portfolio_df):
+        result = analyze_portfolio(portfolio_df)
+        for row in result.experiments.itertuples():
+            sub = _experiment(portfolio_df, row.experiment_id)
+            ref = detect_srm(dict(zip(sub["variant"], sub["users"])))
+            assert row.srm_p_value == pytest.approx(ref["p_value"], rel=1e-12)
+            assert row.status == ref["status"]
+
+    def test_guardrails_match_multivariant(self, portfolio_df):
+        result = analyze_portfolio(portfolio_df)
+        for (exp_id, variant), rows in result.guardrails.groupby(["experiment_id", "variant"]):
+            sub = _experiment(portfolio_df, exp_id)
+            ref = calculate_guardrails_multivariant(sub, ["guardrail_error"])["by_variant"][variant][0]
+            row = rows.iloc[0]
+            assert row["delta"] == pytest.approx(ref["delta"], rel=1e-12)
+            assert row["p_value"] == pytest.approx(ref["p_value"], rel=1e-12)
+            assert row["worsened"] == ref["worsened"]
+            assert row["severe"] == ref["severe"]
+
+    def test_continuous_matches_multivariant(self, portfolio_df):
+        result = analyze_portfolio(portfolio_df)
+        assert set(result.continuous["metric"]) == {"revenue"}
+        for (exp_id, variant), rows in result.continuous.groupby(["experiment_id", "variant"]):
+            sub = _experiment(portfolio_df, exp_id)
+            ref = calculate_continuous_metrics_multivariant(sub)["by_variant"][variant][0]
+            row = rows.iloc[0]
+            assert row["p_value"] == pytest.approx(ref["p_value"], rel=1e-9)
+            assert [row["ci_lower"], row["ci_upper"]] == pytest.approx(ref["ci_95"], rel=1e-9)
+
+    def test_invalid_experiments_are_blocked_not_raised(self):
+        df = pd.DataFrame({
+            "experiment_id": ["ok", "ok", "no_control", "no_control", "dup", "dup", "bad"],
+            "variant": ["control", "t", "a", "b", "control", "Control ", "control"],
+            "users": [100, 100, 100, 100, 100, 100, 100],
+            "conversions": [10, 12, 10, 12, 10, 10, 5],
+        })
+        result = analyze_portfolio(df)
+        status = dict(zip(result.experiments["experiment_id"], result.experiments["status"]))
+        assert status == {"bad": "Blocked", "dup": "Blocked", "no_control": "Blocked", "ok": "Healthy"}
+        assert result.variants["experiment_id"].tolist() == ["ok"]
+        assert result.guardrails.empty and result.continuous.empty
+
+    def test_bad_counts_block_experiment(self):
+        df = pd.DataFrame({
+            "experiment_id": ["a", "a", "b", "b"],
+            "variant": ["control", "t", "control", "t"],
+            "users": [100, 0, 100, 100],
+            "conversions": [10, 0, 10, 200],
+        })
+        issues = analyze_portfolio(df).experiments["issue"].tolist()
+        assert all(issue is not None for issue in issues)
+
+    def test_missing_columns_raise(self):
+        with pytest.raises(ValueError, match="experiment_id"):
+            analyze_portfolio(pd.DataFrame({"variant": ["control"], "users": [1], "conversions": [0]}))
+
+    def test_composite_keys_and_sparse_guardrails(self):
+        df = pd.DataFrame({
+            "team": ["x", "x", "y", "y"],
+            "experiment_id": ["e1", "e1", "e1", "e1"],
+            "variant": ["control", "t", "control", "t"],
+            "users": [1000, 1000, 1000, 1000],
+            "conversions": [100, 110, 100, 90],
+            "crash": [1.0, 3.0, np.nan, np.nan],
+        })
+        result = analyze_portfolio(df, key_columns=["team", "experiment_id"])
+        assert len(result.experiments) == 2
+        assert result.guardrails["team"].tolist() == ["x"]
+        assert result.guardrails["treatment_count"].tolist() == [3]
+
+    def test_to_dict_is_records(self, portfolio_df):
+        payload = analyze_portfolio(portfolio_df).to_dict()
+        assert set(payload) == {"experiments", "variants", "guardrails", "continuous"}
+        assert len(payload["experiments"]) == 30
+        assert "experiment_id" in payload["variants"][0]
+
+
+@pytest.fixture
+def segmented_df():
+    """One experiment sliced by country x platform (3 x 2 segment cells, 3 arms)."""
+    rng = np.random.default_rng(11)
+    rows = []
+    for country in ["KR", "US", "JP"]:
+        for platform in ["ios", "android"]:
+            for variant in ["control", "a", "b"]:
+                users = int(rng.integers(2000, 3000))
+                rows.append({
+                    "country": country,
+                    "platform": platform,
+                    "variant": variant,
+                    "users": users,
+                    "conversions": int(rng.binomial(users, 0.1)),
+                    "guardrail_crash": int(rng.binomial(users, 0.01)),
+                })
+    return pd.DataFrame(rows)
+
+
+class TestAnalyzeSegments:
+    def test_one_row_per_segment_cell(self, segmented_df):
+        result = analyze_segments(segmented_df, ["country", "platform"])
+        assert len(result.experiments) == 6
+        assert result.experiments["issue"].isna().all()
+        assert len(result.variants) == 12
+        assert "guardrail_crash" in set(result.guardrails["guardrail"])
+        assert "country" not in set(result.guardrails["guardrail"])
+
+    def test_correction_spans_all_segments(self, segmented_df):
+        result = analyze_segments(segmented_df, ["country", "platform"], correction_method="bonferroni")
+        variants = result.variants
+        np.testing.assert_allclose(
+            variants["p_value_corrected"], np.minimum(variants["p_value"] * 12, 1.0), rtol=1e-12
+        )
+        # Guardrails: one family per guardrail across segments x treatments
+        guardrails = result.guardrails
+        np.testing.assert_allclose(
+            guardrails["p_value_corrected"], np.minimum(guardrails["p_value"] * 12, 1.0), rtol=1e-12
+        )
+
+    def test_segment_matches_filtered_analysis(self, segmented_df):
+        result = analyze_segments(segmented_df, ["country", "platform"])
+        row = result.variants.query("country == 'US' and platform == 'ios' and variant == 'a'").iloc[0]
+        sub = segmented_df.query("country == 'US' and platform == 'ios'").set_index("variant")
+        _, p = proportions_ztest_2samp(
+            sub.loc["a", "conversions"], sub.loc["a", "users"],
+            sub.loc["control", "conversions"], sub.loc["control", "users"],
+        )
+        assert row["p_value"] == pytest.approx(float(p), rel=1e-12)
+
+    def test_requires_dimensions(self, segmented_df):
+        with pytest.raises(ValueError):
+            analyze_segments(segmented_df, [])
+        with pytest.raises(ValueError, match="region"):
+            analyze_segments(segmented_df, ["region"])
+
+    def test_family_columns_must_be_keys(self, portfolio_df):
+        with pytest.raises(ValueError):
+            analyze_portfolio(portfolio_df, family_columns=["variant"])
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+
+from src.experimentos.analysis import (
+    calculate_bayesian_insights,
+    calculate_continuous_metrics,
+    calculate_continuous_metrics_multivariant,
+    calculate_guardrails,
+)
+from src.experimentos.continuous_analysis import calculate_ratio_lift
+from src.experimentos.healthcheck import validate_continuous_schema
+from src.experimentos.kernels import ratio_delta_method
+from src.experimentos.portfolio import analyze_portfolio
+from src.experimentos.schema import resolve_schema
+
+
+def _user_level(rng, n, value_scale):
+    orders = rng.poisson(2.0, size=n).astype(float)
+    revenue = orders * rng.gamma(2.0, value_scale, size=n)
+    return revenue, orders
+
+
+def _aggregate(revenue, orders):
+    return {
+        "num_sum": revenue.sum(),
+        "den_sum": orders.sum(),
+        "num_sum_sq": (revenue**2).sum(),
+        "den_sum_sq": (orders**2).sum(),
+        "num_den_sum": (revenue * orders).sum(),
+        "n": len(revenue),
+    }
+
+
+@pytest.fixture
+def arms():
+    rng = np.random.default_rng(3)
+    return {
+        "control": _aggregate(*_user_level(rng, 5000, 20.0)),
+        "treatment": _aggregate(*_user_level(rng, 5100, 21.0)),
+        "b": _aggregate(*_user_level(rng, 4900, 20.0)),
+    }
+
+
+def _frame(arms):
+    rows = []
+    for variant, stats in arms.items():
+        row = {"variant": variant, "users": stats["n"], "conversions": stats["n"] // 10}
+        row.update({f"aov_{k}": v for k, v in stats.items() if k != "n"})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+class TestDeltaMethodKernel:
+    def test_matches_user_level_linearization(self):
+        rng = np.random.default_rng(5)
+        c_rev, c_ord = _user_level(rng, 2000, 10.0)
+        t_rev, t_ord = _user_level(rng, 2000, 11.0)
+
+        def variance(rev, orders):
+            ratio = rev.sum() / orders.sum()
+            linear = (rev - ratio * orders) / orders.mean()
+            return ratio, linear.var(ddof=1) / len(rev)
+
+        r_c, v_c = variance(c_rev, c_ord)
+        r_t, v_t = variance(t_rev, t_ord)
+        result = ratio_delta_method(
+            *_aggregate(c_rev, c_ord).values(), *_aggregate(t_rev, t_ord).values()
+        )
+        se = np.sqrt(v_c + v_t)
+        assert result.control_ratio == pytest.approx(r_c)
+        assert result.std_err == pytest.approx(se, rel=1e-9)
+        assert result.p_value == pytest.approx(2 * norm.sf(abs(r_t - r_c) / se), rel=1e-9)
+        assert result.ci_upper - result.absolute_lift == pytest.approx(norm.ppf(0.975) * se, rel=1e-9)
+
+    def test_broadcasts_metrics_by_variants(self, arms):
+        keys = ["num_sum", "den_sum", "num_sum_sq", "den_sum_sq", "num_den_sum", "n"]
+        control = [np.array([arms["control"][k]] * 3) for k in keys]
+        treatments = [np.array([[arms[v][k]] * 3 for v in ("treatment", "b")]) for k in keys]
+        result = ratio_delta_method(*control, *treatments)
+        assert result.p_value.shape == (2, 3)
+        single = calculate_ratio_lift(arms["control"], arms["b"], "aov")
+        assert result.p_value[1, 2] == pytest.approx(single["p_value"])
+
+    def test_degenerate_cells(self, arms):
+        zero_den = {**arms["control"], "num_sum": 0.0, "den_sum": 0.0}
+        assert calculate_ratio_lift(zero_den, arms["treatment"], "aov")["error"] == "Zero denominator"
+        tiny = {**arms["control"], "n": 1}
+        assert calculate_ratio_lift(tiny, arms["treatment"], "aov")["error"] == "Insufficient data (n < 2)"
+        bad = {**arms["control"], "num_sum_sq": 0.0}
+        result = calculate_ratio_lift(bad, arms["treatment"], "aov")
+        assert result["error"] == "Invalid variance (checksum failed)"
+        assert result["metric_type"] == "ratio"
+        assert result["p_value"] == 1.0
+
+
+class TestRatioSchema:
+    def test_classification(self):
+        schema = resolve_schema(_frame({"control": {"n": 1, **dict.fromkeys(
+            ["num_sum", "den_sum", "num_sum_sq", "den_sum_sq", "num_den_sum"], 0.0)}}))
+        assert schema.ratio_metrics == ("aov",)
+        assert schema.continuous == ()
+        assert schema.guardrails == ()
+
+    def test_incomplete_ratio_is_orphan(self):
+        schema = resolve_schema(["variant", "users", "conversions", "aov_num_sum", "aov_num_sum_sq", "aov_num_den_sum"])
+        assert schema.ratio_metrics == ()
+        assert schema.orphan_ratios == ("aov_num_den_sum",)
+
+
+class TestRatioOrchestration:
+    def test_two_variant(self, arms):
+        df = _frame({k: arms[k] for k in ("control", "treatment")})
+        (result,) = calculate_continuous_metrics(df)
+        expected = calculate_ratio_lift(arms["control"], arms["treatment"], "aov")
+        assert result == expected
+        assert result["metric_type"] == "ratio"
+        assert result["control_mean"] == pytest.approx(arms["control"]["num_sum"] / arms["control"]["den_sum"])
+
+    def test_mixed_with_per_user_metric(self, arms):
+        df = _frame({k: arms[k] for k in ("control", "treatment")})
+        df["revenue_sum"] = df["aov_num_sum"]
+        df["revenue_sum_sq"] = df["aov_num_sum_sq"]
+        results = calculate_continuous_metrics(df)
+        assert [(r["metric_name"], r.get("metric_type", "mean")) for r in results] == [
+            ("revenue", "mean"), ("aov", "ratio"),
+        ]
+        assert [g["name"] for g in calculate_guardrails(df)] == []
+
+        insights = calculate_bayesian_insights(df, results)
+        assert set(insights["continuous"]) == {"revenue"}
+
+    def test_multivariant(self, arms):
+        result = calculate_continuous_metrics_multivariant(_frame(arms))
+        assert set(result["by_variant"]) == {"treatment", "b"}
+        b = result["by_variant"]["b"][0]
+        assert b["variant"] == "b"
+        assert b["p_value"] == pytest.approx(calculate_ratio_lift(arms["control"], arms["b"], "aov")["p_value"])
+
+    def test_portfolio(self, arms):
+        df = _frame(arms).assign(experiment_id="e1")
+        table = analyze_portfolio(df).continuous
+        assert table["metric_type"].tolist() == ["ratio", "ratio"]
+        row = table.set_index("variant").loc["b"]
+        assert row["p_value"] == pytest.approx(calculate_ratio_lift(arms["control"], arms["b"], "aov")["p_value"])
+
+
+class TestRatioValidation:
+    def test_orphan_blocked(self):
+        df = pd.DataFrame({"variant": ["control", "treatment"], "users": [10, 10], "aov_num_den_sum": [1.0, 1.0]})
+        issues: list[str] = []
+        assert validate_continuous_schema(df, issues) == "Blocked"
+        assert "Ratio schema error" in issues[0]
+        assert "'aov_den_sum'" in issues[0]
+
+    def test_zero_denominator_warning(self, arms):
+        df = _frame({k: arms[k] for k in ("control", "treatment")})
+        df.loc[1, ["aov_num_sum", "aov_den_sum", "aov_num_sum_sq", "aov_den_sum_sq", "aov_num_den_sum"]] = 0.0
+        issues: list[str] = []
+        assert validate_continuous_schema(df, issues) == "Warning"
+        assert "zero denominator for treatment" in issues[0]
@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from src.experimentos import report as report_module
+from src.experimentos.report import (
+    REPORT_STAGES,
+    ReportOptions,
+    resolve_stages,
+    run_report,
+    stage_inputs,
+)
+
+
+@pytest.fixture
+def two_variant_df():
+    return pd.DataFrame({
+        "variant": ["control", "treatment"],
+        "users": [10000, 10050],
+        "conversions": [1200, 1320],
+        "guardrail_error": [35, 33],
+        "revenue_sum": [250000.0, 280000.0],
+        "revenue_sum_sq": [15000000.0, 17000000.0],
+    })
+
+
+@pytest.fixture
+def multivariant_df():
+    return pd.DataFrame({
+        "variant": ["control", "variant_a", "variant_b"],
+        "users": [10000, 9800, 10200],
+        "conversions": [1200, 1300, 1150],
+        "guardrail_error": [35, 40, 32],
+    })
+
+
+class TestResolveStages:
+    def test_none_means_all_stages(self):
+        assert resolve_stages(None) == list(REPORT_STAGES)
+
+    def test_dependencies_are_added_in_order(self):
+        assert resolve_stages(["decision"]) == ["health", "primary", "guardrails", "decision"]
+        assert resolve_stages(["bayesian"]) == ["continuous", "bayesian"]
+
+    def test_unknown_stage_raises(self):
+        with pytest.raises(ValueError, match="Unknown report stage"):
+            resolve_stages(["primary", "nope"])
+
+
+class TestStageInputs:
+    def test_required_dependencies(self):
+        assert stage_inputs("bayesian", list(REPORT_STAGES)) == ("continuous",)
+        assert stage_inputs("health", list(REPORT_STAGES)) == ()
+
+    def test_optional_input_only_when_selected(self):
+        assert "bayesian" in stage_inputs("memo", list(REPORT_STAGES))
+        selected = resolve_stages(["memo"])
+        assert stage_inputs("memo", selected) == ("decision",)
+
+
+class TestRunReport:
+    def test_full_report_two_variant(self, two_variant_df):
+        report = run_report(two_variant_df, options=ReportOptions(experiment_name="Checkout"))
+        assert report["stages"] == list(REPORT_STAGES)
+        assert report["is_multivariant"] is False
+        assert report["variant_count"] == 2
+        assert report["health_result"]["overall_status"] in ("Healthy", "Warning", "Blocked")
+        assert report["primary_result"]["is_significant"] in (True, False)
+        assert report["continuous_results"][0]["metric_name"] == "revenue"
+        assert "revenue" in report["bayesian_insights"]["continuous"]
+        assert report["decision"]["decision"] in ("Launch", "Hold", "Rollback")
+        assert "Checkout" in report["memo"]["markdown"]
+        assert "<html>" in report["memo"]["html"]
+
+    def test_multivariant_report_picks_best_variant(self, multivariant_df):
+        report = run_report(multivariant_df, stages=["primary", "guardrails"])
+        assert report["is_multivariant"] is True
+        assert report["primary_result"]["is_multivariant"] is True
+        assert report["primary_result"]["best_variant"] == "variant_a"
+        assert "by_variant" in report["guardrail_results"]
+        assert "health_result" not in report
+
+    def test_continuous_stage_runs_once(self, two_variant_df):
+        """Bayesian reuses the continuous stage instead of recomputing it."""
+        with patch.object(
+            report_module,
+            "calculate_continuous_metrics",
+            wraps=report_module.calculate_continuous_metrics,
+        ) as spy:
+            run_report(two_variant_df, stages=["continuous", "bayesian"])
+        assert spy.call_count == 1
+
+    def test_stage_results_match_standalone_functions(self, two_variant_df):
+        from src.experimentos.analysis import calculate_primary, calculate_guardrails
+
+        report = run_report(two_variant_df, stages=["primary", "guardrails"])
+        assert report["primary_result"] == calculate_primary(two_variant_df)
+        assert report["guardrail_results"] == calculate_guardrails(two_variant_df)
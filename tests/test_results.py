@@ -0,0 +1,167 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.utils import dumps, sanitize
+from src.experimentos.analysis import primary_result
+from src.experimentos.bayesian import beta_binomial, calculate_beta_binomial, continuous_bayes
+from src.experimentos.continuous_analysis import continuous_lift
+from src.experimentos.guardrails import evaluate_guardrails
+from src.experimentos.healthcheck import run_health_check
+from src.experimentos.memo import generate_memo, make_decision
+from src.experimentos.portfolio import analyze_portfolio
+from src.experimentos.results import (
+    ContinuousResult,
+    GuardrailResult,
+    PrimaryResult,
+    as_dict,
+    to_arrow,
+    to_frame,
+    write_parquet,
+)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "variant": ["control", "treatment"],
+        "users": [10000, 10050],
+        "conversions": [1200, 1320],
+        "guardrail_error": [35, 60],
+        "revenue_sum": [250000.0, 280000.0],
+        "revenue_sum_sq": [15000000.0, 17000000.0],
+    })
+
+
+@pytest.fixture
+def guardrail_matrix():
+    df = pd.DataFrame({
+        "variant": ["control", "a", "b"],
+        "users": [1000, 1000, 1000],
+        "conversions": [100, 110, 90],
+        "g1": [10, 20, 5],
+        "g2": ["3", "x", "4"],
+    })
+    is_control = df["variant"].to_numpy() == "control"
+    return evaluate_guardrails(df, ["g1", "g2"], ~is_control, 0)
+
+
+class TestResultTypes:
+    def test_slots_no_instance_dict(self, df):
+        result = primary_result(df)
+        assert isinstance(result, PrimaryResult)
+        assert not hasattr(result, "__dict__")
+
+    def test_fields_are_python_scalars(self, df):
+        result = primary_result(df)
+        assert type(result.p_value) is float
+        assert type(result.ci_lower) is float
+        stats = {"sum": 250000.0, "sum_sq": 15000000.0, "n": 10000}
+        lift = continuous_lift(stats, {**stats, "sum": 260000.0}, "revenue")
+        assert type(lift.p_value) is float
+
+    def test_continuous_invalid_dict_shape(self):
+        stats = {"sum": 1.0, "sum_sq": 1.0, "n": 1}
+        result = continuous_lift(stats, stats, "m").to_dict()
+        assert result["is_valid"] is False
+        assert result["error"] == "Insufficient data (n < 2)"
+        assert result["ci_95"] == [0.0, 0.0]
+
+    def test_bayesian_dict_shape(self):
+        typed = beta_binomial(120, 1000, 130, 1000)
+        assert typed.to_dict() == calculate_beta_binomial(120, 1000, 130, 1000)
+        assert typed.to_dict()["control_posterior"] == {"alpha": 121, "beta": 881}
+        stats = {"sum": 10.0, "sum_sq": 10.0, "n": 10}
+        assert set(continuous_bayes(stats, stats).to_dict()) == {
+            "prob_treatment_beats_control", "expected_loss",
+        }
+
+
+class TestCompatibilityAdapter:
+    def test_as_dict(self, df):
+        result = primary_result(df)
+        assert as_dict(result) == result.to_dict()
+        assert as_dict([result]) == [result.to_dict()]
+        assert as_dict({"a": 1}) == {"a": 1}
+
+    def test_make_decision_accepts_typed_results(self, df):
+        health = run_health_check(df)
+        typed_primary = primary_result(df)
+        typed_guardrails = [
+            GuardrailResult(
+                name="guardrail_error", control_count=35, treatment_count=60,
+                control_rate=0.0035, treatment_rate=0.006, delta=0.0025, relative_lift=0.7,
+                worsened=True, severe=False, p_value=0.01,
+            )
+        ]
+        expected = make_decision(health, typed_primary.to_dict(), as_dict(typed_guardrails))
+        assert make_decision(health, typed_primary, typed_guardrails) == expected
+
+        memo = generate_memo("Exp", expected, health, typed_primary, typed_guardrails)
+        assert "guardrail_error" in memo
+
+
+class TestSerialization:
+    def test_dumps_uses_dict_shape(self, df):
+        result = primary_result(df)
+        assert json.loads(dumps({"primary": result})) == json.loads(dumps({"primary": result.to_dict()}))
+        assert sanitize(result) == sanitize(result.to_dict())
+
+    def test_to_frame_and_arrow(self):
+        pytest.importorskip("pyarrow")
+        results = [
+            ContinuousResult.invalid("a", "bad"),
+            ContinuousResult("b", True, 1.0, 1.5, 0.5, 0.5, 0.01, 0.1, 0.9, True),
+        ]
+        frame = to_frame(results)
+        assert frame["metric_name"].tolist() == ["a", "b"]
+        table = to_arrow(results)
+        assert table.num_rows == 2
+        assert table.column("error").to_pylist() == ["bad", None]
+
+    def test_write_parquet_roundtrip(self, df, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "primary.parquet"
+        write_parquet([primary_result(df)], path)
+        loaded = pd.read_parquet(path)
+        assert loaded.loc[0, "p_value"] == pytest.approx(primary_result(df).p_value)
+
+    def test_portfolio_parquet(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        portfolio = pd.DataFrame({
+            "experiment_id": ["e1", "e1", "e2", "e2"],
+            "variant": ["control", "t", "control", "t"],
+            "users": [1000, 1000, 500, 500],
+            "conversions": [100, 120, 50, 40],
+        })
+        result = analyze_portfolio(portfolio)
+        paths = result.write_parquet(tmp_path)
+        assert sorted(p.name for p in paths) == [
+            "continuous.parquet", "experiments.parquet", "guardrails.parquet", "variants.parquet",
+        ]
+        loaded = pd.read_parquet(tmp_path / "variants.parquet")
+        np.testing.assert_allclose(loaded["p_value"], result.variants["p_value"])
+        assert result.to_arrow()["experiments"].num_rows == 2
+
+
+class TestGuardrailMatrixExport:
+    def test_results_match_records(self, guardrail_matrix):
+        for row in range(2):
+            typed = guardrail_matrix.results(row, include_variant=True)
+            assert [r.to_dict() for r in typed] == guardrail_matrix.records(row, include_variant=True)
+
+    def test_to_frame_matches_records(self, guardrail_matrix):
+        frame = guardrail_matrix.to_frame()
+        assert len(frame) == 4
+        records = guardrail_matrix.records(0) + guardrail_matrix.records(1)
+        for record, row in zip(records, frame.itertuples()):
+            assert row.name == record["name"]
+            if "error" in record:
+                assert row.error == record["error"]
+                assert not row.worsened
+            else:
+                assert row.error is None
+                assert row.delta == pytest.approx(record["delta"])
+                assert row.p_value == pytest.approx(record["p_value"])
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from src.experimentos.analysis import calculate_continuous_metrics, calculate_guardrails
+from src.experimentos.guardrails import detect_guardrail_columns
+from src.experimentos.healthcheck import validate_schema
+from src.experimentos.schema import _classify, resolve_schema
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "variant": ["control", "treatment"],
+        "users": [5000, 5100],
+        "conversions": [600, 660],
+        "country": ["KR", "KR"],
+        "guardrail_error": [35, 33],
+        "revenue_sum": [250000.0, 280000.0],
+        "revenue_sum_sq": [15000000.0, 17000000.0],
+        "orders_sum": [100.0, 120.0],
+        "metric_sum": [1.0, 1.0],
+        "n": [5000, 5100],
+    })
+
+
+class TestExperimentSchema:
+    def test_classification(self, df):
+        schema = resolve_schema(df, dimensions=["country"])
+        assert schema.primary == ("variant", "users", "conversions")
+        assert schema.missing_primary == ()
+        assert schema.dimensions == ("country",)
+        assert schema.guardrails == ("guardrail_error",)
+        assert schema.continuous == ("revenue",)
+        assert schema.orphan_sums == ("orders_sum",)
+        assert schema.sum_columns == ["revenue_sum"]
+        assert schema.sum_sq_columns == ["revenue_sum_sq"]
+
+    def test_without_dimensions_other_columns_are_guardrails(self, df):
+        assert resolve_schema(df).guardrails == ("country", "guardrail_error")
+
+    def test_missing_primary(self):
+        schema = resolve_schema(["variant", "users"])
+        assert schema.missing_primary == ("conversions",)
+
+    def test_memoized_per_column_signature(self, df):
+        _classify.cache_clear()
+        first = resolve_schema(df)
+        second = resolve_schema(df.copy())
+        assert first is second
+        assert _classify.cache_info().hits == 1
+        assert resolve_schema(df, dimensions=["country"]) is not first
+
+
+class TestStagesShareSchema:
+    def test_detect_guardrail_columns(self, df):
+        assert detect_guardrail_columns(df) == ["country", "guardrail_error"]
+        assert detect_guardrail_columns(df, ["country"]) == ["guardrail_error"]
+
+    def test_continuous_skips_orphan_sum(self, df):
+        results = calculate_continuous_metrics(df.drop(columns="country"))
+        assert [r["metric_name"] for r in results] == ["revenue"]
+
+    def test_validate_schema_reports_orphan_sum(self, df):
+        result = validate_schema(df.copy())
+        assert result["status"] == "Blocked"
+        assert any("'orders_sum' exists but 'orders_sum_sq' is missing" in i for i in result["issues"])
+
+    def test_guardrails_never_include_continuous_columns(self, df):
+        names = [g["name"] for g in calculate_guardrails(df.drop(columns="country"))]
+        assert names == ["guardrail_error"]
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from src.experimentos.bayesian import calculate_continuous_bayes
+from src.experimentos.config import config
+from src.experimentos.kernels import beta_expected_loss, prob_beta_greater
+from src.experimentos import simulation
+from src.experimentos.simulation import beta_sampler, normal_sampler, simulate_arms, simulate_batch, simulate_split
+
+
+def _simulate(draw, n_arms, **kwargs):
+    return simulate_arms(draw, n_arms, np.random.default_rng(0), samples=10000, **kwargs)
+
+
+class TestFixedSize:
+    def test_matches_single_shot_sampling(self):
+        rng = np.random.default_rng(0)
+        c = rng.beta(101, 901, size=10000)
+        t = rng.beta(111, 891, size=10000)
+        sim = _simulate(beta_sampler([101, 111], [901, 891]), 2)
+        assert sim.draws == 10000
+        assert sim.prob_beats_control[0] == np.mean(t > c)
+        assert sim.expected_loss[0] == pytest.approx(np.mean(np.maximum(c - t, 0)), rel=1e-12)
+
+    def test_prob_being_best_sums_to_one(self):
+        sim = _simulate(beta_sampler([101, 121, 131], [901, 881, 871]), 3)
+        assert sim.prob_being_best.sum() == pytest.approx(1.0)
+        assert sim.prob_beats_control.shape == (2,)
+
+
+class TestPrecisionTarget:
+    def test_clear_winner_stops_after_first_chunk(self):
+        sim = _simulate(beta_sampler([101, 200], [901, 802]), 2, tolerance=0.005, chunk_size=300)
+        assert sim.draws == 300
+        assert sim.prob_beats_control[0] == 1.0
+
+    @pytest.mark.parametrize("dtype", ["float64", "float32"])
+    def test_close_call_meets_tolerance(self, dtype):
+        sim = _simulate(beta_sampler([101, 111], [901, 891], dtype), 2, tolerance=0.005)
+        p = sim.prob_beats_control[0]
+        assert 500 < sim.draws < 100_000
+        assert np.sqrt(p * (1 - p) / sim.draws) <= 0.005
+        assert p == pytest.approx(prob_beta_greater(111, 891, 101, 901), abs=4 * 0.005)
+        assert sim.expected_loss[0] == pytest.approx(beta_expected_loss(101, 901, 111, 891), rel=0.1)
+
+    def test_stops_at_max_samples(self):
+        sim = _simulate(beta_sampler([101, 101], [901, 901]), 2, tolerance=1e-6, max_samples=2000)
+        assert sim.draws == 2000
+
+
+class TestFloat32:
+    def test_normal_keeps_precision_at_large_means(self):
+        sim = _simulate(normal_sampler([1e6, 1e6 + 1], [1.0, 1.0], "float32"), 2, tolerance=0.002)
+        assert sim.prob_beats_control[0] == pytest.approx(norm.cdf(1 / np.sqrt(2)), abs=0.01)
+
+    def test_chunk_dtype(self):
+        draw = beta_sampler([2, 3], [5, 4], "float32")
+        assert draw(np.random.default_rng(0), 10).dtype == np.float32
+
+    def test_unknown_dtype(self):
+        with pytest.raises(ValueError, match="dtype"):
+            beta_sampler([1], [1], "float16")
+
+
+class TestConfigured:
+    def test_continuous_bayes_precision_mode(self, monkeypatch):
+        c_stats = {"n": 100, "mean": 10.0, "m2": 400.0}
+        t_stats = {"n": 100, "mean": 10.5, "m2": 500.0}
+        exact = calculate_continuous_bayes(c_stats, t_stats)
+        monkeypatch.setattr(config, "BAYES_METHOD", "monte_carlo")
+        monkeypatch.setattr(config, "BAYES_MC_TOLERANCE", 0.003)
+        monkeypatch.setattr(config, "BAYES_MC_DTYPE", "float32")
+        adaptive = calculate_continuous_bayes(c_stats, t_stats)
+        assert adaptive["prob_treatment_beats_control"] == pytest.approx(
+            exact["prob_treatment_beats_control"], abs=0.015
+        )
+        assert adaptive == calculate_continuous_bayes(c_stats, t_stats)
+
+
+class TestBatch:
+    TASKS = [
+        (beta_sampler([101, 111], [901, 891]), 2),
+        (beta_sampler([101, 121, 131], [901, 881, 871], "float32"), 3),
+        (normal_sampler([10.0, 10.2], [0.3, 0.4]), 2),
+        (normal_sampler([5.0, 5.0, 5.1], [0.1, 0.1, 0.1]), 3),
+    ]
+
+    @staticmethod
+    def _flat(results):
+        return [(r.prob_beats_control, r.expected_loss, r.prob_being_best, r.draws) for r in results]
+
+    def _assert_identical(self, a, b):
+        for x, y in zip(self._flat(a), self._flat(b), strict=True):
+            for u, v in zip(x, y):
+                np.testing.assert_array_equal(u, v)
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_bit_identical_across_worker_counts(self, executor):
+        serial = simulate_batch(self.TASKS, seed=42, samples=5000, workers=1)
+        for workers in (2, 4):
+            parallel = simulate_batch(self.TASKS, seed=42, samples=5000, workers=workers, executor=executor)
+            self._assert_identical(serial, parallel)
+
+    def test_streams_are_independent_per_task(self):
+        same = [(beta_sampler([101, 111], [901, 891]), 2)] * 2
+        first, second = simulate_batch(same, seed=42, samples=5000)
+        assert first.prob_beats_control[0] != second.prob_beats_control[0]
+
+    def test_precision_mode_in_batch(self):
+        results = simulate_batch(self.TASKS, seed=7, samples=5000, tolerance=0.01, workers=2)
+        assert all(r.draws <= 100_000 for r in results)
+        self._assert_identical(results, simulate_batch(self.TASKS, seed=7, samples=5000, tolerance=0.01))
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError, match="executor"):
+            simulate_batch(self.TASKS, seed=1, samples=10, executor="cluster")
+
+
+class TestSplit:
+    DRAW = beta_sampler([101, 111, 121], [901, 891, 881])
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_bit_identical_across_worker_counts(self, executor):
+        serial = simulate_split(self.DRAW, 3, seed=42, samples=10001, workers=1)
+        assert serial.draws == 10001
+        for workers in (2, 4):
+            parallel = simulate_split(self.DRAW, 3, seed=42, samples=10001, workers=workers, executor=executor)
+            np.testing.assert_array_equal(serial.prob_beats_control, parallel.prob_beats_control)
+            np.testing.assert_array_equal(serial.expected_loss, parallel.expected_loss)
+            np.testing.assert_array_equal(serial.prob_being_best, parallel.prob_being_best)
+
+    def test_shards_combine_to_accurate_estimate(self):
+        sim = simulate_split(self.DRAW, 3, seed=0, samples=40000, workers=2)
+        assert sim.prob_being_best.sum() == pytest.approx(1.0)
+        assert sim.prob_beats_control[0] == pytest.approx(prob_beta_greater(111, 891, 101, 901), abs=0.01)
+        assert sim.expected_loss[0] == pytest.approx(beta_expected_loss(101, 901, 111, 891), rel=0.05)
+
+    def test_precision_mode_runs_as_one_task(self):
+        sim = simulate_split(self.DRAW, 3, seed=0, samples=10000, tolerance=0.01, workers=2)
+        expected = simulate_arms(
+            self.DRAW, 3, np.random.default_rng(np.random.SeedSequence(0).spawn(1)[0]), 10000, tolerance=0.01
+        )
+        assert sim.draws == expected.draws
+        np.testing.assert_array_equal(sim.prob_beats_control, expected.prob_beats_control)
+
+    def test_pool_reused_across_calls(self):
+        simulate_split(self.DRAW, 3, seed=1, samples=5000, workers=2, executor="thread")
+        pool = simulation._POOLS[("thread", 2)]
+        simulate_batch([(self.DRAW, 3)] * 2, seed=1, samples=100, workers=2, executor="thread")
+        assert simulation._POOLS[("thread", 2)] is pool
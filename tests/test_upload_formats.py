@@ -0,0 +1,190 @@
+import asyncio
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from backend.datasets import (
+    SchemaRejectedError,
+    UnsupportedFormatError,
+    UploadTooLargeError,
+    column_dtypes,
+    content_hash,
+    detect_format,
+    parse_upload,
+    spool_upload,
+)
+
+CSV_BYTES = (
+    b"variant,users,conversions,guardrail_error,revenue_sum,revenue_sum_sq\n"
+    b"control,10000,1200,35,250000,15000000\n"
+    b"treatment,10050,1320,33,280000,17000000\n"
+)
+
+
+def _frame() -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(CSV_BYTES))
+
+
+def _parquet_bytes() -> bytes:
+    pytest.importorskip("pyarrow")
+    buf = io.BytesIO()
+    _frame().to_parquet(buf)
+    return buf.getvalue()
+
+
+def _feather_bytes() -> bytes:
+    pytest.importorskip("pyarrow")
+    buf = io.BytesIO()
+    _frame().to_feather(buf)
+    return buf.getvalue()
+
+
+def _arrow_stream_bytes() -> bytes:
+    pa = pytest.importorskip("pyarrow")
+    table = pa.Table.from_pandas(_frame())
+    buf = io.BytesIO()
+    with pa.ipc.new_stream(buf, table.schema) as writer:
+        writer.write_table(table)
+    return buf.getvalue()
+
+
+def _zstd_bytes() -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(CSV_BYTES)
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("data.csv", "csv"),
+    ("DATA.CSV.GZ", "csv.gz"),
+    ("data.csv.zst", "csv.zst"),
+    ("data.parquet", "parquet"),
+    ("data.feather", "arrow"),
+    ("data.arrow", "arrow"),
+    ("data.txt", None),
+    ("data.gz", None),
+    (None, None),
+])
+def test_detect_format(filename, expected):
+    assert detect_format(filename) == expected
+
+
+def test_column_dtypes_covers_known_columns_only():
+    dtypes = column_dtypes(["variant", "users", "conversions", "rev_sum", "rev_sum_sq", "g"])
+    assert dtypes == {
+        "variant": "str",
+        "users": "int64",
+        "conversions": "int64",
+        "rev_sum": "float64",
+        "rev_sum_sq": "float64",
+    }
+
+
+@pytest.mark.parametrize("filename, payload", [
+    ("data.csv", lambda: CSV_BYTES),
+    ("data.csv.gz", lambda: gzip.compress(CSV_BYTES)),
+    ("data.csv.zst", _zstd_bytes),
+    ("data.parquet", _parquet_bytes),
+    ("data.feather", _feather_bytes),
+    ("data.arrow", _arrow_stream_bytes),
+])
+def test_all_formats_parse_to_same_frame(filename, payload):
+    df = parse_upload(payload(), filename)
+    assert list(df.columns) == list(_frame().columns)
+    assert df["users"].dtype == "int64"
+    assert df["conversions"].dtype == "int64"
+    assert df["revenue_sum"].dtype == "float64"
+    assert df["revenue_sum_sq"].dtype == "float64"
+    pd.testing.assert_frame_equal(df, _frame(), check_dtype=False)
+
+
+def test_malformed_numeric_column_falls_back_to_inference():
+    """Non-numeric users must reach validate_schema instead of failing the upload."""
+    df = parse_upload(b"variant,users,conversions\ncontrol,abc,1\ntreatment,3,1\n", "x.csv")
+    assert df["users"].tolist() == ["abc", "3"]
+
+
+def test_unsupported_extension_raises():
+    with pytest.raises(UnsupportedFormatError):
+        parse_upload(b"{}", "data.json")
+
+
+class _FakeUpload:
+    """Minimal async UploadFile stand-in that records how much was read."""
+
+    def __init__(self, filename: str, data: bytes):
+        self.filename = filename
+        self._buf = io.BytesIO(data)
+        self.bytes_read = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self._buf.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class TestSpoolUpload:
+    def test_spooled_content_and_hash(self):
+        upload = _FakeUpload("data.csv", CSV_BYTES)
+        spool, dataset_id = asyncio.run(spool_upload(upload, chunk_bytes=16))
+        with spool:
+            assert spool.read() == CSV_BYTES
+        assert dataset_id == content_hash(CSV_BYTES)
+
+    def test_missing_columns_rejected_after_first_chunk(self):
+        body = b"variant,users\n" + b"control,100\n" * 10_000
+        upload = _FakeUpload("data.csv", body)
+        with pytest.raises(SchemaRejectedError, match="conversions"):
+            asyncio.run(spool_upload(upload, chunk_bytes=1024))
+        assert upload.bytes_read == 1024
+
+    def test_missing_columns_rejected_in_gzip_header(self):
+        body = gzip.compress(b"variant,users\n" + b"control,100\n" * 1000)
+        with pytest.raises(SchemaRejectedError):
+            asyncio.run(spool_upload(_FakeUpload("data.csv.gz", body), chunk_bytes=64))
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_headerless_compression_bomb_bounded(self, compression):
+        import tracemalloc
+
+        payload = b"a" * (64 * 1024 * 1024)
+        if compression == "gzip":
+            body, filename = gzip.compress(payload, compresslevel=9), "bomb.csv.gz"
+        else:
+            zstandard = pytest.importorskip("zstandard")
+            body, filename = zstandard.ZstdCompressor().compress(payload), "bomb.csv.zst"
+        del payload
+        tracemalloc.start()
+        try:
+            with pytest.raises(SchemaRejectedError, match="헤더"):
+                asyncio.run(spool_upload(_FakeUpload(filename, body), chunk_bytes=4096))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < 8 * 1024 * 1024
+
+    def test_plain_csv_without_newline_rejected(self):
+        upload = _FakeUpload("data.csv", b"variant" + b"x" * (1024 * 1024))
+        with pytest.raises(SchemaRejectedError):
+            asyncio.run(spool_upload(upload, chunk_bytes=16 * 1024))
+        assert upload.bytes_read <= 80 * 1024
+
+    def test_too_large_rejected(self):
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(spool_upload(_FakeUpload("data.csv", CSV_BYTES), max_bytes=32))
+
+    def test_small_spool_spills_to_disk(self):
+        spool, _ = asyncio.run(
+            spool_upload(_FakeUpload("data.csv", CSV_BYTES), spool_bytes=16, chunk_bytes=16)
+        )
+        with spool:
+            assert spool._rolled  # moved out of memory
+            assert parse_upload(spool, "data.csv")["users"].tolist() == [10000, 10050]
+
+    def test_parquet_schema_checked_before_reading(self):
+        pytest.importorskip("pyarrow")
+        buf = io.BytesIO()
+        _frame().drop(columns=["conversions"]).to_parquet(buf)
+        with pytest.raises(SchemaRejectedError):
+            parse_upload(buf.getvalue(), "data.parquet")